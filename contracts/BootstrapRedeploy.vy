@@ -44,16 +44,20 @@ repay_allowed: public(HashMap[address, bool])
 applications: HashMap[address, uint256]
 debt: public(uint256)
 deposited: public(uint256)
-deposits: public(HashMap[address, uint256]) # user => amount deposited
+packed_voters: HashMap[address, uint256] # user => votes used (128) | amount deposited (128)
 incentives: public(HashMap[address, HashMap[address, uint256]]) # protocol => incentive => amount
 incentive_depositors: public(HashMap[address, HashMap[address, HashMap[address, uint256]]]) # protocol => incentive => depositor => amount
 voted: public(uint256)
-votes_used: public(HashMap[address, uint256]) # user => votes used
 votes_used_protocol: public(HashMap[address, HashMap[address, uint256]]) # user => protocol => votes
 votes: public(HashMap[address, uint256]) # protocol => votes
 winners_list: public(DynArray[address, MAX_WINNERS])
-winners: public(HashMap[address, bool]) # protocol => winner?
-incentive_claimed: public(HashMap[address, HashMap[address, HashMap[address, bool]]]) # winner => incentive => user => claimed?
+winner_index: HashMap[address, uint256] # protocol => index in winners list + 1
+incentive_tokens: public(HashMap[address, HashMap[uint256, address]]) # protocol => index => incentive
+num_incentive_tokens: public(HashMap[address, uint256]) # protocol => number of incentive tokens
+incentive_token_index: HashMap[address, HashMap[address, uint256]] # protocol => incentive => index + 1
+claimed_incentives: HashMap[address, uint256] # user => bitmap of claimed (winner, incentive) pairs
+claimed_incentives_overflow: HashMap[address, HashMap[address, HashMap[address, bool]]] # winner => incentive => user => claimed?
+incentive_roots: public(HashMap[address, HashMap[address, bytes32]]) # winner => incentive => merkle root of claimable amounts
 
 whitelist_begin: public(uint256)
 whitelist_end: public(uint256)
@@ -65,6 +69,11 @@ vote_begin: public(uint256)
 vote_end: public(uint256)
 lock_end: public(uint256)
 
+struct ClaimableIncentive:
+    protocol: address
+    incentive: address
+    amount: uint256
+
 event Apply:
     protocol: indexed(address)
 
@@ -111,6 +120,11 @@ event RefundIncentive:
     depositor: indexed(address)
     amount: uint256
 
+event SetIncentiveRoot:
+    protocol: indexed(address)
+    incentive: indexed(address)
+    root: bytes32
+
 event SetPeriod:
     period: indexed(uint256)
     begin: uint256
@@ -129,6 +143,11 @@ NOTHING: constant(uint256) = 0
 APPLIED: constant(uint256) = 1
 WHITELISTED: constant(uint256) = 2
 MAX_WINNERS: constant(uint256) = 5
+INCENTIVE_BITS: constant(uint256) = 51 # incentive tokens per winner tracked in the claimed bitmaps
+MAX_PROOF_LENGTH: constant(uint256) = 32
+MAX_CLAIMABLE_INCENTIVES: constant(uint256) = 256 # incentive tokens considered per page of `claimable_incentives`
+VOTER_MASK: constant(uint256) = 2**128 - 1
+VOTES_USED_SHIFT: constant(int128) = 128
 
 @external
 def __init__(_token: address, _staking: address, _treasury: address, _pol: address):
@@ -175,6 +194,11 @@ def incentivize(_protocol: address, _incentive: address, _amount: uint256):
     assert _amount > 0
     assert block.timestamp >= self.incentive_begin and block.timestamp < self.incentive_end # dev: outside incentive period
     assert self.applications[_protocol] == WHITELISTED # dev: not whitelisted
+    if self.incentive_token_index[_protocol][_incentive] == 0:
+        index: uint256 = self.num_incentive_tokens[_protocol]
+        self.incentive_tokens[_protocol][index] = _incentive
+        self.num_incentive_tokens[_protocol] = index + 1
+        self.incentive_token_index[_protocol][_incentive] = index + 1
     self.incentives[_protocol][_incentive] += _amount
     self.incentive_depositors[_protocol][_incentive][msg.sender] += _amount
     assert ERC20(_incentive).transferFrom(msg.sender, self, _amount, default_return_value=True)
@@ -192,7 +216,9 @@ def deposit(_accounts: DynArray[address, 256], _amounts: DynArray[uint256, 256])
         account: address = _accounts[i]
         amount: uint256 = _amounts[i]
         total += amount
-        self.deposits[account] += amount
+        packed: uint256 = self.packed_voters[account]
+        assert (packed & VOTER_MASK) + amount <= VOTER_MASK
+        self.packed_voters[account] = packed + amount
         log Deposit(msg.sender, account, amount)
 
     self.debt += total
@@ -210,10 +236,54 @@ def claim(_amount: uint256, _receiver: address = msg.sender):
     assert _amount > 0
     assert block.timestamp >= self.lock_end
     self.deposited -= _amount
-    self.deposits[msg.sender] -= _amount
+    packed: uint256 = self.packed_voters[msg.sender]
+    assert (packed & VOTER_MASK) >= _amount
+    self.packed_voters[msg.sender] = packed - _amount
     assert ERC20(staking).transfer(_receiver, _amount, default_return_value=True)
     log Claim(msg.sender, _receiver, _amount)
 
+@external
+@view
+def deposits(_account: address) -> uint256:
+    """
+    @notice Get the amount of ETH deposited by a specific account
+    @param _account The account to query for
+    @return Amount deposited
+    """
+    return self.packed_voters[_account] & VOTER_MASK
+
+@external
+@view
+def votes_used(_account: address) -> uint256:
+    """
+    @notice Get the amount of votes used by a specific account
+    @param _account The account to query for
+    @return Amount of votes used
+    """
+    return shift(self.packed_voters[_account], -VOTES_USED_SHIFT)
+
+@internal
+@pure
+def _pack_voter(_deposits: uint256, _votes_used: uint256) -> uint256:
+    """
+    @notice Pack an account's deposits and used votes into a single slot
+    @param _deposits Amount deposited
+    @param _votes_used Amount of votes used
+    @return Packed value
+    """
+    assert _deposits <= VOTER_MASK and _votes_used <= VOTER_MASK
+    return _deposits | shift(_votes_used, VOTES_USED_SHIFT)
+
+@internal
+@pure
+def _unpack_voter(_packed: uint256) -> (uint256, uint256):
+    """
+    @notice Unpack an account's deposits and used votes
+    @param _packed Packed value
+    @return Tuple of amount deposited and amount of votes used
+    """
+    return _packed & VOTER_MASK, shift(_packed, -VOTES_USED_SHIFT)
+
 @external
 @view
 def votes_available(_account: address) -> uint256:
@@ -225,7 +295,10 @@ def votes_available(_account: address) -> uint256:
     if block.timestamp < self.vote_begin or block.timestamp >= self.vote_end:
         return 0
 
-    return self.deposits[_account] - self.votes_used[_account]
+    deposits: uint256 = 0
+    votes_used: uint256 = 0
+    deposits, votes_used = self._unpack_voter(self.packed_voters[_account])
+    return deposits - votes_used
 
 @external
 def vote(_protocols: DynArray[address, 32], _votes: DynArray[uint256, 32]):
@@ -248,9 +321,12 @@ def vote(_protocols: DynArray[address, 32], _votes: DynArray[uint256, 32]):
         self.votes_used_protocol[msg.sender][protocol] += votes
         log Vote(msg.sender, protocol, votes)
     self.voted += used
-    used += self.votes_used[msg.sender]
-    assert used <= self.deposits[msg.sender] # dev: too many votes
-    self.votes_used[msg.sender] = used
+    deposits: uint256 = 0
+    votes_used: uint256 = 0
+    deposits, votes_used = self._unpack_voter(self.packed_voters[msg.sender])
+    used += votes_used
+    assert used <= deposits # dev: too many votes
+    self.packed_voters[msg.sender] = self._pack_voter(deposits, used)
 
 @external
 def undo_vote(_protocol: address, _account: address = msg.sender) -> uint256:
@@ -267,10 +343,36 @@ def undo_vote(_protocol: address, _account: address = msg.sender) -> uint256:
     assert votes > 0
     self.voted -= votes
     self.votes[_protocol] -= votes
-    self.votes_used[_account] -= votes
+    deposits: uint256 = 0
+    votes_used: uint256 = 0
+    deposits, votes_used = self._unpack_voter(self.packed_voters[_account])
+    self.packed_voters[_account] = self._pack_voter(deposits, votes_used - votes)
     self.votes_used_protocol[_account][_protocol] = 0
     return votes
 
+@external
+def undo_votes(_protocol: address, _accounts: DynArray[address, 256]) -> uint256:
+    """
+    @notice Undo votes of multiple accounts for a protocol that had their whitelist retracted
+    @param _protocol Protocol to undo votes for
+    @param _accounts Accounts to undo votes for. Accounts without votes for the protocol are skipped
+    @return Total amount of freed up votes
+    """
+    assert msg.sender == self.management
+    assert block.timestamp >= self.vote_begin and block.timestamp < self.vote_end # dev: outside vote period
+    assert self.applications[_protocol] != WHITELISTED
+    total: uint256 = 0
+    for account in _accounts:
+        votes: uint256 = self.votes_used_protocol[account][_protocol]
+        if votes == 0:
+            continue
+        total += votes
+        self.packed_voters[account] -= shift(votes, VOTES_USED_SHIFT)
+        self.votes_used_protocol[account][_protocol] = 0
+    self.voted -= total
+    self.votes[_protocol] -= total
+    return total
+
 @external
 def repay(_amount: uint256):
     """
@@ -307,9 +409,52 @@ def claimable_incentive(_protocol: address, _incentive: address, _claimer: addre
     @param _claimer Account to query for
     @return Amount of claimable incentive tokens
     """
-    if not self.winners[_protocol] or self.incentive_claimed[_protocol][_incentive][_claimer]:
+    if self.winner_index[_protocol] == 0:
         return 0
-    return self.incentives[_protocol][_incentive] * self.votes_used[_claimer] / self.voted
+    if self._incentive_claimed(_protocol, _incentive, _claimer, self._claim_bit(_protocol, _incentive), self.claimed_incentives[_claimer]):
+        return 0
+    return self.incentives[_protocol][_incentive] * shift(self.packed_voters[_claimer], -VOTES_USED_SHIFT) / self.voted
+
+@external
+@view
+def claimable_incentives(_claimer: address, _start: uint256 = 0, _count: uint256 = MAX_CLAIMABLE_INCENTIVES) -> (DynArray[ClaimableIncentive, MAX_CLAIMABLE_INCENTIVES], uint256):
+    """
+    @notice Get the claimable incentives of an account, one page at a time
+    @param _claimer Account to query for
+    @param _start Position to start at in the incentive tokens of all winners, in order of winner and token
+    @param _count Number of incentive tokens to consider, at most `MAX_CLAIMABLE_INCENTIVES`
+    @return
+        List of winner, incentive token and claimable amount, excluding incentives without anything to claim.
+        Position to start the next page at, zero if there are no incentive tokens left to consider
+    """
+    assert _count <= MAX_CLAIMABLE_INCENTIVES
+    claimable: DynArray[ClaimableIncentive, MAX_CLAIMABLE_INCENTIVES] = []
+    voted: uint256 = self.voted
+    votes_used: uint256 = shift(self.packed_voters[_claimer], -VOTES_USED_SHIFT)
+    if voted == 0 or votes_used == 0:
+        return claimable, 0
+    claimed: uint256 = self.claimed_incentives[_claimer]
+    end: uint256 = _start + _count
+    position: uint256 = 0 # of the first incentive token of the current winner
+    for protocol in self.winners_list:
+        num_tokens: uint256 = self.num_incentive_tokens[protocol]
+        if position < end and _start < position + num_tokens:
+            first: uint256 = 0
+            if _start > position:
+                first = _start - position
+            for i in range(first, first + MAX_CLAIMABLE_INCENTIVES):
+                if i == num_tokens or position + i == end:
+                    break
+                incentive: address = self.incentive_tokens[protocol][i]
+                if self._incentive_claimed(protocol, incentive, _claimer, self._claim_bit(protocol, incentive), claimed):
+                    continue
+                amount: uint256 = self.incentives[protocol][incentive] * votes_used / voted
+                if amount > 0:
+                    claimable.append(ClaimableIncentive({protocol: protocol, incentive: incentive, amount: amount}))
+        position += num_tokens
+    if end < position:
+        return claimable, end
+    return claimable, 0
 
 @external
 def claim_incentive(_protocol: address, _incentive: address, _claimer: address = msg.sender) -> uint256:
@@ -320,17 +465,105 @@ def claim_incentive(_protocol: address, _incentive: address, _claimer: address =
     @param _claimer Account to claim for
     @return Amount of incentive tokens claimed
     """
-    assert self.winners[_protocol] # dev: protocol is not winner
-    assert not self.incentive_claimed[_protocol][_incentive][_claimer] # dev: incentive already claimed
+    assert self.winner_index[_protocol] > 0 # dev: protocol is not winner
+    bit: uint256 = self._claim_bit(_protocol, _incentive)
+    claimed: uint256 = self.claimed_incentives[_claimer]
+    assert not self._incentive_claimed(_protocol, _incentive, _claimer, bit, claimed) # dev: incentive already claimed
     
-    incentive: uint256 = self.incentives[_protocol][_incentive] * self.votes_used[_claimer] / self.voted
+    incentive: uint256 = self.incentives[_protocol][_incentive] * shift(self.packed_voters[_claimer], -VOTES_USED_SHIFT) / self.voted
     assert incentive > 0 # dev: nothing to claim
 
-    self.incentive_claimed[_protocol][_incentive][_claimer] = True
+    self._set_incentive_claimed(_protocol, _incentive, _claimer, bit, claimed)
     assert ERC20(_incentive).transfer(_claimer, incentive, default_return_value=True)
     log ClaimIncentive(_protocol, _incentive, _claimer, incentive)
     return incentive
 
+@external
+def claim_incentive_proof(_protocol: address, _incentive: address, _amount: uint256, _proof: DynArray[bytes32, MAX_PROOF_LENGTH], _claimer: address = msg.sender) -> uint256:
+    """
+    @notice Claim a specific incentive by proving the claimable amount against the posted merkle root
+    @param _protocol Address of the LSD protocol to claim incentives for
+    @param _incentive Incentive token to claim
+    @param _amount Amount of incentive tokens claimable by the claimer
+    @param _proof Merkle proof of the claimable amount
+    @param _claimer Account to claim for
+    @return Amount of incentive tokens claimed
+    """
+    root: bytes32 = self.incentive_roots[_protocol][_incentive]
+    assert root != empty(bytes32) # dev: no merkle root
+    bit: uint256 = self._claim_bit(_protocol, _incentive)
+    claimed: uint256 = self.claimed_incentives[_claimer]
+    assert not self._incentive_claimed(_protocol, _incentive, _claimer, bit, claimed) # dev: incentive already claimed
+    assert _amount > 0 # dev: nothing to claim
+
+    leaf: bytes32 = keccak256(keccak256(_abi_encode(_claimer, _amount)))
+    assert self._verify_proof(root, leaf, _proof) # dev: invalid proof
+
+    self._set_incentive_claimed(_protocol, _incentive, _claimer, bit, claimed)
+    assert ERC20(_incentive).transfer(_claimer, _amount, default_return_value=True)
+    log ClaimIncentive(_protocol, _incentive, _claimer, _amount)
+    return _amount
+
+@external
+def claim_incentives(_protocols: DynArray[address, 32], _incentives: DynArray[address, 32], _claimer: address = msg.sender) -> DynArray[uint256, 32]:
+    """
+    @notice Claim multiple incentives at once
+    @param _protocols Addresses of the LSD protocols to claim incentives for
+    @param _incentives Incentive tokens to claim, one for each protocol
+    @param _claimer Account to claim for
+    @return Amounts of incentive tokens claimed, zero for pairs without anything to claim
+    """
+    assert len(_protocols) == len(_incentives)
+    votes: uint256 = shift(self.packed_voters[_claimer], -VOTES_USED_SHIFT)
+    voted: uint256 = self.voted
+    amounts: DynArray[uint256, 32] = []
+    for i in range(32):
+        if i == len(_protocols):
+            break
+        protocol: address = _protocols[i]
+        incentive: address = _incentives[i]
+        amount: uint256 = 0
+        if votes > 0 and self.winner_index[protocol] > 0:
+            bit: uint256 = self._claim_bit(protocol, incentive)
+            # read and mark the claim in storage before every transfer, a token can reenter
+            claimed: uint256 = self.claimed_incentives[_claimer]
+            if not self._incentive_claimed(protocol, incentive, _claimer, bit, claimed):
+                amount = self.incentives[protocol][incentive] * votes / voted
+            if amount > 0:
+                self._set_incentive_claimed(protocol, incentive, _claimer, bit, claimed)
+                assert ERC20(incentive).transfer(_claimer, amount, default_return_value=True)
+                log ClaimIncentive(protocol, incentive, _claimer, amount)
+        amounts.append(amount)
+    return amounts
+
+@external
+def distribute_incentive(_protocol: address, _incentive: address, _claimers: DynArray[address, 256]) -> uint256:
+    """
+    @notice Distribute a specific incentive to multiple claimers at once
+    @param _protocol Address of the LSD protocol to distribute incentives for
+    @param _incentive Incentive token to distribute
+    @param _claimers Accounts to distribute to
+    @return Total amount of incentive tokens distributed
+    @dev Claimers that have already claimed or have nothing to claim are skipped
+    """
+    assert self.winner_index[_protocol] > 0 # dev: protocol is not winner
+    bit: uint256 = self._claim_bit(_protocol, _incentive)
+    incentives: uint256 = self.incentives[_protocol][_incentive]
+    voted: uint256 = self.voted
+    total: uint256 = 0
+    for claimer in _claimers:
+        claimed: uint256 = self.claimed_incentives[claimer]
+        if self._incentive_claimed(_protocol, _incentive, claimer, bit, claimed):
+            continue
+        incentive: uint256 = incentives * shift(self.packed_voters[claimer], -VOTES_USED_SHIFT) / voted
+        if incentive == 0:
+            continue
+        self._set_incentive_claimed(_protocol, _incentive, claimer, bit, claimed)
+        total += incentive
+        assert ERC20(_incentive).transfer(claimer, incentive, default_return_value=True)
+        log ClaimIncentive(_protocol, _incentive, claimer, incentive)
+    return total
+
 @external
 def refund_incentive(_protocol: address, _incentive: address, _depositor: address = msg.sender) -> uint256:
     """
@@ -341,7 +574,7 @@ def refund_incentive(_protocol: address, _incentive: address, _depositor: addres
     @return Amount of incentive tokens refunded
     """
     assert len(self.winners_list) > 0 # dev: no winners declared
-    assert not self.winners[_protocol] # dev: protocol is winner
+    assert self.winner_index[_protocol] == 0 # dev: protocol is winner
 
     amount: uint256 = self.incentive_depositors[_protocol][_incentive][_depositor]
     assert amount > 0 # dev: nothing to refund
@@ -380,6 +613,92 @@ def num_winners() -> uint256:
     """
     return len(self.winners_list)
 
+@external
+@view
+def winners(_protocol: address) -> bool:
+    """
+    @notice Check whether the LSD protocol has been declared as winner
+    @param _protocol Address of the LSD protocol to query for
+    @return True if the protocol is a winner, False if it is not
+    """
+    return self.winner_index[_protocol] > 0
+
+@external
+@view
+def incentive_claimed(_protocol: address, _incentive: address, _claimer: address) -> bool:
+    """
+    @notice Check whether an account has claimed a specific incentive
+    @param _protocol Address of the LSD protocol
+    @param _incentive Incentive token
+    @param _claimer Account to query for
+    @return True if the incentive has been claimed, False if it has not
+    """
+    return self._incentive_claimed(_protocol, _incentive, _claimer, self._claim_bit(_protocol, _incentive), self.claimed_incentives[_claimer])
+
+@internal
+@view
+def _claim_bit(_protocol: address, _incentive: address) -> uint256:
+    """
+    @notice Get the bit that tracks claims of a winner's incentive in the claimed bitmaps
+    @param _protocol Address of the LSD protocol
+    @param _incentive Incentive token
+    @return Bit mask, zero if the claims are tracked outside of the bitmaps
+    """
+    winner: uint256 = self.winner_index[_protocol]
+    index: uint256 = self.incentive_token_index[_protocol][_incentive]
+    if winner == 0 or index == 0 or index > INCENTIVE_BITS:
+        return 0
+    return shift(1, convert((winner - 1) * INCENTIVE_BITS + index - 1, int128))
+
+@internal
+@view
+def _incentive_claimed(_protocol: address, _incentive: address, _claimer: address, _bit: uint256, _claimed: uint256) -> bool:
+    """
+    @notice Check whether an account has claimed a specific incentive
+    @param _protocol Address of the LSD protocol
+    @param _incentive Incentive token
+    @param _claimer Account to query for
+    @param _bit Bit that tracks the claim in the claimed bitmap
+    @param _claimed Claimed bitmap of the account
+    @return True if the incentive has been claimed, False if it has not
+    """
+    if _bit == 0:
+        return self.claimed_incentives_overflow[_protocol][_incentive][_claimer]
+    return (_claimed & _bit) > 0
+
+@internal
+@pure
+def _verify_proof(_root: bytes32, _leaf: bytes32, _proof: DynArray[bytes32, MAX_PROOF_LENGTH]) -> bool:
+    """
+    @notice Verify a merkle proof, with each pair of nodes hashed in sorted order
+    @param _root Merkle root
+    @param _leaf Leaf to verify
+    @param _proof Sibling nodes from the leaf up to the root
+    @return True if the proof is valid, False if it is not
+    """
+    node: bytes32 = _leaf
+    for sibling in _proof:
+        if convert(node, uint256) < convert(sibling, uint256):
+            node = keccak256(concat(node, sibling))
+        else:
+            node = keccak256(concat(sibling, node))
+    return node == _root
+
+@internal
+def _set_incentive_claimed(_protocol: address, _incentive: address, _claimer: address, _bit: uint256, _claimed: uint256):
+    """
+    @notice Mark a specific incentive as claimed by an account
+    @param _protocol Address of the LSD protocol
+    @param _incentive Incentive token
+    @param _claimer Account that claimed
+    @param _bit Bit that tracks the claim in the claimed bitmap
+    @param _claimed Claimed bitmap of the account
+    """
+    if _bit == 0:
+        self.claimed_incentives_overflow[_protocol][_incentive][_claimer] = True
+    else:
+        self.claimed_incentives[_claimer] = _claimed | _bit
+
 # MANAGEMENT FUNCTIONS
 
 @external
@@ -487,11 +806,27 @@ def declare_winners(_winners: DynArray[address, MAX_WINNERS]):
     assert len(self.winners_list) == 0
     for winner in _winners:
         assert self.applications[winner] == WHITELISTED
-        assert not self.winners[winner]
+        assert self.winner_index[winner] == 0
         self.winners_list.append(winner)
-        self.winners[winner] = True
+        self.winner_index[winner] = len(self.winners_list)
     log Winners(_winners)
 
+@external
+def set_incentive_root(_protocol: address, _incentive: address, _root: bytes32):
+    """
+    @notice 
+        Set the merkle root of claimable amounts for an incentive of a winning protocol.
+        Leaves are `keccak256(keccak256(abi.encode(claimer, amount)))` with amounts equal to `claimable_incentive`
+    @param _protocol Address of the winning LSD protocol
+    @param _incentive Incentive token
+    @param _root Merkle root
+    @dev Proof claims share the claimed bitmap with regular claims, so an incentive can only be claimed once
+    """
+    assert msg.sender == self.management
+    assert self.winner_index[_protocol] > 0 # dev: protocol is not winner
+    self.incentive_roots[_protocol][_incentive] = _root
+    log SetIncentiveRoot(_protocol, _incentive, _root)
+
 @external
 def allow_repay(_account: address, _allow: bool):
     """
@@ -21,14 +21,15 @@ management: public(address)
 pending_management: public(address)
 available: public(uint256)
 debt: public(uint256)
-native_allowance: public(HashMap[address, uint256])
-mint_allowance: public(HashMap[address, uint256])
-burn_allowance: public(HashMap[address, uint256])
+allowances: HashMap[address, uint256] # spender => burn (85) | mint (85) | native (85)
 killed: public(bool)
 
 NATIVE: constant(address) = 0x0000000000000000000000000000000000000000
 MINT: constant(address)   = 0x0000000000000000000000000000000000000001
 BURN: constant(address)   = 0x0000000000000000000000000000000000000002
+ALLOWANCE_BITS: constant(int128) = 85
+ALLOWANCE_MASK: constant(uint256) = 2**85 - 1 # also means unlimited allowance
+MAX_APPROVALS: constant(uint256) = 32
 
 event Mint:
     account: indexed(address)
@@ -87,7 +88,7 @@ def send_native(_receiver: address, _amount: uint256):
     @dev Requires prior permission by management
     """
     assert _amount > 0
-    self.native_allowance[msg.sender] -= _amount
+    self._spend(NATIVE, _amount)
     raw_call(_receiver, b"", value=_amount)
 
 @external
@@ -100,7 +101,7 @@ def mint(_amount: uint256):
     """
     assert _amount > 0
     assert not self.killed
-    self.mint_allowance[msg.sender] -= _amount
+    self._spend(MINT, _amount)
     debt: uint256 = self.debt + _amount
     assert debt <= self.available
     self.debt = debt
@@ -115,11 +116,77 @@ def burn(_amount: uint256):
     @dev Requires prior permission by management
     """
     assert _amount > 0
-    self.burn_allowance[msg.sender] -= _amount
+    self._spend(BURN, _amount)
     self.debt -= _amount
     Token(token).burn(self, _amount)
     log Burn(msg.sender, _amount)
 
+@external
+@view
+def native_allowance(_spender: address) -> uint256:
+    """
+    @notice Get the allowance of a spender to receive ETH
+    @param _spender Spender address
+    @return Allowance, `max_value(uint256)` if unlimited
+    """
+    return self._allowance(NATIVE, _spender)
+
+@external
+@view
+def mint_allowance(_spender: address) -> uint256:
+    """
+    @notice Get the allowance of a spender to mint yETH
+    @param _spender Spender address
+    @return Allowance, `max_value(uint256)` if unlimited
+    """
+    return self._allowance(MINT, _spender)
+
+@external
+@view
+def burn_allowance(_spender: address) -> uint256:
+    """
+    @notice Get the allowance of a spender to burn yETH
+    @param _spender Spender address
+    @return Allowance, `max_value(uint256)` if unlimited
+    """
+    return self._allowance(BURN, _spender)
+
+@internal
+@pure
+def _allowance_shift(_token: address) -> int128:
+    """
+    @notice Position of a special designated allowance in the packed allowances of a spender
+    """
+    if _token == NATIVE:
+        return 0
+    if _token == MINT:
+        return ALLOWANCE_BITS
+    return 2 * ALLOWANCE_BITS
+
+@internal
+@view
+def _allowance(_token: address, _spender: address) -> uint256:
+    """
+    @notice Get a special designated allowance of a spender
+    """
+    allowance: uint256 = shift(self.allowances[_spender], -self._allowance_shift(_token)) & ALLOWANCE_MASK
+    if allowance == ALLOWANCE_MASK:
+        return max_value(uint256)
+    return allowance
+
+@internal
+def _spend(_token: address, _amount: uint256):
+    """
+    @notice Spend a special designated allowance of the caller. Unlimited allowances are not reduced
+    """
+    allowances: uint256 = self.allowances[msg.sender]
+    offset: int128 = self._allowance_shift(_token)
+    allowance: uint256 = shift(allowances, -offset) & ALLOWANCE_MASK
+    if allowance == ALLOWANCE_MASK:
+        return
+    assert allowance >= _amount # dev: allowance exceeded
+    self.allowances[msg.sender] = allowances - shift(_amount, offset)
+
 # MANAGEMENT FUNCTIONS
 
 @external
@@ -158,6 +225,22 @@ def approve(_token: address, _spender: address, _amount: uint256):
     """
     self._approve(_token, _spender, _amount)
 
+@external
+def approve_many(_tokens: DynArray[address, MAX_APPROVALS], _spenders: DynArray[address, MAX_APPROVALS], _amounts: DynArray[uint256, MAX_APPROVALS]):
+    """
+    @notice Approve multiple spenders to spend tokens from the POL in a single transaction
+    @param _tokens
+        Tokens to give approval for.
+        Use special designated values to set minting/burning/native allowances
+    @param _spenders Accounts to give approval to
+    @param _amounts Amounts of tokens to approve
+    """
+    assert len(_tokens) == len(_spenders) and len(_tokens) == len(_amounts)
+    for i in range(MAX_APPROVALS):
+        if i == len(_tokens):
+            break
+        self._approve(_tokens[i], _spenders[i], _amounts[i])
+
 @external
 def increase_allowance(_token: address, _spender: address, _amount: uint256):
     """
@@ -169,12 +252,12 @@ def increase_allowance(_token: address, _spender: address, _amount: uint256):
     @param _amount Amount to increase allowance by
     """
     allowance: uint256 = 0
-    if _token == NATIVE:
-        allowance = self.native_allowance[_spender]
-    elif _token == MINT:
-        allowance = self.mint_allowance[_spender]
-    elif _token == BURN:
-        allowance = self.burn_allowance[_spender]
+    if _token == NATIVE or _token == MINT or _token == BURN:
+        allowance = self._allowance(_token, _spender)
+        if allowance == max_value(uint256):
+            # unlimited allowances stay unlimited
+            self._approve(_token, _spender, allowance)
+            return
     else:
         allowance = ERC20(_token).allowance(self, _spender)
 
@@ -189,15 +272,15 @@ def decrease_allowance(_token: address, _spender: address, _amount: uint256):
         Use special designated values to set minting/burning/native allowances
     @param _spender Account to decrease allowance of
     @param _amount Amount to decrease allowance by
-    @dev If decrease is larger than current allowance, it will be set to zero
+    @dev
+        If decrease is larger than current allowance, it will be set to zero.
+        Unlimited special designated allowances are decreased from `2**85 - 1`
     """
     allowance: uint256 = 0
-    if _token == NATIVE:
-        allowance = self.native_allowance[_spender]
-    elif _token == MINT:
-        allowance = self.mint_allowance[_spender]
-    elif _token == BURN:
-        allowance = self.burn_allowance[_spender]
+    if _token == NATIVE or _token == MINT or _token == BURN:
+        allowance = shift(self.allowances[_spender], -self._allowance_shift(_token)) & ALLOWANCE_MASK
+        if allowance == ALLOWANCE_MASK and _amount == 0:
+            allowance = max_value(uint256)
     else:
         allowance = ERC20(_token).allowance(self, _spender)
 
@@ -216,14 +299,19 @@ def _approve(_token: address, _spender: address, _amount: uint256):
         Use special designated values to set minting/burning/native allowances
     @param _spender Account to give approvel to
     @param _amount Amount of tokens to approve
+    @dev
+        Special designated allowances are stored in 85 bits. `max_value(uint256)` is unlimited,
+        other amounts of `2**85 - 1` or more revert
     """
     assert msg.sender == self.management
-    if _token == NATIVE:
-        self.native_allowance[_spender] = _amount
-    elif _token == MINT:
-        self.mint_allowance[_spender] = _amount
-    elif _token == BURN:
-        self.burn_allowance[_spender] = _amount
+    if _token == NATIVE or _token == MINT or _token == BURN:
+        offset: int128 = self._allowance_shift(_token)
+        amount: uint256 = ALLOWANCE_MASK
+        if _amount != max_value(uint256):
+            assert _amount < ALLOWANCE_MASK # dev: allowance too large
+            amount = _amount
+        allowances: uint256 = self.allowances[_spender] & ~shift(ALLOWANCE_MASK, offset)
+        self.allowances[_spender] = allowances | shift(amount, offset)
     else:
         ERC20(_token).approve(_spender, _amount)
     log Approve(_token, _spender, _amount)
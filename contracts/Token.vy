@@ -18,6 +18,13 @@ decimals: public(constant(uint8)) = 18
 
 minters: public(HashMap[address, bool])
 management: public(address)
+nonces: public(HashMap[address, uint256])
+cached_chain_id: immutable(uint256)
+cached_domain_separator: immutable(bytes32)
+
+EIP712_TYPEHASH: constant(bytes32) = keccak256("EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+PERMIT_TYPEHASH: constant(bytes32) = keccak256("Permit(address owner,address spender,uint256 value,uint256 nonce,uint256 deadline)")
+VERSION: constant(String[1]) = "1"
 
 event Transfer:
     sender: indexed(address)
@@ -39,6 +46,8 @@ event SetMinter:
 @external
 def __init__():
     self.management = msg.sender
+    cached_chain_id = chain.id
+    cached_domain_separator = keccak256(_abi_encode(EIP712_TYPEHASH, keccak256(name), keccak256(VERSION), chain.id, self))
     log Transfer(empty(address), msg.sender, 0)
 
 @external
@@ -121,6 +130,55 @@ def decreaseAllowance(_spender: address, _value: uint256) -> bool:
     log Approval(msg.sender, _spender, allowance)
     return True
 
+@external
+def permit(_owner: address, _spender: address, _value: uint256, _deadline: uint256, _v: uint8, _r: bytes32, _s: bytes32) -> bool:
+    """
+    @notice Approve the passed address to spend the specified amount of tokens on behalf of
+        `_owner` through a signature, as defined in EIP-2612
+    @param _owner The address which signed the approval and owns the funds
+    @param _spender The address which will spend the funds
+    @param _value The amount of tokens to be spent
+    @param _deadline Timestamp after which the signature is no longer valid
+    @param _v Recovery id of the signature
+    @param _r First 32 bytes of the signature
+    @param _s Second 32 bytes of the signature
+    @return True
+    """
+    assert _owner != empty(address)
+    assert block.timestamp <= _deadline # dev: permit expired
+
+    nonce: uint256 = self.nonces[_owner]
+    digest: bytes32 = keccak256(concat(
+        b"\x19\x01",
+        self._domain_separator(),
+        keccak256(_abi_encode(PERMIT_TYPEHASH, _owner, _spender, _value, nonce, _deadline))
+    ))
+    assert ecrecover(digest, convert(_v, uint256), convert(_r, uint256), convert(_s, uint256)) == _owner # dev: invalid signature
+
+    self.nonces[_owner] = nonce + 1
+    self.allowance[_owner][_spender] = _value
+    log Approval(_owner, _spender, _value)
+    return True
+
+@external
+@view
+def DOMAIN_SEPARATOR() -> bytes32:
+    """
+    @notice EIP-712 domain separator
+    @return Domain separator
+    """
+    return self._domain_separator()
+
+@internal
+@view
+def _domain_separator() -> bytes32:
+    """
+    @notice EIP-712 domain separator, only recomputed if the chain id changed since deployment
+    """
+    if chain.id == cached_chain_id:
+        return cached_domain_separator
+    return keccak256(_abi_encode(EIP712_TYPEHASH, keccak256(name), keccak256(VERSION), chain.id, self))
+
 @external
 def set_management(_management: address):
     """
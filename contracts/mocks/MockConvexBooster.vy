@@ -0,0 +1,113 @@
+# @version 0.3.7
+"""
+@notice
+    Convex booster that deposits LP tokens into a Curve gauge and mints a deposit token 1:1.
+    Pools are added with an already deployed deposit token and rewards contract.
+    Pool id 0 is never used, as the CurveLP module treats it as unset
+"""
+
+from vyper.interfaces import ERC20
+
+interface Token:
+    def mint(_account: address, _value: uint256): nonpayable
+    def burn(_account: address, _value: uint256): nonpayable
+
+interface Gauge:
+    def deposit(_value: uint256): nonpayable
+    def withdraw(_value: uint256): nonpayable
+
+interface Minter:
+    def mint(_gauge: address): nonpayable
+
+interface Rewards:
+    def stakeFor(_for: address, _amount: uint256) -> bool: nonpayable
+    def queueNewRewards(_rewards: uint256) -> bool: nonpayable
+
+struct PoolInfo:
+    lptoken: address
+    token: address
+    gauge: address
+    crvRewards: address
+    stash: address
+    shutdown: bool
+
+crv: public(immutable(address))
+minter: public(immutable(address))
+poolInfo: public(HashMap[uint256, PoolInfo])
+poolLength: public(uint256)
+
+event Deposited:
+    user: indexed(address)
+    poolid: indexed(uint256)
+    amount: uint256
+
+event Withdrawn:
+    user: indexed(address)
+    poolid: indexed(uint256)
+    amount: uint256
+
+@external
+def __init__(_crv: address, _minter: address):
+    crv = _crv
+    minter = _minter
+    self.poolLength = 1
+
+@external
+def add_pool(_lp_token: address, _gauge: address, _token: address, _rewards: address) -> uint256:
+    pid: uint256 = self.poolLength
+    self.poolInfo[pid] = PoolInfo({
+        lptoken: _lp_token,
+        token: _token,
+        gauge: _gauge,
+        crvRewards: _rewards,
+        stash: empty(address),
+        shutdown: False,
+    })
+    self.poolLength = pid + 1
+    assert ERC20(_lp_token).approve(_gauge, max_value(uint256), default_return_value=True)
+    assert ERC20(_token).approve(_rewards, max_value(uint256), default_return_value=True)
+    return pid
+
+@external
+def deposit(_pid: uint256, _amount: uint256, _stake: bool) -> bool:
+    pool: PoolInfo = self.poolInfo[_pid]
+    assert pool.lptoken != empty(address) and not pool.shutdown
+    assert ERC20(pool.lptoken).transferFrom(msg.sender, self, _amount, default_return_value=True)
+    Gauge(pool.gauge).deposit(_amount)
+    if _stake:
+        Token(pool.token).mint(self, _amount)
+        Rewards(pool.crvRewards).stakeFor(msg.sender, _amount)
+    else:
+        Token(pool.token).mint(msg.sender, _amount)
+    log Deposited(msg.sender, _pid, _amount)
+    return True
+
+@external
+def withdraw(_pid: uint256, _amount: uint256) -> bool:
+    self._withdraw(_pid, _amount, msg.sender, msg.sender)
+    return True
+
+@external
+def withdrawTo(_pid: uint256, _amount: uint256, _to: address) -> bool:
+    # staked deposit tokens are held by the rewards contract
+    assert msg.sender == self.poolInfo[_pid].crvRewards
+    self._withdraw(_pid, _amount, msg.sender, _to)
+    return True
+
+@external
+def earmarkRewards(_pid: uint256) -> bool:
+    pool: PoolInfo = self.poolInfo[_pid]
+    Minter(minter).mint(pool.gauge)
+    amount: uint256 = ERC20(crv).balanceOf(self)
+    if amount > 0:
+        assert ERC20(crv).transfer(pool.crvRewards, amount, default_return_value=True)
+        Rewards(pool.crvRewards).queueNewRewards(amount)
+    return True
+
+@internal
+def _withdraw(_pid: uint256, _amount: uint256, _from: address, _to: address):
+    pool: PoolInfo = self.poolInfo[_pid]
+    Token(pool.token).burn(_from, _amount)
+    Gauge(pool.gauge).withdraw(_amount)
+    assert ERC20(pool.lptoken).transfer(_to, _amount, default_return_value=True)
+    log Withdrawn(_to, _pid, _amount)
@@ -0,0 +1,134 @@
+# @version 0.3.7
+"""
+@notice
+    Convex BaseRewardPool for a single booster pool.
+    Queued CRV is distributed immediately to the stakers at that moment.
+    Every claimed CRV also mints one CVX
+"""
+
+from vyper.interfaces import ERC20
+
+interface Booster:
+    def withdrawTo(_pid: uint256, _amount: uint256, _to: address) -> bool: nonpayable
+
+interface Token:
+    def mint(_account: address, _value: uint256): nonpayable
+
+operator: public(immutable(address))
+pid: public(immutable(uint256))
+stakingToken: public(immutable(address))
+rewardToken: public(immutable(address))
+cvx: public(immutable(address))
+
+totalSupply: public(uint256)
+balanceOf: public(HashMap[address, uint256])
+queuedRewards: public(uint256)
+rewardPerTokenStored: public(uint256)
+userRewardPerTokenPaid: public(HashMap[address, uint256])
+rewards: public(HashMap[address, uint256])
+
+PRECISION: constant(uint256) = 10**18
+
+event Staked:
+    user: indexed(address)
+    amount: uint256
+
+event Withdrawn:
+    user: indexed(address)
+    amount: uint256
+
+event RewardPaid:
+    user: indexed(address)
+    reward: uint256
+
+@external
+def __init__(_operator: address, _pid: uint256, _staking_token: address, _reward_token: address, _cvx: address):
+    operator = _operator
+    pid = _pid
+    stakingToken = _staking_token
+    rewardToken = _reward_token
+    cvx = _cvx
+
+@external
+@view
+def earned(_account: address) -> uint256:
+    return self._earned(_account)
+
+@external
+def stake(_amount: uint256) -> bool:
+    self._stake(msg.sender, msg.sender, _amount)
+    return True
+
+@external
+def stakeFor(_for: address, _amount: uint256) -> bool:
+    self._stake(msg.sender, _for, _amount)
+    return True
+
+@external
+def withdraw(_amount: uint256, _claim: bool) -> bool:
+    self._unstake(msg.sender, _amount)
+    assert ERC20(stakingToken).transfer(msg.sender, _amount, default_return_value=True)
+    if _claim:
+        self._get_reward(msg.sender)
+    return True
+
+@external
+def withdrawAndUnwrap(_amount: uint256, _claim: bool) -> bool:
+    self._unstake(msg.sender, _amount)
+    Booster(operator).withdrawTo(pid, _amount, msg.sender)
+    if _claim:
+        self._get_reward(msg.sender)
+    return True
+
+@external
+def getReward(_account: address, _claim_extras: bool) -> bool:
+    self._get_reward(_account)
+    return True
+
+@external
+def queueNewRewards(_rewards: uint256) -> bool:
+    assert msg.sender == operator
+    amount: uint256 = self.queuedRewards + _rewards
+    supply: uint256 = self.totalSupply
+    if supply == 0:
+        self.queuedRewards = amount
+        return True
+    self.queuedRewards = 0
+    self.rewardPerTokenStored += amount * PRECISION / supply
+    return True
+
+@internal
+@view
+def _earned(_account: address) -> uint256:
+    return self.balanceOf[_account] * (self.rewardPerTokenStored - self.userRewardPerTokenPaid[_account]) / PRECISION + self.rewards[_account]
+
+@internal
+def _update(_account: address):
+    self.rewards[_account] = self._earned(_account)
+    self.userRewardPerTokenPaid[_account] = self.rewardPerTokenStored
+
+@internal
+def _stake(_from: address, _for: address, _amount: uint256):
+    self._update(_for)
+    self.totalSupply += _amount
+    self.balanceOf[_for] += _amount
+    assert ERC20(stakingToken).transferFrom(_from, self, _amount, default_return_value=True)
+    log Staked(_for, _amount)
+
+@internal
+def _unstake(_account: address, _amount: uint256):
+    self._update(_account)
+    self.totalSupply -= _amount
+    self.balanceOf[_account] -= _amount
+    log Withdrawn(_account, _amount)
+
+@internal
+def _get_reward(_account: address):
+    self._update(_account)
+    reward: uint256 = self.rewards[_account]
+    if reward == 0:
+        return
+    self.rewards[_account] = 0
+    assert ERC20(rewardToken).transfer(_account, reward, default_return_value=True)
+    Token(cvx).mint(_account, reward)
+    log RewardPaid(_account, reward)
@@ -0,0 +1,215 @@
+# @version 0.3.7
+"""
+@notice
+    Curve plain pool with two coins, using the StableSwap math of the factory `Plain2Basic` implementation.
+    The pool is its own LP token. Fees stay in the pool, no admin fee is taken
+"""
+
+from vyper.interfaces import ERC20
+implements: ERC20
+
+N_COINS: constant(uint256) = 2
+A_PRECISION: constant(uint256) = 100
+FEE_DENOMINATOR: constant(uint256) = 10**10
+
+coins: public(address[N_COINS])
+balances: public(uint256[N_COINS])
+A: public(immutable(uint256))
+fee: public(immutable(uint256))
+
+totalSupply: public(uint256)
+balanceOf: public(HashMap[address, uint256])
+allowance: public(HashMap[address, HashMap[address, uint256]])
+
+name: public(constant(String[13])) = "MockCurvePool"
+symbol: public(constant(String[4])) = "MCRV"
+decimals: public(constant(uint8)) = 18
+
+event Transfer:
+    sender: indexed(address)
+    receiver: indexed(address)
+    value: uint256
+
+event Approval:
+    owner: indexed(address)
+    spender: indexed(address)
+    value: uint256
+
+event AddLiquidity:
+    provider: indexed(address)
+    token_amounts: uint256[N_COINS]
+    fees: uint256[N_COINS]
+    token_supply: uint256
+
+event RemoveLiquidity:
+    provider: indexed(address)
+    token_amounts: uint256[N_COINS]
+    token_supply: uint256
+
+event RemoveLiquidityImbalance:
+    provider: indexed(address)
+    token_amounts: uint256[N_COINS]
+    fees: uint256[N_COINS]
+    token_supply: uint256
+
+@external
+def __init__(_coins: address[N_COINS], _A: uint256, _fee: uint256):
+    """
+    @param _coins Pool coins
+    @param _A Amplification coefficient
+    @param _fee Fee, with 1e10 precision
+    """
+    self.coins = _coins
+    A = _A
+    fee = _fee
+
+@external
+@nonreentrant("lock")
+def add_liquidity(_amounts: uint256[N_COINS], _min_mint_amount: uint256, _receiver: address = msg.sender) -> uint256:
+    amp: uint256 = A * A_PRECISION
+    old_balances: uint256[N_COINS] = self.balances
+    D0: uint256 = self._get_D(old_balances, amp)
+    total_supply: uint256 = self.totalSupply
+
+    new_balances: uint256[N_COINS] = old_balances
+    for i in range(N_COINS):
+        if total_supply == 0:
+            assert _amounts[i] > 0 # dev: initial deposit requires all coins
+        new_balances[i] += _amounts[i]
+    D1: uint256 = self._get_D(new_balances, amp)
+    assert D1 > D0
+
+    fees: uint256[N_COINS] = empty(uint256[N_COINS])
+    mint_amount: uint256 = D1
+    self.balances = new_balances
+    if total_supply > 0:
+        base_fee: uint256 = fee * N_COINS / (4 * (N_COINS - 1))
+        for i in range(N_COINS):
+            ideal_balance: uint256 = D1 * old_balances[i] / D0
+            fees[i] = base_fee * self._diff(ideal_balance, new_balances[i]) / FEE_DENOMINATOR
+            new_balances[i] -= fees[i]
+        D2: uint256 = self._get_D(new_balances, amp)
+        mint_amount = total_supply * (D2 - D0) / D0
+    assert mint_amount >= _min_mint_amount, "Slippage screwed you"
+
+    for i in range(N_COINS):
+        if _amounts[i] > 0:
+            assert ERC20(self.coins[i]).transferFrom(msg.sender, self, _amounts[i], default_return_value=True)
+
+    total_supply += mint_amount
+    self.totalSupply = total_supply
+    self.balanceOf[_receiver] += mint_amount
+    log Transfer(empty(address), _receiver, mint_amount)
+    log AddLiquidity(msg.sender, _amounts, fees, total_supply)
+    return mint_amount
+
+@external
+@nonreentrant("lock")
+def remove_liquidity(_burn_amount: uint256, _min_amounts: uint256[N_COINS], _receiver: address = msg.sender) -> uint256[N_COINS]:
+    total_supply: uint256 = self.totalSupply
+    amounts: uint256[N_COINS] = empty(uint256[N_COINS])
+    for i in range(N_COINS):
+        old_balance: uint256 = self.balances[i]
+        value: uint256 = old_balance * _burn_amount / total_supply
+        assert value >= _min_amounts[i], "Withdrawal resulted in fewer coins than expected"
+        self.balances[i] = old_balance - value
+        amounts[i] = value
+        assert ERC20(self.coins[i]).transfer(_receiver, value, default_return_value=True)
+
+    total_supply -= _burn_amount
+    self.totalSupply = total_supply
+    self.balanceOf[msg.sender] -= _burn_amount
+    log Transfer(msg.sender, empty(address), _burn_amount)
+    log RemoveLiquidity(msg.sender, amounts, total_supply)
+    return amounts
+
+@external
+@nonreentrant("lock")
+def remove_liquidity_imbalance(_amounts: uint256[N_COINS], _max_burn_amount: uint256, _receiver: address = msg.sender) -> uint256:
+    amp: uint256 = A * A_PRECISION
+    old_balances: uint256[N_COINS] = self.balances
+    D0: uint256 = self._get_D(old_balances, amp)
+
+    new_balances: uint256[N_COINS] = old_balances
+    for i in range(N_COINS):
+        new_balances[i] -= _amounts[i]
+    D1: uint256 = self._get_D(new_balances, amp)
+
+    fees: uint256[N_COINS] = empty(uint256[N_COINS])
+    self.balances = new_balances
+    base_fee: uint256 = fee * N_COINS / (4 * (N_COINS - 1))
+    for i in range(N_COINS):
+        ideal_balance: uint256 = D1 * old_balances[i] / D0
+        fees[i] = base_fee * self._diff(ideal_balance, new_balances[i]) / FEE_DENOMINATOR
+        new_balances[i] -= fees[i]
+    D2: uint256 = self._get_D(new_balances, amp)
+
+    total_supply: uint256 = self.totalSupply
+    burn_amount: uint256 = (D0 - D2) * total_supply / D0 + 1
+    assert burn_amount > 1 # dev: zero tokens burned
+    assert burn_amount <= _max_burn_amount, "Slippage screwed you"
+
+    total_supply -= burn_amount
+    self.totalSupply = total_supply
+    self.balanceOf[msg.sender] -= burn_amount
+    log Transfer(msg.sender, empty(address), burn_amount)
+    for i in range(N_COINS):
+        if _amounts[i] > 0:
+            assert ERC20(self.coins[i]).transfer(_receiver, _amounts[i], default_return_value=True)
+    log RemoveLiquidityImbalance(msg.sender, _amounts, fees, total_supply)
+    return burn_amount
+
+@external
+@view
+def get_virtual_price() -> uint256:
+    D: uint256 = self._get_D(self.balances, A * A_PRECISION)
+    return D * 10**18 / self.totalSupply
+
+@external
+def transfer(_to: address, _value: uint256) -> bool:
+    self.balanceOf[msg.sender] -= _value
+    self.balanceOf[_to] += _value
+    log Transfer(msg.sender, _to, _value)
+    return True
+
+@external
+def transferFrom(_from: address, _to: address, _value: uint256) -> bool:
+    self.allowance[_from][msg.sender] -= _value
+    self.balanceOf[_from] -= _value
+    self.balanceOf[_to] += _value
+    log Transfer(_from, _to, _value)
+    return True
+
+@external
+def approve(_spender: address, _value: uint256) -> bool:
+    self.allowance[msg.sender][_spender] = _value
+    log Approval(msg.sender, _spender, _value)
+    return True
+
+@internal
+@pure
+def _diff(_a: uint256, _b: uint256) -> uint256:
+    if _a > _b:
+        return _a - _b
+    return _b - _a
+
+@internal
+@pure
+def _get_D(_xp: uint256[N_COINS], _amp: uint256) -> uint256:
+    S: uint256 = 0
+    for x in _xp:
+        S += x
+    if S == 0:
+        return 0
+
+    D: uint256 = S
+    Ann: uint256 = _amp * N_COINS
+    for i in range(255):
+        D_P: uint256 = D
+        for x in _xp:
+            D_P = D_P * D / (x * N_COINS)
+        Dprev: uint256 = D
+        D = (Ann * S / A_PRECISION + D_P * N_COINS) * D / ((Ann - A_PRECISION) * D / A_PRECISION + (N_COINS + 1) * D_P)
+        if self._diff(D, Dprev) <= 1:
+            return D
+    raise # dev: D did not converge
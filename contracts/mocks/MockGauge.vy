@@ -0,0 +1,72 @@
+# @version 0.3.7
+"""
+@notice
+    Curve liquidity gauge that accrues CRV at a fixed rate, shared pro rata between depositors.
+    Accrued amounts are minted by the minter
+"""
+
+from vyper.interfaces import ERC20
+
+lp_token: public(immutable(address))
+rate: public(immutable(uint256)) # CRV per second for the whole gauge
+totalSupply: public(uint256)
+balanceOf: public(HashMap[address, uint256])
+rewards_receiver: public(HashMap[address, address])
+
+last_checkpoint: public(uint256)
+integrate_inv_supply: public(uint256)
+integrate_inv_supply_of: public(HashMap[address, uint256])
+integrate_fraction: public(HashMap[address, uint256])
+
+PRECISION: constant(uint256) = 10**18
+
+event Deposit:
+    provider: indexed(address)
+    value: uint256
+
+event Withdraw:
+    provider: indexed(address)
+    value: uint256
+
+@external
+def __init__(_lp_token: address, _rate: uint256):
+    lp_token = _lp_token
+    rate = _rate
+    self.last_checkpoint = block.timestamp
+
+@external
+def deposit(_value: uint256, _addr: address = msg.sender):
+    self._checkpoint(_addr)
+    self.totalSupply += _value
+    self.balanceOf[_addr] += _value
+    assert ERC20(lp_token).transferFrom(msg.sender, self, _value, default_return_value=True)
+    log Deposit(_addr, _value)
+
+@external
+def withdraw(_value: uint256):
+    self._checkpoint(msg.sender)
+    self.totalSupply -= _value
+    self.balanceOf[msg.sender] -= _value
+    assert ERC20(lp_token).transfer(msg.sender, _value, default_return_value=True)
+    log Withdraw(msg.sender, _value)
+
+@external
+def user_checkpoint(_addr: address) -> bool:
+    self._checkpoint(_addr)
+    return True
+
+@external
+def set_rewards_receiver(_receiver: address):
+    self.rewards_receiver[msg.sender] = _receiver
+
+@internal
+def _checkpoint(_addr: address):
+    integral: uint256 = self.integrate_inv_supply
+    supply: uint256 = self.totalSupply
+    if supply > 0:
+        integral += rate * (block.timestamp - self.last_checkpoint) * PRECISION / supply
+        self.integrate_inv_supply = integral
+    self.last_checkpoint = block.timestamp
+
+    self.integrate_fraction[_addr] += self.balanceOf[_addr] * (integral - self.integrate_inv_supply_of[_addr]) / PRECISION
+    self.integrate_inv_supply_of[_addr] = integral
@@ -0,0 +1,30 @@
+# @version 0.3.7
+
+interface Gauge:
+    def user_checkpoint(_addr: address) -> bool: nonpayable
+    def integrate_fraction(_addr: address) -> uint256: view
+
+interface Token:
+    def mint(_account: address, _value: uint256): nonpayable
+
+token: public(immutable(address))
+minted: public(HashMap[address, HashMap[address, uint256]]) # user => gauge => amount
+
+event Minted:
+    recipient: indexed(address)
+    gauge: address
+    minted: uint256
+
+@external
+def __init__(_token: address):
+    token = _token
+
+@external
+def mint(_gauge: address):
+    Gauge(_gauge).user_checkpoint(msg.sender)
+    total: uint256 = Gauge(_gauge).integrate_fraction(msg.sender)
+    amount: uint256 = total - self.minted[msg.sender][_gauge]
+    if amount > 0:
+        Token(token).mint(msg.sender, amount)
+        self.minted[msg.sender][_gauge] = total
+        log Minted(msg.sender, _gauge, total)
@@ -0,0 +1,28 @@
+# @version 0.3.7
+
+# `aggregate3` of Multicall3, with bounded call and return data
+
+MAX_CALLS: constant(uint256) = 256
+MAX_CALL_SIZE: constant(uint256) = 132
+MAX_RETURN_SIZE: constant(uint256) = 64
+
+struct Call3:
+    target: address
+    allowFailure: bool
+    callData: Bytes[MAX_CALL_SIZE]
+
+struct Result:
+    success: bool
+    returnData: Bytes[MAX_RETURN_SIZE]
+
+@external
+@view
+def aggregate3(_calls: DynArray[Call3, MAX_CALLS]) -> DynArray[Result, MAX_CALLS]:
+    results: DynArray[Result, MAX_CALLS] = []
+    for c in _calls:
+        success: bool = False
+        data: Bytes[MAX_RETURN_SIZE] = b''
+        success, data = raw_call(c.target, c.callData, max_outsize=MAX_RETURN_SIZE, is_static_call=True, revert_on_failure=False)
+        assert success or c.allowFailure # dev: call failed
+        results.append(Result({success: success, returnData: data}))
+    return results
@@ -0,0 +1,69 @@
+# @version 0.3.7
+"""
+@notice Token that calls back into a target once on its next transfer, like a token with transfer hooks
+"""
+
+from vyper.interfaces import ERC20
+implements: ERC20
+
+totalSupply: public(uint256)
+balanceOf: public(HashMap[address, uint256])
+allowance: public(HashMap[address, HashMap[address, uint256]])
+callback_target: public(address)
+callback_data: public(Bytes[1024])
+callback_success: public(bool)
+
+event Transfer:
+    sender: indexed(address)
+    receiver: indexed(address)
+    value: uint256
+
+event Approval:
+    owner: indexed(address)
+    spender: indexed(address)
+    value: uint256
+
+@external
+def transfer(_to: address, _value: uint256) -> bool:
+    assert _to != empty(address)
+    self.balanceOf[msg.sender] -= _value
+    self.balanceOf[_to] += _value
+    log Transfer(msg.sender, _to, _value)
+
+    target: address = self.callback_target
+    if target != empty(address):
+        self.callback_target = empty(address)
+        success: bool = False
+        response: Bytes[32] = b""
+        success, response = raw_call(target, self.callback_data, max_outsize=32, revert_on_failure=False)
+        self.callback_success = success
+    return True
+
+@external
+def transferFrom(_from: address, _to: address, _value: uint256) -> bool:
+    assert _to != empty(address)
+    self.allowance[_from][msg.sender] -= _value
+    self.balanceOf[_from] -= _value
+    self.balanceOf[_to] += _value
+    log Transfer(_from, _to, _value)
+    return True
+
+@external
+def approve(_spender: address, _value: uint256) -> bool:
+    self.allowance[msg.sender][_spender] = _value
+    log Approval(msg.sender, _spender, _value)
+    return True
+
+@external
+def mint(_account: address, _value: uint256):
+    self.totalSupply += _value
+    self.balanceOf[_account] += _value
+    log Transfer(empty(address), _account, _value)
+
+@external
+def set_callback(_target: address, _data: Bytes[1024]):
+    """
+    @notice Call the target with the data during the next transfer
+    """
+    self.callback_target = _target
+    self.callback_data = _data
@@ -6,6 +6,7 @@ implements: ERC20
 totalSupply: public(uint256)
 balanceOf: public(HashMap[address, uint256])
 allowance: public(HashMap[address, HashMap[address, uint256]])
+minter: public(address) # anyone can mint while unset
 
 name: public(constant(String[9])) = "MockToken"
 symbol: public(constant(String[4])) = "MOCK"
@@ -48,8 +49,13 @@ def approve(_spender: address, _value: uint256) -> bool:
     log Approval(msg.sender, _spender, _value)
     return True
 
+@external
+def set_minter(_minter: address):
+    self.minter = _minter
+
 @external
 def mint(_account: address, _value: uint256):
+    assert msg.sender == self.minter or self.minter == empty(address)
     self.totalSupply += _value
     self.balanceOf[_account] += _value
     log Transfer(empty(address), _account, _value)
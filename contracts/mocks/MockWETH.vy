@@ -0,0 +1,66 @@
+# @version 0.3.7
+
+from vyper.interfaces import ERC20
+implements: ERC20
+
+totalSupply: public(uint256)
+balanceOf: public(HashMap[address, uint256])
+allowance: public(HashMap[address, HashMap[address, uint256]])
+
+name: public(constant(String[13])) = "Wrapped Ether"
+symbol: public(constant(String[4])) = "WETH"
+decimals: public(constant(uint8)) = 18
+
+event Transfer:
+    sender: indexed(address)
+    receiver: indexed(address)
+    value: uint256
+
+event Approval:
+    owner: indexed(address)
+    spender: indexed(address)
+    value: uint256
+
+@external
+@payable
+def __default__():
+    self._deposit(msg.sender, msg.value)
+
+@external
+@payable
+def deposit():
+    self._deposit(msg.sender, msg.value)
+
+@external
+def withdraw(_value: uint256):
+    self.totalSupply -= _value
+    self.balanceOf[msg.sender] -= _value
+    log Transfer(msg.sender, empty(address), _value)
+    raw_call(msg.sender, b"", value=_value)
+
+@external
+def transfer(_to: address, _value: uint256) -> bool:
+    self.balanceOf[msg.sender] -= _value
+    self.balanceOf[_to] += _value
+    log Transfer(msg.sender, _to, _value)
+    return True
+
+@external
+def transferFrom(_from: address, _to: address, _value: uint256) -> bool:
+    self.allowance[_from][msg.sender] -= _value
+    self.balanceOf[_from] -= _value
+    self.balanceOf[_to] += _value
+    log Transfer(_from, _to, _value)
+    return True
+
+@external
+def approve(_spender: address, _value: uint256) -> bool:
+    self.allowance[msg.sender][_spender] = _value
+    log Approval(msg.sender, _spender, _value)
+    return True
+
+@internal
+def _deposit(_account: address, _value: uint256):
+    self.totalSupply += _value
+    self.balanceOf[_account] += _value
+    log Transfer(empty(address), _account, _value)
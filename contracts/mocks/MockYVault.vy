@@ -0,0 +1,81 @@
+# @version 0.3.7
+"""
+@notice
+    Yearn vault without strategies. All assets stay idle in the vault, withdrawals only
+    take a loss when one is set
+"""
+
+from vyper.interfaces import ERC20
+
+token: public(immutable(address))
+totalSupply: public(uint256)
+balanceOf: public(HashMap[address, uint256])
+loss: public(uint256) # bps of every withdrawal that is lost
+
+event Transfer:
+    sender: indexed(address)
+    receiver: indexed(address)
+    value: uint256
+
+@external
+def __init__(_token: address):
+    token = _token
+
+@external
+@view
+def totalAssets() -> uint256:
+    return ERC20(token).balanceOf(self)
+
+@external
+@view
+def pricePerShare() -> uint256:
+    supply: uint256 = self.totalSupply
+    if supply == 0:
+        return 10**18
+    return ERC20(token).balanceOf(self) * 10**18 / supply
+
+@external
+def deposit(_amount: uint256 = max_value(uint256), _recipient: address = msg.sender) -> uint256:
+    amount: uint256 = _amount
+    if amount == max_value(uint256):
+        amount = ERC20(token).balanceOf(msg.sender)
+    shares: uint256 = amount
+    supply: uint256 = self.totalSupply
+    if supply > 0:
+        shares = amount * supply / ERC20(token).balanceOf(self)
+    assert shares > 0
+
+    self.totalSupply = supply + shares
+    self.balanceOf[_recipient] += shares
+    log Transfer(empty(address), _recipient, shares)
+    assert ERC20(token).transferFrom(msg.sender, self, amount, default_return_value=True)
+    return shares
+
+@external
+def withdraw(_shares: uint256 = max_value(uint256), _recipient: address = msg.sender, _max_loss: uint256 = 1) -> uint256:
+    shares: uint256 = _shares
+    if shares == max_value(uint256):
+        shares = self.balanceOf[msg.sender]
+    supply: uint256 = self.totalSupply
+    amount: uint256 = shares * ERC20(token).balanceOf(self) / supply
+    loss: uint256 = amount * self.loss / 10_000
+    assert loss <= amount * _max_loss / 10_000
+    amount -= loss
+
+    self.totalSupply = supply - shares
+    self.balanceOf[msg.sender] -= shares
+    log Transfer(msg.sender, empty(address), shares)
+    assert ERC20(token).transfer(_recipient, amount, default_return_value=True)
+    return amount
+
+@external
+def set_loss(_loss: uint256):
+    assert _loss <= 10_000
+    self.loss = _loss
+
+@external
+def transfer(_to: address, _value: uint256) -> bool:
+    self.balanceOf[msg.sender] -= _value
+    self.balanceOf[_to] += _value
+    log Transfer(msg.sender, _to, _value)
+    return True
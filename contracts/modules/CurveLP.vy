@@ -7,6 +7,7 @@
     Module to manage the POL's yETH/ETH position.
     Controlled by two roles: management and operator.
     Operator can deposit/withdraw into Curve and subsequently into gauge/Convex/yVault.
+    Zaps run the full path from POL into a destination, or back, in a single transaction.
     Management can set relevant addresses
 """
 
@@ -121,6 +122,16 @@ NATIVE: constant(address) = 0x0000000000000000000000000000000000000000
 MINT: constant(address)   = 0x0000000000000000000000000000000000000001
 BURN: constant(address)   = 0x0000000000000000000000000000000000000002
 
+# zap destinations/sources, matching the pool index in `Deposit` and `Withdraw` events
+GAUGE: constant(uint256)          = 0
+CONVEX_BOOSTER: constant(uint256) = 1
+CONVEX_REWARDS: constant(uint256) = 2
+YVAULT: constant(uint256)         = 3
+LP: constant(uint256)             = 4 # Curve LP tokens held by this contract
+
+MAX_CALLS: constant(uint256) = 16
+MAX_CALL_SIZE: constant(uint256) = 260
+
 @external
 def __init__(_token: address, _pol: address, _weth: address, _crv: address):
     """
@@ -145,6 +156,18 @@ def __default__():
     """
     pass
 
+@external
+def multicall(_calls: DynArray[Bytes[MAX_CALL_SIZE], MAX_CALLS]):
+    """
+    @notice Execute multiple calls to this contract in a single transaction
+    @param _calls ABI encoded calls, including function selector
+    @dev 
+        Calls are delegated to this contract, so each function applies its own 
+        permission checks on the original caller. Reverts if any of the calls reverts
+    """
+    for data in _calls:
+        raw_call(self, data, is_delegate_call=True)
+
 @external
 def from_pol(_token: address, _amount: uint256):
     """
@@ -577,3 +600,98 @@ def withdraw_yvault(_shares: uint256, _max_loss: uint256, _vault: address = empt
 
     amount: uint256 = YVault(vault).withdraw(_shares, self, _max_loss)
     log Withdraw(3, _shares, amount)
+
+# ZAP FUNCTIONS
+
+@external
+def zap_in(_eth_amount: uint256, _yeth_amount: uint256, _min_lp: uint256, _destination: uint256) -> uint256:
+    """
+    @notice
+        Take ETH and newly minted yETH from POL, add them as liquidity to the Curve pool
+        and deposit the LP tokens into the destination, all in a single transaction
+    @param _eth_amount Amount of ETH to take from POL
+    @param _yeth_amount Amount of yETH to mint in POL and take from it
+    @param _min_lp Minimum amount of LP tokens to receive
+    @param _destination 
+        Where to deposit the LP tokens: 0 = gauge, 1 = Convex booster, 
+        2 = Convex booster and staked in rewards contract, 3 = yVault, 4 = keep LP tokens
+    @return Amount of LP tokens added
+    @dev Requires the same allowances as the individual steps
+    """
+    assert msg.sender == self.operator
+    assert _destination <= LP # dev: invalid destination
+
+    if _eth_amount > 0:
+        POL(pol).send_native(self, _eth_amount)
+        log FromPOL(NATIVE, _eth_amount)
+        WETH(weth).deposit(value=_eth_amount)
+    if _yeth_amount > 0:
+        POL(pol).mint(_yeth_amount)
+        log FromPOL(MINT, _yeth_amount)
+        assert ERC20(token).transferFrom(pol, self, _yeth_amount, default_return_value=True)
+        log FromPOL(token, _yeth_amount)
+
+    amounts: uint256[2] = [_eth_amount, _yeth_amount]
+    lp: uint256 = CurvePool(self.pool).add_liquidity(amounts, _min_lp)
+    log AddLiquidity(amounts, lp)
+
+    if _destination == GAUGE:
+        CurveGauge(self.gauge).deposit(lp)
+        log Deposit(GAUGE, lp, lp)
+    elif _destination == CONVEX_BOOSTER or _destination == CONVEX_REWARDS:
+        pool_id: uint256 = self.convex_pool_id
+        assert pool_id != 0
+        ConvexBooster(self.convex_booster).deposit(pool_id, lp, _destination == CONVEX_REWARDS)
+        log Deposit(CONVEX_BOOSTER, lp, lp)
+    elif _destination == YVAULT:
+        shares: uint256 = YVault(self.yvault).deposit(lp)
+        log Deposit(YVAULT, lp, shares)
+    return lp
+
+@external
+def zap_out(_amount: uint256, _source: uint256, _min_amounts: uint256[2], _max_loss: uint256 = 1) -> uint256[2]:
+    """
+    @notice
+        Withdraw LP tokens from the source, remove liquidity from the Curve pool and 
+        return the ETH and yETH to POL, all in a single transaction. 
+        Returned yETH is not burned, use `from_pol` to burn it
+    @param _amount Amount to withdraw from the source. Shares in case of the yVault
+    @param _source 
+        Where to withdraw the LP tokens from: 0 = gauge, 1 = Convex booster,
+        2 = Convex rewards contract, 3 = yVault, 4 = LP tokens held by this contract
+    @param _min_amounts Minimum amounts of ETH and yETH to receive
+    @param _max_loss Max loss in bps when withdrawing from the yVault. Defaults to the vault's default of 1 bps
+    @return Amounts of ETH and yETH returned to POL
+    @dev Requires the same allowances as the individual steps
+    """
+    assert msg.sender == self.operator
+    assert _source <= LP # dev: invalid source
+
+    lp: uint256 = _amount
+    if _source == GAUGE:
+        CurveGauge(self.gauge).withdraw(_amount)
+        log Withdraw(GAUGE, _amount, _amount)
+    elif _source == CONVEX_BOOSTER:
+        pool_id: uint256 = self.convex_pool_id
+        assert pool_id != 0
+        ConvexBooster(self.convex_booster).withdraw(pool_id, _amount)
+        log Withdraw(CONVEX_BOOSTER, _amount, _amount)
+    elif _source == CONVEX_REWARDS:
+        ConvexRewards(self.convex_rewards).withdrawAndUnwrap(_amount, True)
+        log Withdraw(CONVEX_BOOSTER, _amount, _amount)
+        log Withdraw(CONVEX_REWARDS, _amount, _amount)
+    elif _source == YVAULT:
+        lp = YVault(self.yvault).withdraw(_amount, self, _max_loss)
+        log Withdraw(YVAULT, _amount, lp)
+
+    amounts: uint256[2] = CurvePool(self.pool).remove_liquidity(lp, _min_amounts)
+    log RemoveLiquidity(lp, amounts)
+
+    if amounts[0] > 0:
+        WETH(weth).withdraw(amounts[0])
+        POL(pol).receive_native(value=amounts[0])
+        log ToPOL(NATIVE, amounts[0])
+    if amounts[1] > 0:
+        assert ERC20(token).transfer(pol, amounts[1], default_return_value=True)
+        log ToPOL(token, amounts[1])
+    return amounts
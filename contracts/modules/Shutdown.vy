@@ -46,6 +46,40 @@ def __init__(_token: address, _bootstrap: address, _pol: address):
 
 @external
 def redeem(_amount: uint256, _receiver: address = msg.sender):
+    """
+    @notice Redeem yETH for ETH 1:1
+    @param _amount of yETH to redeem
+    @param _receiver Account to send ETH to
+    """
+    self._redeem(_amount, _receiver)
+
+@external
+def redeem_with_permit(_amount: uint256, _deadline: uint256, _v: uint8, _r: bytes32, _s: bytes32, _receiver: address = msg.sender):
+    """
+    @notice Redeem yETH for ETH 1:1, using an EIP-2612 signature instead of a prior approval
+    @param _amount of yETH to redeem
+    @param _deadline Deadline of the permit signature
+    @param _v Recovery id of the permit signature
+    @param _r First 32 bytes of the permit signature
+    @param _s Second 32 bytes of the permit signature
+    @param _receiver Account to send ETH to
+    @dev
+        A failing permit is accepted if the allowance is already sufficient.
+        This prevents griefing by submitting the signature to the token before the redemption
+    """
+    success: bool = raw_call(
+        token,
+        _abi_encode(
+            msg.sender, self, _amount, _deadline, _v, _r, _s,
+            method_id=method_id("permit(address,address,uint256,uint256,uint8,bytes32,bytes32)")
+        ),
+        revert_on_failure=False
+    )
+    assert success or ERC20(token).allowance(msg.sender, self) >= _amount # dev: permit failed
+    self._redeem(_amount, _receiver)
+
+@internal
+def _redeem(_amount: uint256, _receiver: address):
     """
     @notice Redeem yETH for ETH 1:1
     @param _amount of yETH to redeem
@@ -45,6 +45,9 @@ event PendingTreasury:
 event SetTreasury:
     treasury: indexed(address)
 
+MAX_CALLS: constant(uint256) = 16
+MAX_CALL_SIZE: constant(uint256) = 260
+
 @external
 def __init__(_pol: address, _treasury: address):
     """
@@ -64,6 +67,18 @@ def __default__():
     """
     pass
 
+@external
+def multicall(_calls: DynArray[Bytes[MAX_CALL_SIZE], MAX_CALLS]):
+    """
+    @notice Execute multiple calls to this contract in a single transaction
+    @param _calls ABI encoded calls, including function selector
+    @dev 
+        Calls are delegated to this contract, so each function applies its own 
+        permission checks on the original caller. Reverts if any of the calls reverts
+    """
+    for data in _calls:
+        raw_call(self, data, is_delegate_call=True)
+
 @external
 def from_pol(_token: address, _amount: uint256):
     """
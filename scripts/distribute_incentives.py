@@ -0,0 +1,88 @@
+"""
+Keeper driver that pushes winner incentives to voters that never claimed them.
+Voters are read from `Vote` events and sent to `distribute_incentive` in batches
+that are sized to stay below a gas target.
+
+    ape run distribute_incentives --bootstrap <address> --protocol <address> --incentive <address>
+"""
+
+import click
+from ape import chain, project
+from ape.cli import ConnectedProviderCommand, account_option
+
+MAX_BATCH = 256
+GAS_TARGET = 10_000_000
+PROBE_SIZE = 16
+
+def voters(bootstrap, start_block=0, stop_block=None):
+    """
+    Unique voters in order of their first `Vote` event
+    """
+    seen = set()
+    if stop_block is None:
+        stop_block = chain.blocks.height
+    for log in bootstrap.Vote.range(start_block, stop_block + 1):
+        if log.voter in seen:
+            continue
+        seen.add(log.voter)
+        yield log.voter
+
+def pending_claimers(bootstrap, protocol, incentive, accounts):
+    """
+    Accounts that still have a non-zero claim on the incentive
+    """
+    return [account for account in accounts if bootstrap.claimable_incentive(protocol, incentive, account) > 0]
+
+def estimate(bootstrap, protocol, incentive, claimers, sender):
+    return bootstrap.distribute_incentive.estimate_gas_cost(protocol, incentive, claimers, sender=sender)
+
+def batch_size(bootstrap, protocol, incentive, claimers, sender, gas_target=GAS_TARGET):
+    """
+    Number of claimers that fit in a single transaction below the gas target,
+    extrapolated from the marginal cost of a probe batch
+    """
+    if len(claimers) <= 1:
+        return len(claimers)
+    probe = claimers[:PROBE_SIZE]
+    base = estimate(bootstrap, protocol, incentive, probe[:1], sender)
+    total = estimate(bootstrap, protocol, incentive, probe, sender)
+    marginal = max((total - base) // (len(probe) - 1), 1)
+    size = (gas_target - base) // marginal + 1
+    return max(min(size, MAX_BATCH, len(claimers)), 1)
+
+def batches(bootstrap, protocol, incentive, claimers, sender, gas_target=GAS_TARGET):
+    """
+    Split claimers into batches, halving any batch whose estimate exceeds the gas target
+    """
+    size = batch_size(bootstrap, protocol, incentive, claimers, sender, gas_target)
+    i = 0
+    while i < len(claimers):
+        batch = claimers[i:i+size]
+        while len(batch) > 1 and estimate(bootstrap, protocol, incentive, batch, sender) > gas_target:
+            batch = batch[:len(batch) // 2]
+        yield batch
+        i += len(batch)
+
+def distribute(bootstrap, protocol, incentive, sender, start_block=0, gas_target=GAS_TARGET):
+    """
+    Distribute the incentive to all voters that have not claimed yet
+    @return Transaction receipts
+    """
+    claimers = pending_claimers(bootstrap, protocol, incentive, voters(bootstrap, start_block))
+    receipts = []
+    for batch in batches(bootstrap, protocol, incentive, claimers, sender, gas_target):
+        receipts.append(bootstrap.distribute_incentive(protocol, incentive, batch, sender=sender))
+    return receipts
+
+@click.command(cls=ConnectedProviderCommand)
+@account_option()
+@click.option('--bootstrap', required=True, help='Bootstrap address')
+@click.option('--protocol', required=True, help='Winning protocol address')
+@click.option('--incentive', required=True, help='Incentive token address')
+@click.option('--start-block', default=0, help='Block to start reading votes from')
+@click.option('--gas-target', default=GAS_TARGET, help='Gas limit to stay below per transaction')
+def cli(account, bootstrap, protocol, incentive, start_block, gas_target):
+    bootstrap = project.Bootstrap.at(bootstrap)
+    for receipt in distribute(bootstrap, protocol, incentive, account, start_block, gas_target):
+        claims = receipt.decode_logs(bootstrap.ClaimIncentive)
+        click.echo(f'{receipt.txn_hash}: {len(claims)} claimers, {receipt.gas_used} gas')
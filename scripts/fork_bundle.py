@@ -0,0 +1,147 @@
+"""
+Offline bundles of mainnet-fork state.
+A bundle holds the accounts and storage slots of every mainnet contract that a fork session
+touched. The values are read back at the fork block, so state that the tests changed does not
+leak into the bundle. It also holds the contract types of the contracts that tests look up by
+address. Loading a bundle into a plain local anvil node with `anvil_loadState` recreates those
+contracts without an upstream RPC or explorer.
+
+Record by running the fork tests once with isolation disabled, so that anvil keeps every account
+it fetched from upstream:
+
+    ape test tests/pol_curve_lp.py --network ethereum:mainnet-fork --disable-isolation --record-state tests/data/pol_curve_lp.json.gz
+
+Load into a running anvil node, or export a state file for `anvil --load-state`:
+
+    ape run fork_bundle load --bundle tests/data/pol_curve_lp.json.gz
+    ape run fork_bundle export --bundle tests/data/pol_curve_lp.json.gz --output state.json
+"""
+
+import gzip
+import json
+
+import click
+from ape import chain
+from ape.cli import ConnectedProviderCommand
+from ethpm_types import ContractType
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+def _request(method, *params):
+    return chain.provider.make_request(method, list(params))
+
+def _word(value):
+    if isinstance(value, int):
+        return f'0x{value:064x}'
+    return f'0x{int(value, 16):064x}'
+
+def decode_state(data):
+    """
+    Decode the output of `anvil_dumpState`, which is hex encoded and usually gzipped JSON
+    """
+    raw = bytes.fromhex(data[2:] if data.startswith('0x') else data)
+    if raw[:2] == GZIP_MAGIC:
+        raw = gzip.decompress(raw)
+    return json.loads(raw)
+
+def encode_state(accounts):
+    """
+    Encode accounts as input for `anvil_loadState`
+    """
+    return '0x' + gzip.compress(json.dumps({'accounts': accounts}).encode()).hex()
+
+def fork_block():
+    """
+    Block the connected fork provider forked from
+    """
+    block = getattr(chain.provider, 'fork_block_number', None)
+    if block is None:
+        block = _request('anvil_nodeInfo')['forkConfig']['forkBlockNumber']
+    return block
+
+def snapshot_account(address, slots, block):
+    """
+    Read an account and a set of its storage slots at a block
+    @return Account in `anvil_loadState` format, or None if there is no contract at the address
+    """
+    block = hex(block)
+    code = _request('eth_getCode', address, block)
+    if code in ('0x', '', None):
+        return None
+    storage = {}
+    for slot in slots:
+        value = int(_request('eth_getStorageAt', address, _word(slot), block), 16)
+        if value > 0:
+            storage[_word(slot)] = _word(value)
+    return {
+        'nonce': int(_request('eth_getTransactionCount', address, block), 16),
+        'balance': hex(int(_request('eth_getBalance', address, block), 16)),
+        'code': code,
+        'storage': storage,
+    }
+
+def record(addresses=(), block=None):
+    """
+    Build a bundle from the accounts the connected fork node has loaded so far
+    @param addresses Contracts whose contract types to include
+    @param block Block to read state at, defaults to the fork block
+    """
+    if block is None:
+        block = fork_block()
+    dump = decode_state(_request('anvil_dumpState'))
+    accounts = {}
+    for address, account in dump['accounts'].items():
+        account = snapshot_account(address, account.get('storage', {}), block)
+        if account is not None:
+            accounts[address.lower()] = account
+    contract_types = {}
+    for address in addresses:
+        contract_type = chain.contracts.get(address)
+        if contract_type is None:
+            raise ValueError(f'no contract type for {address}')
+        contract_types[address] = contract_type.model_dump(mode='json', by_alias=True)
+    return {
+        'chain_id': chain.provider.chain_id,
+        'block_number': block,
+        'timestamp': chain.provider.get_block(block).timestamp,
+        'accounts': accounts,
+        'contract_types': contract_types,
+    }
+
+def load(bundle):
+    """
+    Load a bundle into the connected anvil node and cache its contract types
+    """
+    _request('anvil_loadState', encode_state(bundle['accounts']))
+    for address, contract_type in bundle['contract_types'].items():
+        chain.contracts[address] = ContractType.model_validate(contract_type)
+    if chain.pending_timestamp < bundle['timestamp']:
+        chain.pending_timestamp = bundle['timestamp']
+
+def write(bundle, path):
+    with gzip.open(path, 'wt') as f:
+        json.dump(bundle, f)
+
+def read(path):
+    with gzip.open(path, 'rt') as f:
+        return json.load(f)
+
+@click.group()
+def cli():
+    pass
+
+@cli.command(name='load', cls=ConnectedProviderCommand)
+@click.option('--bundle', required=True, help='Bundle to load')
+def load_cmd(bundle):
+    bundle = read(bundle)
+    load(bundle)
+    click.echo(f'loaded {len(bundle["accounts"])} accounts from block {bundle["block_number"]}')
+
+@cli.command(name='export')
+@click.option('--bundle', required=True, help='Bundle to export')
+@click.option('--output', required=True, help='State file to write')
+def export_cmd(bundle, output):
+    bundle = read(bundle)
+    with open(output, 'w') as f:
+        json.dump({'accounts': bundle['accounts']}, f)
+    click.echo(f'exported {len(bundle["accounts"])} accounts to {output}')
@@ -0,0 +1,82 @@
+"""
+Gas baselines and regression reports.
+Benchmarks in `tests/test_gas.py` record the gas used by every measured call under a key
+`Contract.function[parameters]`. A run can be compared against the committed baseline, failing
+every benchmark that uses more gas than the baseline plus a threshold in percent:
+
+    ape test tests/test_gas.py --gas-baseline tests/gas_baseline.json --gas-threshold 2
+
+Write the results of a run with `--gas-output`, which also updates the baseline when pointed at it.
+Two result files can be compared without running the tests:
+
+    ape run gas --baseline tests/gas_baseline.json --results gas.json
+"""
+
+import json
+
+import click
+
+THRESHOLD = 1.0 # percent
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def save(results, path):
+    with open(path, 'w') as f:
+        json.dump(dict(sorted(results.items())), f, indent=2)
+        f.write('\n')
+
+def change(before, after):
+    """
+    Relative change in percent
+    """
+    if before == 0:
+        return 0.0 if after == 0 else float('inf')
+    return (after - before) * 100 / before
+
+def regressed(before, after, threshold=THRESHOLD):
+    return change(before, after) > threshold
+
+def compare(baseline, results):
+    """
+    Compare results against a baseline
+    @return List of (key, baseline gas, current gas) for every key in either, None where missing
+    """
+    keys = sorted(set(baseline) | set(results))
+    return [(key, baseline.get(key), results.get(key)) for key in keys]
+
+def report(baseline, results, threshold=THRESHOLD):
+    """
+    Table of gas differences, with regressions past the threshold marked
+    """
+    rows = []
+    for key, before, after in compare(baseline, results):
+        if before is None:
+            rows.append((key, '', str(after), 'new'))
+        elif after is None:
+            rows.append((key, str(before), '', 'removed'))
+        elif before != after:
+            mark = ' !' if regressed(before, after, threshold) else ''
+            rows.append((key, str(before), str(after), f'{change(before, after):+.2f}%{mark}'))
+    if len(rows) == 0:
+        return f'no gas changes in {len(results)} benchmarks'
+    header = ('benchmark', 'baseline', 'current', 'change')
+    widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header))]
+    lines = [
+        f'{key:<{widths[0]}}  {before:>{widths[1]}}  {after:>{widths[2]}}  {diff:>{widths[3]}}'
+        for key, before, after, diff in [header] + rows
+    ]
+    return '\n'.join(lines)
+
+@click.command()
+@click.option('--baseline', required=True, help='Baseline gas file')
+@click.option('--results', required=True, help='Gas file to compare against the baseline')
+@click.option('--threshold', default=THRESHOLD, help='Allowed increase in percent')
+def cli(baseline, results, threshold):
+    baseline = load(baseline)
+    results = load(results)
+    click.echo(report(baseline, results, threshold))
+    failed = [key for key, before, after in compare(baseline, results) if before is not None and after is not None and regressed(before, after, threshold)]
+    if failed:
+        raise click.ClickException(f'{len(failed)} benchmarks regressed by more than {threshold}%')
@@ -0,0 +1,273 @@
+"""
+Per-line gas profiles of transactions, from opcode traces of a local foundry node.
+The struct log trace of `debug_traceTransaction` is mapped back to Vyper source lines through the
+uncompressed source map of the compiler, which holds the source position of program counters. The
+compressed source map in the build artifacts has one entry per assembly item rather than per
+instruction, so it cannot be matched to program counters. Instructions without a position are
+charged to the line executed last in their call frame. Every opcode is charged its own cost. A call
+is charged the gas it used minus the gas spent inside the callee, which is charged to the callee's
+lines instead.
+
+Two reports are written: folded stacks of contract, function and line for `flamegraph.pl` or
+speedscope, and the executed functions of every contract with the gas of each line and the count
+and cost of its `SLOAD`, `SSTORE` and calls. Profile the transactions sent by the chosen tests, or
+transactions by hash:
+
+    ape test tests/test_gas.py -k vote --network ethereum:local:foundry --gas-profile profile
+    ape run gas_profile --network ethereum:local:foundry --tx <hash> --output profile
+
+Code that runs before any line of a call frame, such as the selector table, is charged to
+`<compiler>`, and the intrinsic gas of a transaction to `<intrinsic>`. Refunds are settled at the
+end of a transaction and are not attributed to lines.
+"""
+
+import bisect
+import json
+import re
+import shutil
+from collections import Counter
+
+import click
+import vvm
+from ape import chain, project
+from ape.cli import ConnectedProviderCommand
+from eth_utils import to_hex
+from packaging.version import Version
+
+CALLS = {'CALL', 'CALLCODE', 'DELEGATECALL', 'STATICCALL'}
+CREATES = {'CREATE', 'CREATE2'}
+COLUMNS = ['SLOAD', 'SSTORE', 'CALL']
+TRACE_OPTIONS = {'disableStorage': True, 'enableMemory': False, 'enableReturnData': False}
+FUNCTION = re.compile(r'def\s+(\w+)\s*\(')
+VERSION = re.compile(r'#\s*@version\s+([\w.]+)')
+
+def _hash(tx_hash):
+    return tx_hash if isinstance(tx_hash, str) else to_hex(tx_hash)
+
+def trace(tx_hash):
+    """
+    Struct logs of a transaction
+    """
+    return chain.provider.make_request('debug_traceTransaction', [_hash(tx_hash), TRACE_OPTIONS])['structLogs']
+
+def costs(logs):
+    """
+    Gas charged to every step of a trace, calls excluding the gas spent inside their callee
+    """
+    charged = [log['gasCost'] for log in logs]
+    calls = [] # [index of the calling step, gas charged inside its callee]
+
+    def resolve(remaining):
+        i, inner = calls.pop()
+        used = logs[i]['gas'] - remaining
+        charged[i] = used - inner
+        if calls:
+            calls[-1][1] += used
+
+    for i, log in enumerate(logs):
+        while calls and logs[calls[-1][0]]['depth'] >= log['depth']:
+            resolve(log['gas'])
+        if log['op'] in CALLS or log['op'] in CREATES:
+            calls.append([i, 0])
+        elif calls:
+            calls[-1][1] += charged[i]
+    while calls:
+        resolve(logs[-1]['gas'] - logs[-1]['gasCost'])
+    return charged
+
+def source_map(content):
+    """
+    Compile a source with the version of its pragma
+    @return Dict of program counter to source position, and the runtime bytecode
+    """
+    version = VERSION.search(content)
+    version = version.group(1) if version else None
+    binary = None
+    if version is None or Version(version) not in vvm.get_installed_vyper_versions():
+        binary = shutil.which('vyper')
+    output = vvm.compile_source(content, vyper_version=version, vyper_binary=binary, output_format='source_map,bytecode_runtime')
+    positions, bytecode = output.strip().split('\n')
+    return {int(pc): position for pc, position in json.loads(positions)['pc_pos_map'].items()}, bytecode
+
+class Source:
+    """
+    Maps program counters of a contract's runtime code to lines of its source
+    @param positions Dict of program counter to source position, see `source_map`
+    """
+    def __init__(self, contract_type, content, positions):
+        self.name = contract_type.name
+        self.source_id = contract_type.source_id
+        self.file = self.source_id.split('/')[-1]
+        self.lines = content.splitlines()
+        self.pcs = {pc: position[0] for pc, position in positions.items()}
+        functions = [(i + 1, match.group(1)) for i, line in enumerate(self.lines) if (match := FUNCTION.match(line))]
+        self.starts = [start for start, _ in functions]
+        self.functions = [name for _, name in functions]
+
+    def line(self, pc):
+        """
+        Source line of an instruction, None for compiler generated code
+        """
+        return self.pcs.get(pc)
+
+    def function(self, line):
+        """
+        Function a line belongs to, None outside of functions
+        """
+        i = bisect.bisect_right(self.starts, line) - 1
+        return self.functions[i] if i >= 0 else None
+
+    def span(self, function):
+        """
+        First and last line of a function, without the decorators of the next one
+        """
+        i = self.functions.index(function)
+        start = self.starts[i]
+        end = self.starts[i + 1] - 1 if i + 1 < len(self.starts) else len(self.lines)
+        while end > start and (self.lines[end - 1].strip() == '' or self.lines[end - 1].startswith('@')):
+            end -= 1
+        return start, end
+
+def _contract_type(address):
+    return chain.contracts.get(address)
+
+def _content(source_id):
+    return project.sources[source_id].fetch_content()
+
+class Profile:
+    """
+    Gas per source line and per stack of calls, summed over transactions
+    @param contract_type Function returning the contract type of an address, None if unknown
+    @param content Function returning the content of a source
+    """
+    def __init__(self, contract_type=_contract_type, content=_content):
+        self.contract_type = contract_type
+        self.content = content
+        self.sources = {} # address to Source, None if unknown
+        self.source_maps = {} # source id to compiler output
+        self.lines = {} # (source id, line) to Counter of gas and of tracked opcodes
+        self.stacks = Counter()
+        self.transactions = 0
+
+    def source(self, address):
+        address = str(address).lower()
+        if address not in self.sources:
+            contract_type = self.contract_type(address)
+            if contract_type is None or contract_type.source_id is None or not contract_type.source_id.endswith('.vy'):
+                self.sources[address] = None
+                return None
+            content = self.content(contract_type.source_id)
+            if contract_type.source_id not in self.source_maps:
+                self.source_maps[contract_type.source_id] = source_map(content)
+            positions, bytecode = self.source_maps[contract_type.source_id]
+            if bytecode != contract_type.runtime_bytecode.bytecode:
+                raise ValueError(f'{contract_type.source_id} compiles to different runtime code than {contract_type.name}')
+            self.sources[address] = Source(contract_type, content, positions)
+        return self.sources[address]
+
+    def _frame(self, address, line):
+        """
+        Flamegraph frames of a step, and the line stats it is charged to
+        """
+        if address is None:
+            return ['<create>'], None
+        source = self.source(address)
+        if source is None:
+            return [address], None
+        if line is None:
+            return [source.name, '<compiler>'], None
+        stats = self.lines.setdefault((source.source_id, line), Counter())
+        return [source.name, source.function(line) or '<module>', f'{source.file}:{line}'], stats
+
+    def add_trace(self, logs, to, intrinsic=0):
+        """
+        Add a trace of a transaction to `to`, or of a contract creation if it is None
+        """
+        self.transactions += 1
+        charged = costs(logs)
+        frames = [[None if to is None else str(to).lower(), None]] # code address and last line of every call frame
+        parents = [] # flamegraph frames of the calling steps
+        for i, log in enumerate(logs):
+            depth = log['depth']
+            while len(frames) > depth:
+                frames.pop()
+                parents.pop()
+            code = frames[-1][0]
+            source = None if code is None else self.source(code)
+            if source is not None:
+                frames[-1][1] = source.line(log['pc']) or frames[-1][1]
+            frame, stats = self._frame(code, frames[-1][1])
+            self.stacks[';'.join([label for parent in parents for label in parent] + frame)] += charged[i]
+            if stats is not None:
+                op = 'CALL' if log['op'] in CALLS else log['op']
+                stats['gas'] += charged[i]
+                if op in COLUMNS:
+                    stats[op] += 1
+                    stats[f'{op} gas'] += charged[i]
+            if i + 1 < len(logs) and logs[i + 1]['depth'] > depth:
+                parents.append(frame)
+                if log['op'] in CALLS:
+                    frames.append([f"0x{int(log['stack'][-2], 16):040x}", None])
+                else:
+                    frames.append([None, None])
+        if intrinsic > 0:
+            root, _ = self._frame(frames[0][0], None)
+            self.stacks[f'{root[0]};<intrinsic>'] += intrinsic
+
+    def add(self, tx_hash):
+        receipt = chain.provider.get_receipt(_hash(tx_hash))
+        logs = trace(tx_hash)
+        intrinsic = receipt.transaction.gas_limit - logs[0]['gas'] if logs else receipt.gas_used
+        self.add_trace(logs, receipt.receiver or None, intrinsic)
+
+    def folded(self):
+        """
+        Folded stacks, one `frame;frame;... gas` per line
+        """
+        return '\n'.join(f'{stack} {gas}' for stack, gas in sorted(self.stacks.items()) if gas > 0)
+
+    def annotate(self):
+        """
+        Source of every executed function with the gas of each line
+        """
+        header = ['gas'] + [f'{column}{suffix}' for column in COLUMNS for suffix in ('', ' gas')]
+        sources = {source.source_id: source for source in self.sources.values() if source is not None}
+        blocks = []
+        for source_id in sorted(sources):
+            source = sources[source_id]
+            totals = Counter()
+            for (line_source, line), stats in self.lines.items():
+                function = source.function(line)
+                if line_source == source_id and function is not None:
+                    totals[function] += stats['gas']
+            for function, total in totals.most_common():
+                first, last = source.span(function)
+                rows = []
+                for line in range(first, last + 1):
+                    stats = self.lines.get((source_id, line), Counter())
+                    values = [stats['gas']] + [stats[f'{column}{suffix}'] for column in COLUMNS for suffix in ('', ' gas')]
+                    rows.append(([str(value) if value else '' for value in values], f'{line:>5}  {source.lines[line - 1]}'))
+                widths = [max(len(row[i]) for row in [header] + [values for values, _ in rows]) for i in range(len(header))]
+                lines = [f'{source.name}.{function}: {total} gas', '  '.join(f'{value:>{width}}' for value, width in zip(header, widths))]
+                lines += ['  '.join(f'{value:>{width}}' for value, width in zip(values, widths)) + '  ' + text for values, text in rows]
+                blocks.append('\n'.join(line.rstrip() for line in lines))
+        return '\n\n'.join(blocks)
+
+    def write(self, path):
+        """
+        Write `<path>.folded` and `<path>.txt`
+        """
+        with open(f'{path}.folded', 'w') as f:
+            f.write(self.folded() + '\n')
+        with open(f'{path}.txt', 'w') as f:
+            f.write(self.annotate() + '\n')
+
+@click.command(cls=ConnectedProviderCommand)
+@click.option('--tx', 'tx_hashes', multiple=True, required=True, help='Transaction to profile, can be repeated')
+@click.option('--output', default='profile', help='Path prefix of the reports')
+def cli(tx_hashes, output):
+    profile = Profile()
+    for tx_hash in tx_hashes:
+        profile.add(tx_hash)
+    profile.write(output)
+    click.echo(f'profile of {profile.transactions} transactions written to {output}.folded and {output}.txt')
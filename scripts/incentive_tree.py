@@ -0,0 +1,171 @@
+"""
+Builds the merkle tree of claimable amounts for an incentive of a winning protocol,
+to be posted with `Bootstrap.set_incentive_root` and claimed with `claim_incentive_proof`.
+
+Voters are streamed from `Vote` events and deduplicated on disk, their entitlement uses
+the same integer math as `Bootstrap.claimable_incentive`. Tree levels are kept in temporary
+files so memory use does not grow with the number of leaves.
+
+Proof file layout (big endian):
+    header: magic (8) | root (32) | depth (1) | number of leaves (8)
+    record: account (20) | amount (32) | proof (depth * 32)
+
+    ape run incentive_tree --bootstrap <address> --protocol <address> --incentive <address> --output <file>
+"""
+
+import mmap
+import os
+import sqlite3
+import tempfile
+
+import click
+from ape import chain, project
+from ape.cli import ConnectedProviderCommand
+from eth_abi import encode
+from eth_utils import keccak, to_checksum_address
+
+MAGIC = b'YETHMRK1'
+HEADER_SIZE = len(MAGIC) + 32 + 1 + 8
+ADDRESS_SIZE = 20
+AMOUNT_SIZE = 32
+NODE_SIZE = 32
+
+def leaf_hash(account, amount):
+    return keccak(keccak(encode(['address', 'uint256'], [account, amount])))
+
+def node_hash(a, b):
+    if a < b:
+        return keccak(a + b)
+    return keccak(b + a)
+
+def voters(bootstrap, start_block=0, stop_block=None, db=None):
+    """
+    Unique voters in order of their first `Vote` event, deduplicated in a SQLite database
+    """
+    if stop_block is None:
+        stop_block = chain.blocks.height
+    db = db or sqlite3.connect('')
+    db.execute('CREATE TABLE IF NOT EXISTS voters (account BLOB PRIMARY KEY)')
+    for log in bootstrap.Vote.range(start_block, stop_block + 1):
+        account = bytes.fromhex(log.voter[2:])
+        if db.execute('INSERT OR IGNORE INTO voters VALUES (?)', (account,)).rowcount:
+            yield log.voter
+
+def entitlements(bootstrap, protocol, incentive, start_block=0, block_id=None):
+    """
+    (account, amount) pairs of all voters with a non-zero claim on the incentive,
+    computed as `incentives * votes_used / voted`
+    """
+    if block_id is None:
+        block_id = chain.blocks.height
+    incentives = bootstrap.incentives(protocol, incentive, block_id=block_id)
+    voted = bootstrap.voted(block_id=block_id)
+    if voted == 0:
+        return
+    for account in voters(bootstrap, start_block, block_id):
+        amount = incentives * bootstrap.votes_used(account, block_id=block_id) // voted
+        if amount > 0:
+            yield account, amount
+
+def _next_level(src, dst, count):
+    """
+    Hash pairs of nodes into the next level, an odd last node is paired with itself
+    """
+    with open(src, 'rb') as f, open(dst, 'wb') as g:
+        for _ in range((count + 1) // 2):
+            a = f.read(NODE_SIZE)
+            b = f.read(NODE_SIZE) or a
+            g.write(node_hash(a, b))
+    return (count + 1) // 2
+
+def build(leaves, path):
+    """
+    Build the tree and write all proofs to `path`
+    @param leaves Iterable of (account, amount) pairs
+    @return Merkle root and number of leaves
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        records = os.path.join(tmp, 'records')
+        levels = [os.path.join(tmp, 'level0')]
+        count = 0
+        with open(records, 'wb') as r, open(levels[0], 'wb') as l:
+            for account, amount in leaves:
+                r.write(bytes.fromhex(account[2:]) + amount.to_bytes(AMOUNT_SIZE, 'big'))
+                l.write(leaf_hash(account, amount))
+                count += 1
+        if count == 0:
+            raise ValueError('no claimable amounts')
+
+        sizes = [count]
+        while sizes[-1] > 1:
+            levels.append(os.path.join(tmp, f'level{len(levels)}'))
+            sizes.append(_next_level(levels[-2], levels[-1], sizes[-1]))
+        with open(levels[-1], 'rb') as f:
+            root = f.read(NODE_SIZE)
+        depth = len(levels) - 1
+
+        files = [open(level, 'rb') for level in levels[:-1]]
+        maps = [mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) for f in files]
+        try:
+            with open(records, 'rb') as r, open(path, 'wb') as out:
+                out.write(MAGIC + root + depth.to_bytes(1, 'big') + count.to_bytes(8, 'big'))
+                for i in range(count):
+                    out.write(r.read(ADDRESS_SIZE + AMOUNT_SIZE))
+                    index = i
+                    for level, size in zip(maps, sizes):
+                        sibling = index ^ 1 if index ^ 1 < size else index
+                        out.write(level[sibling * NODE_SIZE:(sibling + 1) * NODE_SIZE])
+                        index //= 2
+        finally:
+            for m in maps:
+                m.close()
+            for f in files:
+                f.close()
+    return root, count
+
+def read_header(f):
+    header = f.read(HEADER_SIZE)
+    assert header[:len(MAGIC)] == MAGIC, 'not a proof file'
+    root = header[len(MAGIC):len(MAGIC) + 32]
+    depth = header[len(MAGIC) + 32]
+    count = int.from_bytes(header[len(MAGIC) + 33:], 'big')
+    return root, depth, count
+
+def proofs(path):
+    """
+    Iterate over all (account, amount, proof) records in a proof file
+    """
+    with open(path, 'rb') as f:
+        _, depth, count = read_header(f)
+        for _ in range(count):
+            record = f.read(ADDRESS_SIZE + AMOUNT_SIZE + depth * NODE_SIZE)
+            account = to_checksum_address(record[:ADDRESS_SIZE])
+            amount = int.from_bytes(record[ADDRESS_SIZE:ADDRESS_SIZE + AMOUNT_SIZE], 'big')
+            proof = [record[i:i + NODE_SIZE] for i in range(ADDRESS_SIZE + AMOUNT_SIZE, len(record), NODE_SIZE)]
+            yield account, amount, proof
+
+def find_proof(path, account):
+    """
+    Look up the amount and proof of a single account
+    """
+    for a, amount, proof in proofs(path):
+        if a == account:
+            return amount, proof
+    return None
+
+def verify(root, account, amount, proof):
+    node = leaf_hash(account, amount)
+    for sibling in proof:
+        node = node_hash(node, sibling)
+    return node == root
+
+@click.command(cls=ConnectedProviderCommand)
+@click.option('--bootstrap', required=True, help='Bootstrap address')
+@click.option('--protocol', required=True, help='Winning protocol address')
+@click.option('--incentive', required=True, help='Incentive token address')
+@click.option('--output', required=True, help='Proof file to write')
+@click.option('--start-block', default=0, help='Block to start reading votes from')
+def cli(bootstrap, protocol, incentive, output, start_block):
+    bootstrap = project.Bootstrap.at(bootstrap)
+    root, count = build(entitlements(bootstrap, protocol, incentive, start_block), output)
+    click.echo(f'root: 0x{root.hex()}, leaves: {count}')
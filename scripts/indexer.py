@@ -0,0 +1,275 @@
+"""
+Streaming indexer for Bootstrap and POL events.
+Logs are fetched in block ranges that adapt to the provider: a range is halved when the
+provider rejects it as too large or it returns too many logs, and grown again while requests
+stay small. Every range is written to SQLite in a single transaction together with the
+checkpoint, so an interrupted run resumes from the last fully indexed block. Indexing stays
+`--confirmations` blocks behind the head, so indexed blocks are final and never reorged.
+
+`undo_whitelist`, `undo_vote` and `undo_votes` emit no event. `state` reconciles the whitelist
+and the votes with contract state at the last indexed block when given the bootstrap contract.
+
+    ape run indexer --bootstrap <address> --pol <address> --database bootstrap.db
+"""
+
+import json
+import re
+import sqlite3
+
+import click
+from ape import chain, project
+from ape.cli import ConnectedProviderCommand
+from ape.exceptions import ProviderError
+from ape.types import LogFilter
+from eth_utils import encode_hex, keccak
+
+from scripts.rpc_cache import installed
+
+BOOTSTRAP_EVENTS = ['Apply', 'Whitelist', 'Incentivize', 'Deposit', 'Claim', 'Vote', 'ClaimIncentive', 'RefundIncentive', 'Winners']
+POL_EVENTS = ['Mint', 'Burn', 'Approve']
+
+MIN_CHUNK = 1
+MAX_CHUNK = 100_000
+INITIAL_CHUNK = 2_000
+TARGET_LOGS = 5_000
+CONFIRMATIONS = 64
+# messages of providers that reject an `eth_getLogs` range as too large or with too many results
+RANGE_ERRORS = re.compile(
+    r'more than \d+ results|too many|response size|block range|range (is )?too (large|wide)|limit exceeded|exceeds? (the )?max',
+    re.IGNORECASE,
+)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS events (
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    contract TEXT NOT NULL,
+    event TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (block, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_event ON events (event);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    name TEXT PRIMARY KEY,
+    block INTEGER NOT NULL
+);
+'''
+
+def connect(path):
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+def checkpoint_name(addresses):
+    return ','.join(sorted(str(address).lower() for address in addresses))
+
+def checkpoint(db, name):
+    """
+    Last fully indexed block, or None if nothing was indexed yet
+    """
+    row = db.execute('SELECT block FROM checkpoints WHERE name = ?', (name,)).fetchone()
+    return row[0] if row else None
+
+def indexed_block(db, address):
+    """
+    Last block up to which all events of a contract are indexed, or None if nothing was indexed yet
+    """
+    address = str(address).lower()
+    blocks = [block for name, block in db.execute('SELECT name, block FROM checkpoints') if address in name.split(',')]
+    return max(blocks) if blocks else None
+
+def range_error(error):
+    """
+    Whether a provider rejected a log request because its range is too large
+    """
+    return isinstance(error, ProviderError) and RANGE_ERRORS.search(str(error)) is not None
+
+def _encode(value):
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, bytes):
+        return encode_hex(value)
+    if isinstance(value, int):
+        return value
+    return str(value)
+
+class Indexer:
+    """
+    Indexes the events of a set of contracts into a SQLite database
+    @param db SQLite connection
+    @param contracts List of (contract, event names) pairs
+    """
+    def __init__(self, db, contracts, start_block=0, chunk=INITIAL_CHUNK, target_logs=TARGET_LOGS, confirmations=CONFIRMATIONS):
+        self.db = db
+        self.start_block = start_block
+        self.chunk = chunk
+        self.target_logs = target_logs
+        self.confirmations = confirmations
+        self.addresses = [contract.address for contract, _ in contracts]
+        self.names = {}
+        abis = []
+        for contract, events in contracts:
+            for name in events:
+                abi = getattr(contract, name).abi
+                self.names[encode_hex(keccak(text=abi.selector))] = name
+                abis.append(abi)
+        self.abis = abis
+        self.name = checkpoint_name(self.addresses)
+
+    def fetch(self, start, stop):
+        """
+        Fetch and decode all logs of the indexed events in a block range
+        """
+        log_filter = LogFilter(addresses=self.addresses, events=self.abis, topic_filter=[list(self.names)], start_block=start, stop_block=stop)
+        return list(chain.provider.get_contract_logs(log_filter))
+
+    def write(self, logs, stop):
+        """
+        Write logs and advance the checkpoint in a single transaction
+        """
+        rows = [(
+            log.block_number,
+            log.log_index,
+            str(log.transaction_hash),
+            str(log.contract_address),
+            log.event_name,
+            json.dumps({k: _encode(v) for k, v in log.event_arguments.items()}),
+        ) for log in logs]
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self.db.execute('INSERT OR REPLACE INTO checkpoints VALUES (?, ?)', (self.name, stop))
+
+    def run(self, stop_block=None):
+        """
+        Index from the last checkpoint up to `stop_block`
+        @return Number of indexed logs
+        """
+        if stop_block is None:
+            stop_block = chain.blocks.height - self.confirmations
+        last = checkpoint(self.db, self.name)
+        start = self.start_block if last is None else last + 1
+        total = 0
+        while start <= stop_block:
+            stop = min(start + self.chunk - 1, stop_block)
+            try:
+                logs = self.fetch(start, stop)
+            except ProviderError as error:
+                if not range_error(error) or self.chunk <= MIN_CHUNK:
+                    raise
+                self.chunk = max(self.chunk // 2, MIN_CHUNK)
+                continue
+            if len(logs) > self.target_logs and self.chunk > MIN_CHUNK:
+                self.chunk = max(self.chunk // 2, MIN_CHUNK)
+                continue
+            self.write(logs, stop)
+            total += len(logs)
+            start = stop + 1
+            if len(logs) < self.target_logs // 2:
+                self.chunk = min(self.chunk * 2, MAX_CHUNK)
+        return total
+
+def bootstrap_indexer(db, bootstrap, pol=None, **kwargs):
+    contracts = [(bootstrap, BOOTSTRAP_EVENTS)]
+    if pol is not None:
+        contracts.append((pol, POL_EVENTS))
+    return Indexer(db, contracts, **kwargs)
+
+def events(db, *names):
+    """
+    Iterate over the arguments of indexed events in chain order
+    """
+    query = 'SELECT event, args FROM events'
+    if names:
+        query += f' WHERE event IN ({",".join("?" * len(names))})'
+    query += ' ORDER BY block, log_index'
+    for name, args in db.execute(query, names):
+        yield name, json.loads(args)
+
+def state(db, bootstrap=None):
+    """
+    Rebuild the bootstrap state from the indexed events
+    @param bootstrap Bootstrap contract to reconcile undone whitelists and votes with, see `reconcile`
+    """
+    result = {
+        'applied': set(),
+        'whitelisted': set(),
+        'deposits': {},
+        'votes': {},
+        'votes_used': {},
+        'incentives': {},
+        'claimed_incentives': {},
+        'refunded_incentives': {},
+        'winners': [],
+        'pol_debt': 0,
+        'pol_allowances': {},
+    }
+    for name, args in events(db):
+        if name == 'Apply':
+            result['applied'].add(args['protocol'])
+        elif name == 'Whitelist':
+            result['whitelisted'].add(args['protocol'])
+        elif name == 'Deposit':
+            result['deposits'][args['receiver']] = result['deposits'].get(args['receiver'], 0) + args['amount']
+        elif name == 'Claim':
+            result['deposits'][args['claimer']] -= args['amount']
+        elif name == 'Vote':
+            result['votes'][args['protocol']] = result['votes'].get(args['protocol'], 0) + args['amount']
+            result['votes_used'][args['voter']] = result['votes_used'].get(args['voter'], 0) + args['amount']
+        elif name == 'Incentivize':
+            key = (args['protocol'], args['incentive'])
+            result['incentives'][key] = result['incentives'].get(key, 0) + args['amount']
+        elif name == 'ClaimIncentive':
+            key = (args['protocol'], args['incentive'])
+            result['claimed_incentives'][key] = result['claimed_incentives'].get(key, 0) + args['amount']
+        elif name == 'RefundIncentive':
+            key = (args['protocol'], args['incentive'])
+            result['refunded_incentives'][key] = result['refunded_incentives'].get(key, 0) + args['amount']
+        elif name == 'Winners':
+            result['winners'] = args['winners']
+        elif name == 'Mint':
+            result['pol_debt'] += args['amount']
+        elif name == 'Burn':
+            result['pol_debt'] -= args['amount']
+        elif name == 'Approve':
+            result['pol_allowances'][(args['token'], args['spender'])] = args['amount']
+    if bootstrap is not None:
+        block = indexed_block(db, bootstrap.address)
+        if block is not None:
+            reconcile(result, bootstrap, block)
+    return result
+
+def reconcile(result, bootstrap, block_id):
+    """
+    Apply `undo_whitelist`, `undo_vote` and `undo_votes`, which emit no event, to a rebuilt state.
+    Whitelisted protocols are read back from contract state. Votes only decrease through undos,
+    so they are read back only when `voted` differs from the indexed total
+    """
+    result['whitelisted'] = {protocol for protocol in result['whitelisted'] if bootstrap.is_whitelisted(protocol, block_id=block_id)}
+    if bootstrap.voted(block_id=block_id) == sum(result['votes_used'].values()):
+        return
+    for protocol, votes in result['votes'].items():
+        if votes > 0:
+            result['votes'][protocol] = bootstrap.votes(protocol, block_id=block_id)
+    for voter, votes in result['votes_used'].items():
+        if votes > 0:
+            result['votes_used'][voter] = bootstrap.votes_used(voter, block_id=block_id)
+
+@click.command(cls=ConnectedProviderCommand)
+@click.option('--bootstrap', required=True, help='Bootstrap address')
+@click.option('--pol', default=None, help='POL address')
+@click.option('--database', required=True, help='SQLite database to write to')
+@click.option('--start-block', default=0, help='Block to start indexing from')
+@click.option('--confirmations', default=CONFIRMATIONS, help='Number of blocks to stay behind the head')
+@click.option('--rpc-cache', default=None, help='Cache RPC reads of finalized blocks in this SQLite file')
+def cli(bootstrap, pol, database, start_block, confirmations, rpc_cache):
+    db = connect(database)
+    bootstrap = project.Bootstrap.at(bootstrap)
+    if pol is not None:
+        pol = project.POL.at(pol)
+    indexer = bootstrap_indexer(db, bootstrap, pol, start_block=start_block, confirmations=confirmations)
+    with installed(rpc_cache, chain.provider.web3) as cache:
+        count = indexer.run()
+    click.echo(f'indexed {count} events up to block {checkpoint(db, indexer.name)}')
+    if cache is not None:
+        click.echo(cache.report())
@@ -0,0 +1,200 @@
+"""
+Live vote leaderboard, maintained incrementally from the event stream.
+Per-protocol vote totals are updated from `Vote` events of every new block, so a poll costs
+O(new events) instead of a `votes(protocol)` call for every protocol. `undo_vote` and `undo_votes`
+emit no event, but they are the only way `voted` decreases: after every poll `voted` is read once,
+and only when it differs from the tracked sum are the totals of voted-on protocols read back from
+state and the differences applied.
+
+Changes are journaled per block. When the last processed block is replaced by a reorg, every
+change after the last finalized block is rolled back and the blocks are processed again. The
+ranking is kept in a heap, so an update is O(log n), and the top `MAX_WINNERS` whitelisted
+protocols give the `declare_winners` calldata.
+
+    ape run leaderboard --bootstrap <address>
+"""
+
+import heapq
+import time
+
+import click
+from ape import chain, project
+from ape.cli import ConnectedProviderCommand
+
+MAX_WINNERS = 5
+CONFIRMATIONS = 64
+POLL_INTERVAL = 12 # seconds
+
+class Tally:
+    """
+    Vote totals with a top-k ranking and a per-block journal for rollbacks
+    """
+    def __init__(self):
+        self.totals = {}
+        self.voted = 0
+        self.heap = [] # (-votes, lowercase protocol, protocol), stale entries are dropped lazily
+        self.journal = [] # (block, changes) of blocks that are not finalized yet
+        self.finalized = -1
+
+    def _set(self, protocol, votes):
+        self.totals[protocol] = votes
+        heapq.heappush(self.heap, (-votes, protocol.lower(), protocol))
+        if len(self.heap) > 2 * len(self.totals) + 64:
+            self.heap = [(-v, p.lower(), p) for p, v in self.totals.items()]
+            heapq.heapify(self.heap)
+
+    def _change(self, changes):
+        for protocol, delta in changes.items():
+            self._set(protocol, self.totals.get(protocol, 0) + delta)
+            self.voted += delta
+
+    def apply(self, block, changes):
+        """
+        Apply vote changes of a block
+        @param changes Dict of protocol to change in votes
+        """
+        changes = {protocol: delta for protocol, delta in changes.items() if delta != 0}
+        if len(changes) == 0:
+            return
+        if block > self.finalized:
+            if self.journal and self.journal[-1][0] == block:
+                merged = dict(self.journal[-1][1])
+                for protocol, delta in changes.items():
+                    merged[protocol] = merged.get(protocol, 0) + delta
+                self.journal[-1] = (block, merged)
+            else:
+                self.journal.append((block, changes))
+        self._change(changes)
+
+    def rollback(self, block):
+        """
+        Revert the changes of all blocks after `block`
+        """
+        while self.journal and self.journal[-1][0] > block:
+            _, changes = self.journal.pop()
+            self._change({protocol: -delta for protocol, delta in changes.items()})
+
+    def finalize(self, block):
+        """
+        Drop the journal up to a block that can no longer be reorged
+        """
+        self.finalized = max(self.finalized, block)
+        while self.journal and self.journal[0][0] <= self.finalized:
+            self.journal.pop(0)
+
+    def ranking(self, k=None, eligible=None):
+        """
+        Protocols with votes in order of votes, ties broken by address
+        @param k Number of protocols to return, all if None
+        @param eligible Optional predicate a protocol has to satisfy to be ranked
+        @return List of (protocol, votes)
+        """
+        result = []
+        popped = {}
+        while self.heap and (k is None or len(result) < k):
+            entry = heapq.heappop(self.heap)
+            votes, protocol = -entry[0], entry[2]
+            if self.totals.get(protocol) != votes or protocol in popped:
+                continue
+            popped[protocol] = entry
+            if votes > 0 and (eligible is None or eligible(protocol)):
+                result.append((protocol, votes))
+        for entry in popped.values():
+            heapq.heappush(self.heap, entry)
+        return result
+
+class Leaderboard:
+    """
+    Follows the votes of a bootstrap contract block by block
+    @param confirmations Blocks after which a block is considered final
+    """
+    def __init__(self, bootstrap, start_block=0, confirmations=CONFIRMATIONS):
+        self.bootstrap = bootstrap
+        self.confirmations = confirmations
+        self.tally = Tally()
+        self.start_block = start_block
+        self.block = start_block - 1
+        self.hash = None # hash of the last processed block
+        self.reorgs = 0
+
+    def _reorged(self):
+        return self.hash is not None and chain.provider.get_block(self.block).hash != self.hash
+
+    def update(self, head=None):
+        """
+        Process all blocks up to `head`, rolling back first if a processed block was replaced
+        @return Number of processed `Vote` events
+        """
+        if head is None:
+            head = chain.blocks.height
+        if self._reorged():
+            self.reorgs += 1
+            self.tally.rollback(self.tally.finalized)
+            self.block = max(self.tally.finalized, self.start_block - 1)
+            self.hash = None
+        if head <= self.block:
+            return 0
+        changes = {}
+        count = 0
+        for log in self.bootstrap.Vote.range(self.block + 1, head + 1):
+            if log.block_number not in changes:
+                changes[log.block_number] = {}
+            block_changes = changes[log.block_number]
+            block_changes[log.protocol] = block_changes.get(log.protocol, 0) + log.amount
+            count += 1
+        for block in sorted(changes):
+            self.tally.apply(block, changes[block])
+        self.reconcile(head)
+        self.block = head
+        self.hash = chain.provider.get_block(head).hash
+        self.tally.finalize(head - self.confirmations)
+        return count
+
+    def reconcile(self, block):
+        """
+        Apply votes freed by `undo_vote` and `undo_votes`, which only show up as a lower `voted`
+        """
+        voted = self.bootstrap.voted(block_id=block)
+        if voted == self.tally.voted:
+            return
+        changes = {}
+        for protocol, votes in list(self.tally.totals.items()):
+            if votes > 0:
+                changes[protocol] = self.bootstrap.votes(protocol, block_id=block) - votes
+        self.tally.apply(block, changes)
+
+    def ranking(self, k=None):
+        return self.tally.ranking(k)
+
+    def winners(self, k=MAX_WINNERS):
+        """
+        Top protocols that are still whitelisted
+        """
+        return [protocol for protocol, _ in self.tally.ranking(k, lambda protocol: self.bootstrap.is_whitelisted(protocol))]
+
+    def declare_calldata(self, k=MAX_WINNERS):
+        """
+        Calldata of `declare_winners` for the current top protocols
+        """
+        return bytes(self.bootstrap.declare_winners.encode_input(self.winners(k)))
+
+def format_ranking(ranking):
+    return '\n'.join(f'{i + 1:>3}. {protocol}  {votes}' for i, (protocol, votes) in enumerate(ranking))
+
+@click.command(cls=ConnectedProviderCommand)
+@click.option('--bootstrap', required=True, help='Bootstrap address')
+@click.option('--start-block', default=0, help='Block to start reading votes from')
+@click.option('--confirmations', default=CONFIRMATIONS, help='Blocks after which a block is final')
+@click.option('--interval', default=POLL_INTERVAL, help='Seconds between polls')
+@click.option('--once', is_flag=True, help='Print the ranking and calldata once and exit')
+def cli(bootstrap, start_block, confirmations, interval, once):
+    leaderboard = Leaderboard(project.Bootstrap.at(bootstrap), start_block, confirmations)
+    while True:
+        count = leaderboard.update()
+        if count > 0 or once:
+            click.echo(f'block {leaderboard.block}, {count} new votes, {leaderboard.tally.voted} votes in total')
+            click.echo(format_ranking(leaderboard.ranking()))
+            click.echo(f'declare_winners calldata: 0x{leaderboard.declare_calldata().hex()}')
+        if once:
+            return
+        time.sleep(interval)
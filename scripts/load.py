@@ -0,0 +1,293 @@
+"""
+Load simulator for Bootstrap against a local anvil node.
+Deploys a fresh Bootstrap and drives it through all of its periods with concurrent traffic from
+many generated accounts: incentivize, deposit, vote and claim_incentive. Transactions are sent
+over JSON-RPC with asyncio. Anvil impersonates the generated accounts and every account's nonce
+is tracked locally, so accounts never wait on each other.
+
+The report holds the throughput of every phase, the gas of every operation as a function of the
+state size when it executed, and the total gas of the claim phase. Accounts, amounts and votes
+are derived from the seed, so a report can be reproduced after contract changes.
+
+    ape run load --network ethereum:local:foundry --depositors 10000 --protocols 50 --incentives 200 --output load.json
+"""
+
+import asyncio
+import json
+import random
+import time
+
+import aiohttp
+import click
+from ape import accounts, chain, project
+from ape.cli import ConnectedProviderCommand
+from eth_utils import keccak, to_checksum_address
+
+from scripts.rpc import RPC
+
+WEEK_LENGTH = 7 * 24 * 60 * 60
+ONE = 1_000_000_000_000_000_000
+MAX = 2**256 - 1
+MAX_WINNERS = 5
+MAX_VOTE_PROTOCOLS = 8
+CONCURRENCY = 64
+GAS_LIMIT = 5_000_000
+BUCKETS = 10
+RECEIPT_INTERVAL = 0.01
+
+class Sender:
+    """
+    Sends transactions from impersonated accounts.
+    Nonces are assigned locally, and the transactions of a single account are sent one at a time,
+    so a transaction never waits in the pool for a nonce gap to be filled
+    """
+    def __init__(self, rpc, concurrency=CONCURRENCY):
+        self.rpc = rpc
+        self.nonces = {}
+        self.locks = {}
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.records = []
+
+    async def add_account(self, account):
+        self.nonces[account] = int(await self.rpc.request('eth_getTransactionCount', account, 'latest'), 16)
+        self.locks[account] = asyncio.Lock()
+
+    def add_new_account(self, account):
+        self.nonces[account] = 0
+        self.locks[account] = asyncio.Lock()
+
+    async def receipt(self, tx_hash):
+        while True:
+            receipt = await self.rpc.request('eth_getTransactionReceipt', tx_hash)
+            if receipt is not None:
+                return receipt
+            await asyncio.sleep(RECEIPT_INTERVAL)
+
+    async def send(self, op, sender, to, data, value=0):
+        """
+        Send a transaction and wait for its receipt
+        @param op Operation name to record the gas under
+        """
+        async with self.locks[sender], self.semaphore:
+            nonce = self.nonces[sender]
+            tx = {
+                'from': sender,
+                'to': str(to),
+                'data': '0x' + bytes(data).hex(),
+                'value': hex(value),
+                'nonce': hex(nonce),
+                'gas': hex(GAS_LIMIT),
+            }
+            tx_hash = await self.rpc.request('eth_sendTransaction', tx)
+            self.nonces[sender] = nonce + 1
+            receipt = await self.receipt(tx_hash)
+        if int(receipt['status'], 16) != 1:
+            raise RuntimeError(f'{op} from {sender} reverted in {tx_hash}')
+        self.records.append((op, int(receipt['blockNumber'], 16), int(receipt['transactionIndex'], 16), int(receipt['gasUsed'], 16)))
+        return receipt
+
+    async def run(self, phase, calls):
+        """
+        Send all calls of a phase concurrently
+        @param calls List of (op, sender, to, data, value)
+        @return Phase statistics
+        """
+        start = len(self.records)
+        begin = time.perf_counter()
+        await asyncio.gather(*[self.send(*call) for call in calls])
+        seconds = time.perf_counter() - begin
+        gas = sum(record[3] for record in self.records[start:])
+        return {
+            'phase': phase,
+            'transactions': len(calls),
+            'seconds': round(seconds, 3),
+            'tps': round(len(calls) / seconds, 2) if seconds > 0 else None,
+            'gas': gas,
+        }
+
+def generate_accounts(seed, label, count):
+    return [to_checksum_address(keccak(text=f'{seed}:{label}:{i}')[-20:]) for i in range(count)]
+
+def split(total, parts):
+    """
+    Split an amount into integer parts that sum up to it
+    """
+    amounts = [total // parts] * parts
+    amounts[0] += total - sum(amounts)
+    return amounts
+
+def summarize(records, buckets=BUCKETS):
+    """
+    Gas statistics per operation, in chain order
+    @param records List of (op, block, transaction index, gas used)
+    @return Per operation the count, total, mean, min and max gas, and the mean gas of every
+        bucket of state size, where the state size is the number of preceding operations of the same kind
+    """
+    by_op = {}
+    for op, block, index, gas in sorted(records, key=lambda record: (record[1], record[2])):
+        by_op.setdefault(op, []).append(gas)
+    summary = {}
+    for op, gas in by_op.items():
+        size = -(-len(gas) // buckets)
+        summary[op] = {
+            'count': len(gas),
+            'total': sum(gas),
+            'mean': sum(gas) // len(gas),
+            'min': min(gas),
+            'max': max(gas),
+            'by_state_size': [
+                {'from': i, 'to': min(i + size, len(gas)), 'mean': sum(gas[i:i + size]) // len(gas[i:i + size])}
+                for i in range(0, len(gas), size)
+            ],
+        }
+    return summary
+
+def deploy(management, num_protocols, num_incentives):
+    """
+    Deploy a Bootstrap with consecutive periods starting next week
+    """
+    token = project.Token.deploy(sender=management)
+    staking = project.MockStaking.deploy(token, sender=management)
+    pol = project.POL.deploy(token, sender=management)
+    bootstrap = project.Bootstrap.deploy(token, staking, management, pol, False, sender=management)
+    token.set_minter(bootstrap, sender=management)
+    ts = (chain.pending_timestamp // WEEK_LENGTH + 1) * WEEK_LENGTH
+    bootstrap.set_whitelist_period(ts, ts + WEEK_LENGTH, sender=management)
+    bootstrap.set_incentive_period(ts + WEEK_LENGTH, ts + 2 * WEEK_LENGTH, sender=management)
+    bootstrap.set_deposit_period(ts + 2 * WEEK_LENGTH, ts + 3 * WEEK_LENGTH, sender=management)
+    bootstrap.set_lock_end(ts + 5 * WEEK_LENGTH, sender=management)
+    bootstrap.set_vote_period(ts + 3 * WEEK_LENGTH, ts + 4 * WEEK_LENGTH, sender=management)
+    protocols = [project.MockToken.deploy(sender=management) for _ in range(num_protocols)]
+    incentives = [project.MockToken.deploy(sender=management) for _ in range(num_incentives)]
+    return bootstrap, protocols, incentives
+
+async def advance(rpc, timestamp):
+    await rpc.request('evm_setNextBlockTimestamp', timestamp)
+    await rpc.request('evm_mine')
+
+async def simulate(uri, management, bootstrap, protocols, incentives, num_depositors, seed, concurrency):
+    rng = random.Random(seed)
+    depositors = generate_accounts(seed, 'depositor', num_depositors)
+    incentivizers = generate_accounts(seed, 'incentivizer', len(incentives))
+    deposits = [rng.randint(1, 320) * ONE // 10 for _ in depositors]
+    incentive_protocols = [rng.randrange(len(protocols)) for _ in incentives]
+    incentive_amounts = [rng.randint(1, 1_000) * ONE for _ in incentives]
+    votes = []
+    for amount in deposits:
+        choice = rng.sample(range(len(protocols)), rng.randint(1, min(MAX_VOTE_PROTOCOLS, len(protocols))))
+        votes.append((choice, split(amount, len(choice))))
+
+    phases = []
+    async with aiohttp.ClientSession() as session:
+        rpc = RPC(session, uri)
+        sender = Sender(rpc, concurrency)
+        await rpc.request('anvil_autoImpersonateAccount', True)
+        await sender.add_account(management)
+        for account in depositors + incentivizers:
+            sender.add_new_account(account)
+
+        begin = time.perf_counter()
+        await asyncio.gather(*[
+            rpc.request('anvil_setBalance', account, hex(amount + ONE))
+            for account, amount in zip(depositors + incentivizers, deposits + [0] * len(incentivizers))
+        ])
+        phases.append({'phase': 'fund', 'transactions': 0, 'seconds': round(time.perf_counter() - begin, 3)})
+
+        await advance(rpc, bootstrap.whitelist_begin())
+        phases.append(await sender.run('apply', [
+            ('apply', management, bootstrap, bootstrap.apply.encode_input(protocol), ONE) for protocol in protocols
+        ]))
+        phases.append(await sender.run('whitelist', [
+            ('whitelist', management, bootstrap, bootstrap.whitelist.encode_input(protocol), 0) for protocol in protocols
+        ]))
+
+        await advance(rpc, bootstrap.incentive_begin())
+        phases.append(await sender.run('prepare_incentives', [
+            call for incentive, account, amount in zip(incentives, incentivizers, incentive_amounts) for call in [
+                ('mint', account, incentive, incentive.mint.encode_input(account, amount), 0),
+                ('approve', account, incentive, incentive.approve.encode_input(bootstrap, MAX), 0),
+            ]
+        ]))
+        phases.append(await sender.run('incentivize', [
+            ('incentivize', account, bootstrap, bootstrap.incentivize.encode_input(protocols[p], incentive, amount), 0)
+            for incentive, account, p, amount in zip(incentives, incentivizers, incentive_protocols, incentive_amounts)
+        ]))
+
+        await advance(rpc, bootstrap.deposit_begin())
+        phases.append(await sender.run('deposit', [
+            ('deposit', account, bootstrap, bootstrap.deposit.encode_input(), amount)
+            for account, amount in zip(depositors, deposits)
+        ]))
+
+        await advance(rpc, bootstrap.vote_begin())
+        phases.append(await sender.run('vote', [
+            ('vote', account, bootstrap, bootstrap.vote.encode_input([protocols[p] for p in choice], amounts), 0)
+            for account, (choice, amounts) in zip(depositors, votes)
+        ]))
+
+        tally = [0] * len(protocols)
+        for choice, amounts in votes:
+            for p, amount in zip(choice, amounts):
+                tally[p] += amount
+        winners = sorted(range(len(protocols)), key=lambda p: (-tally[p], p))[:MAX_WINNERS]
+        await advance(rpc, bootstrap.lock_end())
+        phases.append(await sender.run('declare_winners', [
+            ('declare_winners', management, bootstrap, bootstrap.declare_winners.encode_input([protocols[p] for p in winners]), 0)
+        ]))
+
+        # every voter claims every incentive of every winner with a non-zero share
+        voted = sum(deposits)
+        winning = [(protocols[p], incentive, amount) for incentive, p, amount in zip(incentives, incentive_protocols, incentive_amounts) if p in winners]
+        phases.append(await sender.run('claim_incentive', [
+            ('claim_incentive', account, bootstrap, bootstrap.claim_incentive.encode_input(protocol, incentive), 0)
+            for account, deposit in zip(depositors, deposits)
+            for protocol, incentive, amount in winning
+            if amount * deposit // voted > 0
+        ]))
+
+    operations = summarize(sender.records)
+    return {
+        'config': {
+            'seed': seed,
+            'depositors': num_depositors,
+            'protocols': len(protocols),
+            'incentives': len(incentives),
+            'concurrency': concurrency,
+        },
+        'phases': phases,
+        'operations': operations,
+        'claim_gas': operations.get('claim_incentive', {}).get('total', 0),
+    }
+
+def format_report(report):
+    lines = [f'{"phase":<20} {"txs":>8} {"seconds":>9} {"tx/s":>9} {"gas":>14}']
+    for phase in report['phases']:
+        tps = phase.get('tps')
+        lines.append(f'{phase["phase"]:<20} {phase["transactions"]:>8} {phase["seconds"]:>9} {tps if tps is not None else "":>9} {phase.get("gas", ""):>14}')
+    lines.append('')
+    lines.append(f'{"operation":<20} {"count":>8} {"mean gas":>9} {"first":>9} {"last":>9}')
+    for op, stats in report['operations'].items():
+        buckets = stats['by_state_size']
+        lines.append(f'{op:<20} {stats["count"]:>8} {stats["mean"]:>9} {buckets[0]["mean"]:>9} {buckets[-1]["mean"]:>9}')
+    lines.append('')
+    lines.append(f'total claim gas: {report["claim_gas"]}')
+    return '\n'.join(lines)
+
+@click.command(cls=ConnectedProviderCommand)
+@click.option('--depositors', default=1_000, help='Number of depositors, who all vote')
+@click.option('--protocols', default=10, help='Number of whitelisted protocols')
+@click.option('--incentives', default=20, help='Number of incentive tokens, each incentivizing one protocol')
+@click.option('--concurrency', default=CONCURRENCY, help='Maximum number of transactions in flight')
+@click.option('--seed', default=0, help='Seed for accounts, amounts and votes')
+@click.option('--output', default=None, help='JSON file to write the report to')
+def cli(depositors, protocols, incentives, concurrency, seed, output):
+    uri = getattr(chain.provider, 'http_uri', None)
+    if uri is None:
+        raise click.ClickException('the load simulator needs an anvil node with an HTTP endpoint')
+    management = accounts.test_accounts[0]
+    bootstrap, protocols, incentives = deploy(management, protocols, incentives)
+    report = asyncio.run(simulate(uri, management.address, bootstrap, protocols, incentives, depositors, seed, concurrency))
+    click.echo(format_report(report))
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
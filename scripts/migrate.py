@@ -0,0 +1,186 @@
+"""
+Migration of the original bootstrap depositors into BootstrapRedeploy.
+The deposits of every account are rebuilt from the `Deposit` and `Claim` events of the original
+bootstrap contract, using the indexer so that an existing indexer database can be reused. Accounts
+are compared against `deposits(account)` of the redeployed contract and only the missing amounts
+are deposited, so a migration that was interrupted can be run again without depositing twice.
+
+Batches are sized with `estimate_gas` to stay below a gas budget, and at most 256 accounts, the
+limit of `deposit`. All batches are signed with consecutive nonces and sent without waiting for
+the receipt of the previous one, keeping at most `--max-pending` transactions in flight. Once
+a batch reverts no further batches are sent, and the migration fails after the batches in flight.
+
+    ape run migrate --bootstrap <address> --redeploy <address> --account <alias>
+"""
+
+from collections import deque
+
+import click
+from ape import chain, project
+from ape.cli import ConnectedProviderCommand, account_option
+from eth_utils import to_hex
+
+from scripts import indexer
+
+MAX_BATCH = 256
+GAS_BUDGET = 15_000_000
+GAS_MARGIN = 1.2
+MAX_PENDING = 16
+
+def snapshot(db, bootstrap, start_block=0, stop_block=None):
+    """
+    Deposits of every account of the original bootstrap contract
+    @return Dict of account to amount, in order of first deposit, without accounts that claimed everything
+    """
+    indexer.bootstrap_indexer(db, bootstrap, start_block=start_block).run(stop_block)
+    deposits = indexer.state(db)['deposits']
+    return {account: amount for account, amount in deposits.items() if amount > 0}
+
+def remaining(redeploy, balances):
+    """
+    Amounts that still have to be deposited into the redeployed contract
+    @return List of (account, amount) pairs
+    """
+    result = []
+    for account, amount in balances.items():
+        deposited = redeploy.deposits(account)
+        if deposited < amount:
+            result.append((account, amount - deposited))
+    return result
+
+def batch_size(estimate, count, budget, max_batch=MAX_BATCH):
+    """
+    Largest number of leading items that fits in the gas budget
+    @param estimate Function returning the gas used by a batch of the first `n` items
+    @param count Number of items left
+    @return Tuple of batch size and its gas estimate
+    """
+    size = min(count, max_batch)
+    gas = estimate(size)
+    if gas <= budget:
+        return size, gas
+    first = estimate(1)
+    if first > budget:
+        raise ValueError(f'a single item uses {first} gas, more than the budget of {budget}')
+    # search between a size that fits and one that does not. Gas is close to linear in the
+    # batch size, so interpolating usually lands next to the limit; every other step bisects
+    # to bound the number of estimates when it is not
+    lo, lo_gas, hi, hi_gas = 1, first, size, gas
+    interpolate = True
+    while hi - lo > 1:
+        if interpolate:
+            guess = lo + int((budget - lo_gas) * (hi - lo) / (hi_gas - lo_gas))
+            guess = min(max(guess, lo + 1), hi - 1)
+        else:
+            guess = (lo + hi) // 2
+        interpolate = not interpolate
+        gas = estimate(guess)
+        if gas <= budget:
+            lo, lo_gas = guess, gas
+        else:
+            hi, hi_gas = guess, gas
+    return lo, lo_gas
+
+def plan(redeploy, sender, items, budget=GAS_BUDGET, max_batch=MAX_BATCH):
+    """
+    Split (account, amount) pairs into batches that fit in the gas budget
+    @return List of (accounts, amounts, gas estimate) tuples
+    """
+    def estimate(offset):
+        def f(size):
+            accounts = [account for account, _ in items[offset:offset+size]]
+            amounts = [amount for _, amount in items[offset:offset+size]]
+            return redeploy.deposit.estimate_gas_cost(accounts, amounts, sender=sender)
+        return f
+
+    batches = []
+    offset = 0
+    while offset < len(items):
+        size, gas = batch_size(estimate(offset), len(items) - offset, budget, max_batch)
+        batch = items[offset:offset+size]
+        batches.append(([account for account, _ in batch], [amount for _, amount in batch], gas))
+        offset += size
+    return batches
+
+def pending_nonce(account):
+    return chain.provider.web3.eth.get_transaction_count(account.address, 'pending')
+
+def submit(redeploy, sender, batches, max_pending=MAX_PENDING):
+    """
+    Send all batches with consecutive nonces, waiting for a receipt only when too many are in flight.
+    No more batches are sent once a batch reverted, the ones in flight are still waited for
+    @return Transaction receipts, in nonce order, including reverted ones
+    """
+    if pending_nonce(sender) != sender.nonce:
+        raise ValueError('depositor has pending transactions, wait for them before migrating')
+    nonce = sender.nonce
+    pending = deque()
+    receipts = []
+
+    def wait():
+        receipts.append(chain.provider.get_receipt(to_hex(pending.popleft())))
+
+    for accounts, amounts, gas in batches:
+        if any(receipt.failed for receipt in receipts):
+            break
+        txn = redeploy.deposit.as_transaction(accounts, amounts, sender=sender, nonce=nonce, gas=int(gas * GAS_MARGIN))
+        txn = sender.sign_transaction(txn)
+        pending.append(chain.provider.web3.eth.send_raw_transaction(txn.serialize_transaction()))
+        nonce += 1
+        if len(pending) >= max_pending:
+            wait()
+    while pending:
+        wait()
+    return receipts
+
+def check(receipts):
+    """
+    Raise if any batch reverted. Deposits of the other batches stand, running the migration again
+    deposits the remaining amounts
+    """
+    failed = [str(receipt.txn_hash) for receipt in receipts if receipt.failed]
+    if failed:
+        raise ValueError(f'{len(failed)} of {len(receipts)} batches reverted: {", ".join(failed)}')
+
+def migrate(db, bootstrap, redeploy, sender, start_block=0, budget=GAS_BUDGET, max_pending=MAX_PENDING):
+    """
+    Deposit the missing amounts of all original depositors into the redeployed contract
+    @return Transaction receipts, raises if a batch reverted
+    """
+    if redeploy.depositor() != sender.address:
+        raise ValueError(f'{sender.address} is not the depositor of {redeploy.address}')
+    items = remaining(redeploy, snapshot(db, bootstrap, start_block))
+    receipts = submit(redeploy, sender, plan(redeploy, sender, items, budget), max_pending)
+    check(receipts)
+    return receipts
+
+@click.command(cls=ConnectedProviderCommand)
+@account_option()
+@click.option('--bootstrap', required=True, help='Original bootstrap address')
+@click.option('--redeploy', required=True, help='BootstrapRedeploy address')
+@click.option('--database', default=':memory:', help='Indexer database to read and extend')
+@click.option('--start-block', default=0, help='Block to start reading events from')
+@click.option('--gas-budget', default=GAS_BUDGET, help='Gas budget of a single batch')
+@click.option('--max-pending', default=MAX_PENDING, help='Transactions in flight at once')
+@click.option('--dry-run', is_flag=True, help='Only print the batches')
+def cli(account, bootstrap, redeploy, database, start_block, gas_budget, max_pending, dry_run):
+    db = indexer.connect(database)
+    bootstrap = project.Bootstrap.at(bootstrap)
+    redeploy = project.BootstrapRedeploy.at(redeploy)
+    if redeploy.depositor() != account.address:
+        raise click.ClickException(f'{account.address} is not the depositor of {redeploy.address}')
+    balances = snapshot(db, bootstrap, start_block)
+    items = remaining(redeploy, balances)
+    click.echo(f'{len(balances)} depositors, {len(items)} left to migrate')
+    batches = plan(redeploy, account, items, gas_budget)
+    for accounts, amounts, gas in batches:
+        click.echo(f'{len(accounts)} accounts, {sum(amounts)} wei, {gas} gas')
+    if dry_run:
+        return
+    receipts = submit(redeploy, account, batches, max_pending)
+    for receipt in receipts:
+        click.echo(f'{receipt.txn_hash}: {"reverted" if receipt.failed else f"{receipt.gas_used} gas"}')
+    try:
+        check(receipts)
+    except ValueError as error:
+        raise click.ClickException(f'{error}, run the migration again to deposit the remaining amounts')
@@ -0,0 +1,38 @@
+"""
+Helpers to batch module calls into a single `multicall` transaction.
+Each call is a contract method handler followed by its arguments:
+
+    data = encode([
+        (module.approve_pool_yeth, MAX),
+        (module.remove_liquidity_imbalance, [ONE, ONE], 2 * ONE),
+        (module.to_pol, NATIVE, MAX),
+    ])
+    module.multicall(data, sender=operator)
+"""
+
+MAX_CALLS = 16
+MAX_CALL_SIZE = 260
+
+def encode_call(method, *args):
+    """
+    ABI encode a single call, including the function selector
+    """
+    data = bytes(method.encode_input(*args))
+    if len(data) > MAX_CALL_SIZE:
+        raise ValueError(f'call to {method} is {len(data)} bytes, at most {MAX_CALL_SIZE} allowed')
+    return data
+
+def encode(calls):
+    """
+    ABI encode a list of (method, *args) tuples
+    """
+    data = [encode_call(method, *args) for method, *args in calls]
+    if len(data) > MAX_CALLS:
+        raise ValueError(f'{len(data)} calls, at most {MAX_CALLS} allowed')
+    return data
+
+def multicall(module, calls, sender):
+    """
+    Execute all calls on the module in a single transaction
+    """
+    return module.multicall(encode(calls), sender=sender)
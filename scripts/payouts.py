@@ -0,0 +1,163 @@
+"""
+Payout matrix of winner incentives over all voters.
+Every cell is `incentives * votes_used // voted`, the same integer math as
+`Bootstrap.claimable_incentive` before a claim. Amounts are in wei and their products
+exceed 64 bits, so cells are exact Python integers held in NumPy object arrays.
+
+Voters are consumed in chunks and rows are written as they are produced, so memory
+use does not grow with the number of voters. Parquet output requires `pyarrow`.
+
+Before `declare_winners` the matrix is a projection over every incentivized protocol, as if
+all of them won. Votes freed by `undo_vote` and `undo_votes` emit no event, so votes indexed from events
+are reconciled with contract state at the last indexed block, see `indexer.reconcile`.
+
+    ape run payouts --bootstrap <address> --database bootstrap.db --output payouts.csv
+"""
+
+import csv
+from itertools import islice
+
+import click
+import numpy as np
+from ape import chain, project
+from ape.cli import ConnectedProviderCommand
+
+from scripts.rpc_cache import installed
+
+CHUNK_SIZE = 100_000
+COLUMNS = ['voter', 'protocol', 'incentive', 'amount']
+
+def from_indexer(db, bootstrap):
+    """
+    Load payout inputs from a database written by the `indexer` script
+    @param bootstrap Indexed bootstrap contract, to reconcile undone votes with
+    @return Tuple of voters with their votes used, incentive amounts per (protocol, incentive), total votes and
+        winners, None before the winners are declared
+    """
+    from scripts import indexer
+    state = indexer.state(db, bootstrap)
+    votes_used = [(voter, votes) for voter, votes in state['votes_used'].items() if votes > 0]
+    voted = sum(votes for _, votes in votes_used)
+    return votes_used, state['incentives'], voted, state['winners'] or None
+
+def from_chain(bootstrap, voters, block_id=None):
+    """
+    Load payout inputs from contract state
+    @param voters Iterable of unique voter addresses, for example from `incentive_tree.voters`
+    @return See `from_indexer`. Before the winners are declared the incentives of every whitelisted protocol are loaded
+    """
+    num_winners = bootstrap.num_winners(block_id=block_id)
+    if num_winners > 0:
+        winners = [bootstrap.winners_list(i, block_id=block_id) for i in range(num_winners)]
+        protocols = winners
+    else:
+        winners = None
+        stop_block = chain.blocks.height if block_id is None else block_id
+        protocols = list(dict.fromkeys(log.protocol for log in bootstrap.Whitelist.range(0, stop_block + 1)))
+    incentives = {}
+    for protocol in protocols:
+        for i in range(bootstrap.num_incentive_tokens(protocol, block_id=block_id)):
+            incentive = bootstrap.incentive_tokens(protocol, i, block_id=block_id)
+            incentives[(protocol, incentive)] = bootstrap.incentives(protocol, incentive, block_id=block_id)
+    votes_used = ((voter, bootstrap.votes_used(voter, block_id=block_id)) for voter in voters)
+    return votes_used, incentives, bootstrap.voted(block_id=block_id), winners
+
+def cells(incentives, winners=None):
+    """
+    (protocol, incentive, amount) of every incentive with a non-zero amount, optionally limited to winners
+    """
+    return [
+        (protocol, incentive, amount) for (protocol, incentive), amount in incentives.items()
+        if amount > 0 and (winners is None or protocol in winners)
+    ]
+
+def compute(votes, amounts, voted):
+    """
+    Payout of every voter for every incentive
+    @param votes Votes used per voter
+    @param amounts Incentive amount per column
+    @param voted Total votes
+    @return Matrix of shape (voters, incentives)
+    """
+    if voted == 0:
+        return np.zeros((len(votes), len(amounts)), dtype=object)
+    v = np.asarray(votes, dtype=object).reshape(-1, 1)
+    a = np.asarray(amounts, dtype=object).reshape(1, -1)
+    return (v * a) // voted
+
+def rows(votes_used, incentives, voted, winners=None, chunk_size=CHUNK_SIZE, skip_zero=True):
+    """
+    Stream (voter, protocol, incentive, amount) rows, voter-major
+    @param votes_used Iterable of (voter, votes used) pairs
+    """
+    columns = cells(incentives, winners)
+    amounts = [amount for _, _, amount in columns]
+    it = iter(votes_used)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        payouts = compute([votes for _, votes in chunk], amounts, voted)
+        for i, (voter, _) in enumerate(chunk):
+            for j, (protocol, incentive, _) in enumerate(columns):
+                amount = int(payouts[i, j])
+                if amount == 0 and skip_zero:
+                    continue
+                yield voter, protocol, incentive, amount
+
+def write_csv(rows, path):
+    """
+    @return Number of rows written
+    """
+    count = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+def write_parquet(rows, path, chunk_size=CHUNK_SIZE):
+    """
+    Write rows in row groups of `chunk_size`. Amounts are stored as decimal strings to stay exact
+    @return Number of rows written
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError('writing parquet requires pyarrow')
+
+    schema = pa.schema([(column, pa.string()) for column in COLUMNS])
+    count = 0
+    it = iter(rows)
+    with pq.ParquetWriter(path, schema) as writer:
+        while True:
+            chunk = list(islice(it, chunk_size))
+            if not chunk:
+                break
+            columns = [[str(row[i]) for row in chunk] for i in range(len(COLUMNS))]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            count += len(chunk)
+    return count
+
+def write(rows, path):
+    if path.endswith('.parquet'):
+        return write_parquet(rows, path)
+    return write_csv(rows, path)
+
+@click.command(cls=ConnectedProviderCommand)
+@click.option('--bootstrap', required=True, help='Bootstrap address')
+@click.option('--database', required=True, help='SQLite database written by the indexer')
+@click.option('--output', required=True, help='CSV or parquet file to write')
+@click.option('--chunk-size', default=CHUNK_SIZE, help='Voters per batch')
+@click.option('--rpc-cache', default=None, help='Cache RPC reads of finalized blocks in this SQLite file')
+def cli(bootstrap, database, output, chunk_size, rpc_cache):
+    import sqlite3
+    with installed(rpc_cache, chain.provider.web3) as cache:
+        votes_used, incentives, voted, winners = from_indexer(sqlite3.connect(database), project.Bootstrap.at(bootstrap))
+    count = write(rows(votes_used, incentives, voted, winners, chunk_size), output)
+    click.echo(f'{count} payouts written to {output}')
+    if cache is not None:
+        click.echo(cache.report())
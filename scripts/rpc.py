@@ -0,0 +1,35 @@
+"""
+Minimal asynchronous JSON-RPC client for the scripts that send many requests concurrently
+over a single pooled HTTP session.
+"""
+
+class RPCError(RuntimeError):
+    """
+    Request rejected by the node, either with a JSON-RPC error or an HTTP error status
+    """
+    def __init__(self, method, error):
+        super().__init__(f'{method} failed: {error}')
+        self.method = method
+        self.error = error
+
+class RPC:
+    """
+    Minimal asynchronous JSON-RPC client
+    @param session aiohttp client session
+    @param uri HTTP endpoint of the node
+    """
+    def __init__(self, session, uri):
+        self.session = session
+        self.uri = uri
+        self.id = 0
+
+    async def request(self, method, *params):
+        self.id += 1
+        payload = {'jsonrpc': '2.0', 'id': self.id, 'method': method, 'params': list(params)}
+        async with self.session.post(self.uri, json=payload) as response:
+            if response.status >= 400:
+                raise RPCError(method, f'HTTP {response.status} {await response.text()}')
+            result = await response.json()
+        if 'error' in result:
+            raise RPCError(method, result['error'])
+        return result['result']
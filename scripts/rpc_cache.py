@@ -0,0 +1,421 @@
+"""
+On-disk cache of JSON-RPC reads against finalized blocks.
+Reads of state and blocks at an explicit block number, and of logs in an explicit block range,
+are immutable once the block is finalized. Their responses are stored in SQLite under the hash of
+the method, the parameters and the hash of the block they were read at, so the cache stays valid
+across chains and forks that share block numbers. Requests against `latest`, `pending` or blocks
+that are not yet finalized, and lookups by transaction hash, always go to the node.
+
+The hashes of finalized blocks are stored as well, under the genesis hash of their chain, so a rerun
+does not fetch a block for every block number it reads at again. Local chains reuse the genesis
+hash across sessions, so every session first checks the most recent stored hash of its chain
+against the node and drops the stored hashes of the chain if it does not match.
+
+The cache is bounded in size, evicting the least recently used entries, and counts hits and misses
+per method. Wrap a web3 provider, which covers ape's providers as well since they send requests
+through it directly:
+
+    cache = Cache('rpc.db')
+    cache.install(chain.provider.web3)
+
+Pass `--rpc-cache rpc.db` to `ape test` to cache the requests of a test session, or to the
+indexer, payouts and state_reader scripts to cache their reads. Fork tests send
+their upstream requests from anvil, so point the fork's upstream at the caching proxy instead:
+
+    ape run rpc_cache serve --upstream <url> --database rpc.db --port 8546
+    ape run rpc_cache stats --database rpc.db
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+
+MAX_SIZE = 1024 * 1024 * 1024 # bytes
+CONFIRMATIONS = 64 # finality depth for nodes without the `finalized` block tag
+FINALITY_INTERVAL = 12 # seconds between finality checks
+
+# position of the block parameter of methods that read state at a block
+BLOCK_PARAMS = {
+    'eth_call': 1,
+    'eth_getBalance': 1,
+    'eth_getCode': 1,
+    'eth_getTransactionCount': 1,
+    'eth_getStorageAt': 2,
+    'eth_getProof': 2,
+    'eth_getBlockByNumber': 0,
+    'eth_getBlockReceipts': 0,
+}
+# methods that replace blocks of a local chain, invalidating the known block hashes
+RESET_METHODS = {'evm_revert', 'anvil_reset', 'hardhat_reset', 'anvil_loadState', 'anvil_rollback'}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS blocks (
+    genesis TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (genesis, number)
+);
+'''
+
+def _block_number(value):
+    """
+    Block number of a block parameter, or None for tags and block hashes
+    """
+    if isinstance(value, dict):
+        value = value.get('blockNumber')
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.startswith('0x') and len(value) < 66:
+        return int(value, 16)
+    return None
+
+def _int(value):
+    return value if isinstance(value, int) else int(value, 16)
+
+def _hex(value):
+    return value if isinstance(value, str) else '0x' + bytes(value).hex()
+
+def _json(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=_default)
+
+def _default(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, bytes):
+        return _hex(value)
+    return str(value)
+
+class Cache:
+    """
+    Size bounded cache of RPC responses for finalized blocks
+    @param path SQLite database to store entries in
+    @param max_size Total size of cached responses in bytes
+    @param confirmations Finality depth, None to use the `finalized` block tag
+    @param finality_interval Seconds between finality checks
+    """
+    def __init__(self, path, max_size=MAX_SIZE, confirmations=None, finality_interval=FINALITY_INTERVAL):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.max_size = max_size
+        self.confirmations = confirmations
+        self.finality_interval = finality_interval
+        self.lock = threading.Lock()
+        self.size = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        self.clock = self.db.execute('SELECT COALESCE(MAX(accessed), 0) FROM entries').fetchone()[0]
+        self.genesis = None
+        self.reset()
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.evictions = 0
+        self.upstream = 0
+        self.methods = {}
+
+    def reset(self):
+        """
+        Forget the finalized height and block hashes of the connected chain, including the stored
+        ones, as a local chain replaced its blocks
+        """
+        if self.genesis is not None:
+            with self.lock, self.db:
+                self.db.execute('DELETE FROM blocks WHERE genesis = ?', (self.genesis,))
+        self.finalized = -1
+        self.finality_checked = float('-inf')
+        self.hashes = {}
+        self.genesis = None
+
+    def _send(self, make_request, method, params):
+        self.upstream += 1
+        return make_request(method, params)
+
+    def _finalized(self, make_request, number):
+        """
+        Whether a block is finalized, checking the node at most once per interval
+        """
+        if number <= self.finalized:
+            return True
+        if time.monotonic() - self.finality_checked < self.finality_interval:
+            return False
+        self.finality_checked = time.monotonic()
+        if self.confirmations is None:
+            response = self._send(make_request, 'eth_getBlockByNumber', ['finalized', False])
+            if response.get('result'):
+                self.finalized = _int(response['result']['number'])
+                return number <= self.finalized
+        response = self._send(make_request, 'eth_blockNumber', [])
+        if 'result' in response:
+            self.finalized = max(self.finalized, _int(response['result']) - (CONFIRMATIONS if self.confirmations is None else self.confirmations))
+        return number <= self.finalized
+
+    def _fetch_hash(self, make_request, number):
+        response = self._send(make_request, 'eth_getBlockByNumber', [hex(number), False])
+        block = response.get('result')
+        return _hex(block['hash']) if block else None
+
+    def _chain(self, make_request):
+        """
+        Genesis hash of the connected chain, checking once per session that the stored block
+        hashes of the chain are those of the node
+        """
+        if self.genesis is None:
+            genesis = self._fetch_hash(make_request, 0)
+            if genesis is None:
+                return None
+            with self.lock:
+                row = self.db.execute('SELECT number, hash FROM blocks WHERE genesis = ? ORDER BY number DESC LIMIT 1', (genesis,)).fetchone()
+            if row and self._fetch_hash(make_request, row[0]) != row[1]:
+                with self.lock, self.db:
+                    self.db.execute('DELETE FROM blocks WHERE genesis = ?', (genesis,))
+            self.genesis = genesis
+        return self.genesis
+
+    def _block_hash(self, make_request, number):
+        """
+        Hash of a finalized block, from memory, the database or the node
+        """
+        if number not in self.hashes:
+            genesis = self._chain(make_request)
+            if genesis is None:
+                return None
+            with self.lock:
+                row = self.db.execute('SELECT hash FROM blocks WHERE genesis = ? AND number = ?', (genesis, number)).fetchone()
+            if row:
+                self.hashes[number] = row[0]
+            else:
+                block_hash = self._fetch_hash(make_request, number)
+                if block_hash is None:
+                    return None
+                with self.lock, self.db:
+                    self.db.execute('INSERT OR REPLACE INTO blocks VALUES (?, ?, ?)', (genesis, number, block_hash))
+                self.hashes[number] = block_hash
+        return self.hashes[number]
+
+    def _block(self, method, params):
+        """
+        Block a request reads at, or None if it does not read at a fixed block number
+        """
+        if method in BLOCK_PARAMS:
+            index = BLOCK_PARAMS[method]
+            return _block_number(params[index]) if len(params) > index else None
+        if method == 'eth_getLogs' and params and 'blockHash' not in params[0]:
+            start = _block_number(params[0].get('fromBlock'))
+            stop = _block_number(params[0].get('toBlock'))
+            return stop if start is not None else None
+        return None
+
+    def get(self, key):
+        with self.lock:
+            row = self.db.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self.clock += 1
+            with self.db:
+                self.db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (self.clock, key))
+        return json.loads(row[0])
+
+    def put(self, key, method, result):
+        value = _json(result)
+        with self.lock:
+            self.clock += 1
+            with self.db:
+                row = self.db.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+                if row:
+                    self.size -= row[0]
+                self.db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)', (key, method, value, len(value), self.clock))
+                self.size += len(value)
+                self._evict()
+
+    def _evict(self):
+        """
+        Delete the least recently used entries until the cache fits in its size
+        """
+        while self.size > self.max_size:
+            rows = self.db.execute('SELECT key, size FROM entries ORDER BY accessed LIMIT 64').fetchall()
+            for key, size in rows:
+                if self.size <= self.max_size:
+                    break
+                self.db.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self.size -= size
+                self.evictions += 1
+
+    def _count(self, method, hit):
+        counts = self.methods.setdefault(method, [0, 0])
+        counts[0 if hit else 1] += 1
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def request(self, make_request, method, params):
+        """
+        Answer a request from the cache, or send it with `make_request` and cache the response
+        """
+        params = list(params or [])
+        if method in RESET_METHODS:
+            self.reset()
+        number = self._block(method, params)
+        if number is None or not self._finalized(make_request, number):
+            self.uncached += 1
+            return self._send(make_request, method, params)
+        block_hash = self._block_hash(make_request, number)
+        if block_hash is None:
+            self.uncached += 1
+            return self._send(make_request, method, params)
+        key = hashlib.sha256(_json([method, params, block_hash]).encode()).hexdigest()
+        result = self.get(key)
+        if result is not None:
+            self._count(method, True)
+            return {'jsonrpc': '2.0', 'id': 0, 'result': result}
+        self._count(method, False)
+        response = self._send(make_request, method, params)
+        if 'error' not in response and response.get('result') is not None:
+            self.put(key, method, response['result'])
+        return response
+
+    def wrap(self, make_request):
+        def cached(method, params):
+            return self.request(make_request, method, params)
+        return cached
+
+    def middleware(self, make_request, w3):
+        """
+        Web3 middleware, for web3 instances that send every request through the middleware stack
+        """
+        return self.wrap(make_request)
+
+    def install(self, web3):
+        """
+        Cache every request sent through a web3 provider. JSON-RPC providers are wrapped directly,
+        in-process providers only take JSON-RPC requests in the middleware stack
+        @return Function that removes the cache again
+        """
+        from web3.providers import JSONBaseProvider
+        provider = web3.provider
+        if not isinstance(provider, JSONBaseProvider):
+            name = f'rpc_cache_{id(self)}'
+            web3.middleware_onion.add(self.middleware, name=name)
+            return lambda: web3.middleware_onion.remove(name)
+        original = provider.make_request
+        provider.make_request = self.wrap(original)
+        def uninstall():
+            provider.make_request = original
+        return uninstall
+
+    def metrics(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'uncached': self.uncached,
+            'upstream': self.upstream,
+            'evictions': self.evictions,
+            'entries': self.db.execute('SELECT COUNT(*) FROM entries').fetchone()[0],
+            'blocks': self.db.execute('SELECT COUNT(*) FROM blocks').fetchone()[0],
+            'size': self.size,
+            'methods': {method: {'hits': hits, 'misses': misses} for method, (hits, misses) in sorted(self.methods.items())},
+        }
+
+    def report(self):
+        metrics = self.metrics()
+        lines = [
+            f'{metrics["hits"]} hits, {metrics["misses"]} misses ({metrics["hit_rate"]:.1%}), {metrics["uncached"]} uncached, '
+            f'{metrics["upstream"]} upstream requests, {metrics["entries"]} entries in {metrics["size"]} bytes, {metrics["evictions"]} evicted, '
+            f'{metrics["blocks"]} block hashes'
+        ]
+        for method, counts in metrics['methods'].items():
+            lines.append(f'  {method}: {counts["hits"]} hits, {counts["misses"]} misses')
+        return '\n'.join(lines)
+
+@contextmanager
+def installed(path, web3):
+    """
+    Cache the requests sent through a web3 provider while the context is open
+    @param path SQLite cache file, None to not cache
+    @return Cache, None if `path` is None
+    """
+    if path is None:
+        yield None
+        return
+    cache = Cache(path)
+    uninstall = cache.install(web3)
+    try:
+        yield cache
+    finally:
+        uninstall()
+
+def proxy(cache, upstream, host, port):
+    """
+    HTTP JSON-RPC server that answers from the cache and forwards everything else to the upstream node
+    """
+    from web3 import HTTPProvider
+    make_request = HTTPProvider(upstream).make_request
+
+    def handle(payload):
+        response = cache.request(make_request, payload['method'], payload.get('params', []))
+        return {**response, 'id': payload.get('id')}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            if isinstance(payload, list):
+                response = [handle(p) for p in payload]
+            else:
+                response = handle(payload)
+            body = _json(response).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+@click.group()
+def cli():
+    pass
+
+@cli.command()
+@click.option('--upstream', required=True, help='URL of the node to forward requests to')
+@click.option('--database', required=True, help='SQLite cache file')
+@click.option('--max-size', default=MAX_SIZE, help='Maximum size of the cache in bytes')
+@click.option('--confirmations', default=None, type=int, help='Finality depth, defaults to the `finalized` block tag')
+@click.option('--host', default='127.0.0.1', help='Address to listen on')
+@click.option('--port', default=8546, help='Port to listen on')
+def serve(upstream, database, max_size, confirmations, host, port):
+    cache = Cache(database, max_size, confirmations)
+    server = proxy(cache, upstream, host, port)
+    click.echo(f'serving {upstream} on http://{host}:{port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    click.echo(cache.report())
+
+@cli.command()
+@click.option('--database', required=True, help='SQLite cache file')
+def stats(database):
+    db = sqlite3.connect(database)
+    db.executescript(SCHEMA)
+    rows = db.execute('SELECT method, COUNT(*), SUM(size) FROM entries GROUP BY method ORDER BY method').fetchall()
+    for method, count, size in rows:
+        click.echo(f'{method}: {count} entries, {size} bytes')
+    click.echo(f'{sum(row[1] for row in rows)} entries, {sum(row[2] for row in rows)} bytes')
@@ -0,0 +1,246 @@
+"""
+Batched reader of per-account Bootstrap state through Multicall3.
+Reads `deposits`, `votes_used`, `votes_used_protocol` and `claimable_incentive` of every account
+with `aggregate3` calls, instead of one `eth_call` per value. Calldata is built from precomputed
+selectors, and the `aggregate3` encoder and decoder are looked up once. Batches are sent
+concurrently over a single pooled HTTP session. A batch that fails, for example by running into
+the node's gas cap or response size limit, is split in half, and later batches use the smaller size.
+
+Results are returned as columns: one entry per account, and one column per protocol or
+(protocol, incentive) pair for the two-dimensional views. Columns are int64 arrays when every value
+fits, and object arrays of exact integers otherwise.
+
+    ape run state_reader --bootstrap <address> --output state.csv
+"""
+
+import asyncio
+import csv
+
+import click
+import numpy as np
+from ape import chain, project
+from ape.cli import ConnectedProviderCommand
+from eth_abi.decoding import ContextFramesBytesIO
+from eth_abi.registry import registry
+from eth_utils import keccak
+from web3.exceptions import Web3Exception
+
+from scripts.rpc import RPC, RPCError
+from scripts.rpc_cache import installed
+
+MULTICALL3 = '0xcA11bde05977b3631167028862bE2a173976CA11'
+BATCH_SIZE = 256
+CONCURRENCY = 16
+INT64_MAX = 2**63 - 1
+
+AGGREGATE3 = keccak(text='aggregate3((address,bool,bytes)[])')[:4]
+AGGREGATE3_ENCODER = registry.get_encoder('((address,bool,bytes)[])')
+AGGREGATE3_DECODER = registry.get_decoder('((bool,bytes)[])')
+
+DEPOSITS = keccak(text='deposits(address)')[:4]
+VOTES_USED = keccak(text='votes_used(address)')[:4]
+VOTES_USED_PROTOCOL = keccak(text='votes_used_protocol(address,address)')[:4]
+CLAIMABLE_INCENTIVE = keccak(text='claimable_incentive(address,address,address)')[:4]
+
+def _word(address):
+    return bytes.fromhex(str(address)[2:]).rjust(32, b'\x00')
+
+def _bytes(value):
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    return bytes(value)
+
+def encode_call(selector, *addresses):
+    """
+    Calldata of a view that only takes addresses
+    """
+    return selector + b''.join(_word(address) for address in addresses)
+
+def encode_aggregate3(calls):
+    """
+    Calldata of `aggregate3` for a list of (target, calldata), allowing every call to fail
+    """
+    return AGGREGATE3 + AGGREGATE3_ENCODER(([(target, True, data) for target, data in calls],))
+
+def decode_aggregate3(data):
+    """
+    @return List of (success, return data)
+    """
+    return AGGREGATE3_DECODER(ContextFramesBytesIO(_bytes(data)))[0]
+
+def column(values):
+    """
+    Integer column, int64 if all values fit
+    """
+    values = list(values)
+    if all(0 <= value <= INT64_MAX for value in values):
+        return np.asarray(values, dtype=np.int64)
+    return np.asarray(values, dtype=object)
+
+class Reader:
+    """
+    Executes view calls in `aggregate3` batches
+    @param send Coroutine taking a JSON-RPC method and parameters, returning the result and raising
+        `RPCError` when the node rejects the request
+    @param multicall Address of a contract implementing `aggregate3`
+    @param block Block to read at
+    """
+    def __init__(self, send, multicall=MULTICALL3, block='latest', batch_size=BATCH_SIZE, concurrency=CONCURRENCY):
+        self.send = send
+        self.multicall = str(multicall)
+        self.block = hex(block) if isinstance(block, int) else block
+        self.batch_size = batch_size
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.requests = 0
+
+    async def aggregate(self, calls):
+        params = [{'to': self.multicall, 'data': '0x' + encode_aggregate3(calls).hex()}, self.block]
+        async with self.semaphore:
+            self.requests += 1
+            result = await self.send('eth_call', params)
+        return decode_aggregate3(result)
+
+    async def _batch(self, calls):
+        if len(calls) > self.batch_size:
+            return await self._split(calls, self.batch_size)
+        try:
+            return await self.aggregate(calls)
+        except RPCError:
+            if len(calls) == 1:
+                raise
+            self.batch_size = min(self.batch_size, len(calls) // 2)
+            return await self._split(calls, (len(calls) + 1) // 2)
+
+    async def _split(self, calls, size):
+        results = await asyncio.gather(*[self._batch(calls[i:i+size]) for i in range(0, len(calls), size)])
+        return [result for batch in results for result in batch]
+
+    async def call(self, calls):
+        """
+        Execute (target, calldata) view calls that return a single uint256
+        @return List of integers
+        """
+        if len(calls) == 0:
+            return []
+        results = await self._batch(calls)
+        values = []
+        for (target, data), (success, result) in zip(calls, results):
+            if not success:
+                raise ValueError(f'call {data[:4].hex()} to {target} failed')
+            values.append(int.from_bytes(result[:32], 'big'))
+        return values
+
+async def read_state(reader, bootstrap, accounts, protocols=(), incentives=()):
+    """
+    Read the state of every account
+    @param protocols Protocols to read `votes_used_protocol` for
+    @param incentives (protocol, incentive) pairs to read `claimable_incentive` for
+    @return Dict of columns, two-dimensional views have shape (accounts, protocols or incentives)
+    """
+    bootstrap = str(bootstrap)
+    width = 2 + len(protocols) + len(incentives)
+    calls = []
+    for account in accounts:
+        calls.append((bootstrap, encode_call(DEPOSITS, account)))
+        calls.append((bootstrap, encode_call(VOTES_USED, account)))
+        for protocol in protocols:
+            calls.append((bootstrap, encode_call(VOTES_USED_PROTOCOL, account, protocol)))
+        for protocol, incentive in incentives:
+            calls.append((bootstrap, encode_call(CLAIMABLE_INCENTIVE, protocol, incentive, account)))
+    values = await reader.call(calls)
+    rows = [values[i:i+width] for i in range(0, len(values), width)]
+    return {
+        'account': np.asarray([str(account) for account in accounts], dtype=object),
+        'deposits': column(row[0] for row in rows),
+        'votes_used': column(row[1] for row in rows),
+        'votes_used_protocol': column(v for row in rows for v in row[2:2+len(protocols)]).reshape(len(rows), len(protocols)),
+        'claimable_incentive': column(v for row in rows for v in row[2+len(protocols):]).reshape(len(rows), len(incentives)),
+    }
+
+def provider_sender(provider, threads=False):
+    """
+    Send requests through the connected ape provider, for providers without an HTTP endpoint or
+    with an RPC cache installed on them
+    @param threads Send from worker threads, for providers that are safe to call concurrently
+    """
+    async def send(method, params):
+        try:
+            if threads:
+                return await asyncio.to_thread(provider.web3.manager.request_blocking, method, params)
+            return provider.web3.manager.request_blocking(method, params)
+        except (ValueError, Web3Exception) as error:
+            # web3 raises errors returned by the node as either, depending on its version
+            raise RPCError(method, error) from error
+    return send
+
+def read(bootstrap, accounts, protocols=(), incentives=(), multicall=MULTICALL3, block='latest', batch_size=BATCH_SIZE, concurrency=CONCURRENCY, cached=False):
+    """
+    Read the state of every account from the connected provider, see `read_state`
+    @param cached Send through the provider's web3 instance, which has an RPC cache installed
+    """
+    uri = getattr(chain.provider, 'http_uri', None)
+
+    async def run():
+        if uri is None or cached:
+            reader = Reader(provider_sender(chain.provider, uri is not None), multicall, block, batch_size, concurrency)
+            return await read_state(reader, bootstrap, accounts, protocols, incentives)
+        import aiohttp
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+            rpc = RPC(session, uri)
+            reader = Reader(lambda method, params: rpc.request(method, *params), multicall, block, batch_size, concurrency)
+            return await read_state(reader, bootstrap, accounts, protocols, incentives)
+
+    return asyncio.run(run())
+
+def participants(bootstrap, start_block=0, stop_block=None):
+    """
+    Unique depositors in order of their first `Deposit` event
+    """
+    if stop_block is None:
+        stop_block = chain.blocks.height
+    seen = {}
+    for log in bootstrap.Deposit.range(start_block, stop_block + 1):
+        seen.setdefault(log.receiver, None)
+    return list(seen)
+
+def winner_incentives(bootstrap):
+    return [
+        (protocol, bootstrap.incentive_tokens(protocol, i))
+        for protocol in [bootstrap.winners_list(i) for i in range(bootstrap.num_winners())]
+        for i in range(bootstrap.num_incentive_tokens(protocol))
+    ]
+
+def write_csv(state, protocols, incentives, path):
+    header = ['account', 'deposits', 'votes_used']
+    header += [f'votes_used_protocol:{protocol}' for protocol in protocols]
+    header += [f'claimable_incentive:{protocol}:{incentive}' for protocol, incentive in incentives]
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i, account in enumerate(state['account']):
+            writer.writerow(
+                [account, int(state['deposits'][i]), int(state['votes_used'][i])] +
+                [int(v) for v in state['votes_used_protocol'][i]] +
+                [int(v) for v in state['claimable_incentive'][i]]
+            )
+
+@click.command(cls=ConnectedProviderCommand)
+@click.option('--bootstrap', required=True, help='Bootstrap address')
+@click.option('--multicall', default=MULTICALL3, help='Multicall3 address')
+@click.option('--start-block', default=0, help='Block to start reading depositors from')
+@click.option('--batch-size', default=BATCH_SIZE, help='Initial calls per aggregate3 batch')
+@click.option('--concurrency', default=CONCURRENCY, help='Batches in flight at once')
+@click.option('--output', required=True, help='CSV file to write')
+@click.option('--rpc-cache', default=None, help='Cache RPC reads of finalized blocks in this SQLite file')
+def cli(bootstrap, multicall, start_block, batch_size, concurrency, output, rpc_cache):
+    bootstrap = project.Bootstrap.at(bootstrap)
+    block = chain.blocks.height
+    with installed(rpc_cache, chain.provider.web3) as cache:
+        accounts = participants(bootstrap, start_block, block)
+        protocols = [log.protocol for log in bootstrap.Whitelist.range(start_block, block + 1)]
+        incentives = winner_incentives(bootstrap)
+        state = read(bootstrap, accounts, protocols, incentives, multicall, block, batch_size, concurrency, cache is not None)
+    write_csv(state, protocols, incentives, output)
+    click.echo(f'state of {len(accounts)} accounts written to {output}')
+    if cache is not None:
+        click.echo(cache.report())
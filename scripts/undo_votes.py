@@ -0,0 +1,54 @@
+"""
+Management driver that frees the votes of all accounts that voted for a protocol
+that had its whitelist retracted. Voters are read from `Vote` events of the protocol
+and sent to `undo_votes` in batches.
+
+    ape run undo_votes --bootstrap <address> --protocol <address>
+"""
+
+import click
+from ape import chain, project
+from ape.cli import ConnectedProviderCommand, account_option
+
+MAX_BATCH = 256
+
+def voters(bootstrap, protocol, start_block=0, stop_block=None):
+    """
+    Unique accounts in order of their first `Vote` event for the protocol
+    """
+    seen = set()
+    if stop_block is None:
+        stop_block = chain.blocks.height
+    for log in bootstrap.Vote.range(start_block, stop_block + 1, search_topics={'protocol': protocol}):
+        if log.voter in seen:
+            continue
+        seen.add(log.voter)
+        yield log.voter
+
+def affected(bootstrap, protocol, accounts):
+    """
+    Accounts that still have votes for the protocol
+    """
+    return [account for account in accounts if bootstrap.votes_used_protocol(account, protocol) > 0]
+
+def undo(bootstrap, protocol, sender, start_block=0, batch_size=MAX_BATCH):
+    """
+    Undo the votes of all affected accounts
+    @return Transaction receipts
+    """
+    accounts = affected(bootstrap, protocol, voters(bootstrap, protocol, start_block))
+    receipts = []
+    for i in range(0, len(accounts), batch_size):
+        receipts.append(bootstrap.undo_votes(protocol, accounts[i:i+batch_size], sender=sender))
+    return receipts
+
+@click.command(cls=ConnectedProviderCommand)
+@account_option()
+@click.option('--bootstrap', required=True, help='Bootstrap address')
+@click.option('--protocol', required=True, help='Protocol that had its whitelist retracted')
+@click.option('--start-block', default=0, help='Block to start reading votes from')
+@click.option('--batch-size', default=MAX_BATCH, help='Accounts per transaction')
+def cli(account, bootstrap, protocol, start_block, batch_size):
+    bootstrap = project.Bootstrap.at(bootstrap)
+    for receipt in undo(bootstrap, protocol, account, start_block, batch_size):
+        click.echo(f'{receipt.txn_hash}: {receipt.gas_used} gas')
@@ -0,0 +1,522 @@
+"""
+Pure Python model of `Bootstrap.vy` with the same state transitions and revert conditions,
+used to run many random action sequences without a chain. `replay` runs a sequence against
+a deployed contract so the model can be checked against it.
+
+Actors, protocols and incentive tokens are referred to by index. In the model an index is
+its own identity, on chain it is mapped to an account or contract.
+Deferred staking, merkle claims and the batched claim functions are not modelled.
+"""
+
+import random
+from ape.exceptions import ContractLogicError
+
+WEEK_LENGTH = 7 * 24 * 60 * 60
+HOUR_LENGTH = 60 * 60
+ONE = 1_000_000_000_000_000_000
+MAX = 2**256 - 1
+VOTER_MASK = 2**128 - 1
+
+NOTHING = 0
+APPLIED = 1
+WHITELISTED = 2
+MAX_WINNERS = 5
+
+MANAGEMENT = 0
+TREASURY = 1
+
+# phase 0 is before the whitelist period, every later phase starts one week after the previous one
+WHITELIST, INCENTIVE, DEPOSIT, VOTE, DECLARE, UNLOCKED = range(1, 7)
+
+class Reverted(Exception):
+    pass
+
+def check(condition, message=''):
+    if not condition:
+        raise Reverted(message)
+
+def schedule(ts):
+    """
+    Periods of a bootstrap whose whitelist period begins at `ts`
+    @return Dictionary of (begin, end) per period and lock end
+    """
+    return {
+        'whitelist': (ts, ts + WEEK_LENGTH),
+        'incentive': (ts + WEEK_LENGTH, ts + 2 * WEEK_LENGTH),
+        'deposit': (ts + 2 * WEEK_LENGTH, ts + 3 * WEEK_LENGTH),
+        'vote': (ts + 3 * WEEK_LENGTH, ts + 4 * WEEK_LENGTH),
+        'lock_end': ts + 5 * WEEK_LENGTH,
+    }
+
+def phase_timestamp(ts, phase):
+    """
+    Timestamp used for all transactions in a phase, one hour into the phase
+    """
+    if phase == 0:
+        return ts - 1
+    return ts + (phase - 1) * WEEK_LENGTH + HOUR_LENGTH
+
+class BootstrapModel:
+    """
+    Bootstrap state machine. Every action checks all of its revert conditions before it changes
+    any state, so a reverted action leaves the model untouched
+    @param balances Initial token balances keyed by (token, account). The token is an incentive index or 'yeth'
+    """
+    def __init__(self, balances=None):
+        self.now = 0
+        self.management = MANAGEMENT
+        self.treasury = TREASURY
+        self.repay_allowed = set()
+        self.applications = {}
+        self.debt = 0
+        self.deposited = 0
+        self.balance = 0
+        self.deposits = {}
+        self.votes_used = {}
+        self.incentives = {}
+        self.incentive_depositors = {}
+        self.voted = 0
+        self.votes_used_protocol = {}
+        self.votes = {}
+        self.winners = []
+        self.incentive_tokens = {}
+        self.claimed = set()
+        self.balances = dict(balances or {})
+        self.whitelist_begin = self.whitelist_end = 0
+        self.incentive_begin = self.incentive_end = 0
+        self.deposit_begin = self.deposit_end = 0
+        self.vote_begin = self.vote_end = 0
+        self.lock_end = 0
+
+    def _in(self, begin, end):
+        return self.now >= begin and self.now < end
+
+    def _transfer(self, token, sender, receiver, amount):
+        check(self.balances.get((token, sender), 0) >= amount, 'transfer amount')
+        self.balances[(token, sender)] = self.balances.get((token, sender), 0) - amount
+        self.balances[(token, receiver)] = self.balances.get((token, receiver), 0) + amount
+
+    # periods
+
+    def set_whitelist_period(self, sender, begin, end):
+        check(sender == self.management)
+        check(end > begin)
+        self.whitelist_begin, self.whitelist_end = begin, end
+
+    def set_incentive_period(self, sender, begin, end):
+        check(sender == self.management)
+        check(begin >= self.whitelist_begin)
+        check(end > begin)
+        self.incentive_begin, self.incentive_end = begin, end
+
+    def set_deposit_period(self, sender, begin, end):
+        check(sender == self.management)
+        check(begin >= self.whitelist_begin)
+        check(end > begin)
+        self.deposit_begin, self.deposit_end = begin, end
+
+    def set_vote_period(self, sender, begin, end):
+        check(sender == self.management)
+        check(begin >= self.deposit_begin)
+        check(end > begin)
+        check(end <= self.lock_end)
+        self.vote_begin, self.vote_end = begin, end
+
+    def set_lock_end(self, sender, end):
+        check(sender == self.management)
+        check(end >= self.vote_end)
+        self.lock_end = end
+
+    def set_schedule(self, periods):
+        """
+        Set all periods as returned by `schedule`, in the same order as the test fixtures
+        """
+        self.set_whitelist_period(self.management, *periods['whitelist'])
+        self.set_incentive_period(self.management, *periods['incentive'])
+        self.set_deposit_period(self.management, *periods['deposit'])
+        self.set_lock_end(self.management, periods['lock_end'])
+        self.set_vote_period(self.management, *periods['vote'])
+
+    # actions
+
+    def apply(self, sender, protocol, value):
+        check(value == ONE, 'application fee')
+        check(self._in(self.whitelist_begin, self.whitelist_end), 'outside application period')
+        check(self.applications.get(protocol, NOTHING) == NOTHING, 'already applied')
+        self.applications[protocol] = APPLIED
+        self.balance += value
+
+    def whitelist(self, sender, protocol):
+        check(sender == self.management)
+        check(self.applications.get(protocol, NOTHING) == APPLIED, 'has not applied')
+        self.applications[protocol] = WHITELISTED
+
+    def undo_whitelist(self, sender, protocol):
+        check(sender == self.management)
+        check(self.applications.get(protocol, NOTHING) == WHITELISTED, 'not whitelisted')
+        self.applications[protocol] = APPLIED
+
+    def incentivize(self, sender, protocol, incentive, amount):
+        check(amount > 0)
+        check(self._in(self.incentive_begin, self.incentive_end), 'outside incentive period')
+        check(self.applications.get(protocol, NOTHING) == WHITELISTED, 'not whitelisted')
+        self._transfer(incentive, sender, 'bootstrap', amount)
+        tokens = self.incentive_tokens.setdefault(protocol, [])
+        if incentive not in tokens:
+            tokens.append(incentive)
+        key = (protocol, incentive)
+        self.incentives[key] = self.incentives.get(key, 0) + amount
+        key = (protocol, incentive, sender)
+        self.incentive_depositors[key] = self.incentive_depositors.get(key, 0) + amount
+
+    def deposit(self, sender, account, value):
+        check(value > 0)
+        check(self._in(self.deposit_begin, self.deposit_end), 'outside deposit period')
+        check(self.lock_end > 0)
+        check(self.deposits.get(account, 0) + value <= VOTER_MASK)
+        self.debt += value
+        self.deposited += value
+        self.balance += value
+        self.deposits[account] = self.deposits.get(account, 0) + value
+
+    def vote(self, sender, protocols, votes):
+        check(len(protocols) == len(votes))
+        check(self._in(self.vote_begin, self.vote_end), 'outside vote period')
+        for protocol in protocols:
+            check(self.applications.get(protocol, NOTHING) == WHITELISTED, 'protocol not whitelisted')
+        used = self.votes_used.get(sender, 0) + sum(votes)
+        check(used <= self.deposits.get(sender, 0), 'too many votes')
+        for protocol, amount in zip(protocols, votes):
+            self.votes[protocol] = self.votes.get(protocol, 0) + amount
+            key = (sender, protocol)
+            self.votes_used_protocol[key] = self.votes_used_protocol.get(key, 0) + amount
+        self.voted += sum(votes)
+        self.votes_used[sender] = used
+
+    def undo_vote(self, sender, protocol, account):
+        check(self._in(self.vote_begin, self.vote_end), 'outside vote period')
+        check(self.applications.get(protocol, NOTHING) != WHITELISTED)
+        check(account == sender or sender == self.management)
+        votes = self.votes_used_protocol.get((account, protocol), 0)
+        check(votes > 0)
+        self.voted -= votes
+        self.votes[protocol] -= votes
+        self.votes_used[account] -= votes
+        self.votes_used_protocol[(account, protocol)] = 0
+        return votes
+
+    def declare_winners(self, sender, winners):
+        check(sender == self.management)
+        check(self.now >= self.incentive_end)
+        check(self.now >= self.deposit_end)
+        check(self.now >= self.vote_end)
+        check(len(self.winners) == 0)
+        check(len(set(winners)) == len(winners))
+        for winner in winners:
+            check(self.applications.get(winner, NOTHING) == WHITELISTED)
+        self.winners = list(winners)
+
+    def claimable_incentive(self, protocol, incentive, claimer):
+        if protocol not in self.winners or (protocol, incentive, claimer) in self.claimed:
+            return 0
+        # division by zero reverts in the view as well, only possible without any votes
+        check(self.voted > 0, 'division by zero')
+        return self.incentives.get((protocol, incentive), 0) * self.votes_used.get(claimer, 0) // self.voted
+
+    def claim_incentive(self, sender, protocol, incentive, claimer):
+        check(protocol in self.winners, 'protocol is not winner')
+        check((protocol, incentive, claimer) not in self.claimed, 'incentive already claimed')
+        amount = self.claimable_incentive(protocol, incentive, claimer)
+        check(amount > 0, 'nothing to claim')
+        self._transfer(incentive, 'bootstrap', claimer, amount)
+        self.claimed.add((protocol, incentive, claimer))
+        return amount
+
+    def refund_incentive(self, sender, protocol, incentive, depositor):
+        check(len(self.winners) > 0, 'no winners declared')
+        check(protocol not in self.winners, 'protocol is winner')
+        amount = self.incentive_depositors.get((protocol, incentive, depositor), 0)
+        check(amount > 0, 'nothing to refund')
+        self._transfer(incentive, 'bootstrap', depositor, amount)
+        self.incentive_depositors[(protocol, incentive, depositor)] = 0
+        return amount
+
+    def allow_repay(self, sender, account, allow):
+        check(sender == self.management)
+        if allow:
+            self.repay_allowed.add(account)
+        else:
+            self.repay_allowed.discard(account)
+
+    def repay(self, sender, amount):
+        check(sender in self.repay_allowed)
+        check(amount <= self.debt)
+        self._transfer('yeth', sender, 'bootstrap', amount)
+        self.debt -= amount
+        self.balances[('yeth', 'bootstrap')] -= amount
+
+    def split(self, sender):
+        check(sender == self.management or sender == self.treasury)
+        check(self.balance > 0)
+        self.balance = 0
+
+    def execute(self, action):
+        """
+        Execute a single action
+        @return Return value of the action, or the `Reverted` exception if it reverted
+        """
+        name, *args = action
+        try:
+            return getattr(self, name)(*args)
+        except Reverted as e:
+            return e
+
+    def check_invariants(self):
+        assert self.voted == sum(self.votes_used.values()) == sum(self.votes.values())
+        assert self.deposited == sum(self.deposits.values())
+        for account, used in self.votes_used.items():
+            assert used <= self.deposits.get(account, 0)
+        if self.voted > 0:
+            # rounding down never lets voters claim more than the incentive
+            for (protocol, incentive), amount in self.incentives.items():
+                if protocol in self.winners:
+                    total = sum(self.incentives[(protocol, incentive)] * used // self.voted for used in self.votes_used.values())
+                    assert total <= amount
+        assert all(amount >= 0 for amount in self.balances.values())
+
+class Generator:
+    """
+    Random action sequences that follow the bootstrap timeline. Arguments are picked from the
+    state of a model that runs alongside, so most actions are plausible, while a share of
+    actions uses arbitrary arguments and is likely to revert
+    """
+    def __init__(self, seed, num_actors=5, num_protocols=7, num_incentives=2, length=60, balances=None, noise=0.25):
+        self.rng = random.Random(seed)
+        self.actors = list(range(num_actors))
+        self.protocols = list(range(num_protocols))
+        self.incentives = list(range(num_incentives))
+        self.length = length
+        self.balances = balances or initial_balances(num_actors, num_incentives, 20 * ONE)
+        self.noise = noise
+
+    def amount(self, limit=None):
+        rng = self.rng
+        if limit is not None and limit > 0 and rng.random() > self.noise:
+            return rng.randrange(1, limit + 1)
+        return rng.choice([0, 1, rng.randrange(1, 1000), rng.randrange(1, 10 * ONE), 3 * ONE + rng.randrange(ONE)])
+
+    def pick(self, candidates, default):
+        # a random element of `candidates`, or of `default` for noise or if there are no candidates
+        candidates = list(candidates)
+        if candidates and self.rng.random() > self.noise:
+            return self.rng.choice(candidates)
+        return self.rng.choice(default)
+
+    def action(self, model, phase):
+        rng = self.rng
+        sender = rng.choice(self.actors)
+        management = MANAGEMENT if rng.random() > self.noise / 2 else sender
+        status = lambda status: [p for p in self.protocols if model.applications.get(p, NOTHING) == status]
+        incentive = rng.choice(self.incentives)
+        name = rng.choice({
+            0: ['apply', 'whitelist'],
+            WHITELIST: ['apply', 'apply', 'whitelist', 'whitelist', 'undo_whitelist'],
+            INCENTIVE: ['incentivize', 'incentivize', 'incentivize', 'whitelist', 'apply'],
+            DEPOSIT: ['deposit', 'deposit', 'deposit', 'incentivize', 'allow_repay', 'repay', 'split'],
+            VOTE: ['vote', 'vote', 'vote', 'vote', 'undo_whitelist', 'undo_vote', 'undo_vote', 'deposit'],
+            DECLARE: ['declare_winners', 'declare_winners', 'claim_incentive', 'claim_incentive', 'refund_incentive', 'repay', 'vote'],
+            UNLOCKED: ['claim_incentive', 'claim_incentive', 'refund_incentive', 'refund_incentive', 'split', 'repay', 'declare_winners'],
+        }[phase])
+
+        if name == 'apply':
+            return ('apply', sender, self.pick(status(NOTHING), self.protocols), ONE if rng.random() > self.noise / 2 else ONE - 1)
+        if name == 'whitelist':
+            return ('whitelist', management, self.pick(status(APPLIED), self.protocols))
+        if name == 'undo_whitelist':
+            voted = [p for p in status(WHITELISTED) if model.votes.get(p, 0) > 0]
+            return ('undo_whitelist', management, self.pick(voted, self.protocols))
+        if name == 'incentivize':
+            return ('incentivize', sender, self.pick(status(WHITELISTED), self.protocols), incentive, self.amount(model.balances.get((incentive, sender), 0) // 4))
+        if name == 'deposit':
+            return ('deposit', sender, rng.choice(self.actors), self.amount())
+        if name == 'vote':
+            available = model.deposits.get(sender, 0) - model.votes_used.get(sender, 0)
+            protocols = list(dict.fromkeys(self.pick(status(WHITELISTED), self.protocols) for _ in range(rng.randrange(1, 4))))
+            return ('vote', sender, protocols, [self.amount(available // len(protocols)) for _ in protocols])
+        if name == 'undo_vote':
+            votes = [key for key, votes in model.votes_used_protocol.items() if votes > 0 and model.applications.get(key[1]) != WHITELISTED]
+            account, protocol = self.pick(votes, [(a, p) for a in self.actors for p in self.protocols])
+            return ('undo_vote', account if rng.random() > self.noise else sender, protocol, account)
+        if name == 'declare_winners':
+            candidates = status(WHITELISTED) if rng.random() > self.noise else self.protocols
+            return ('declare_winners', management, rng.sample(candidates, rng.randrange(0, min(MAX_WINNERS, len(candidates)) + 1)))
+        if name == 'claim_incentive':
+            claims = [(p, i, a) for p in model.winners for i in model.incentive_tokens.get(p, []) for a in model.votes_used]
+            protocol, incentive, claimer = self.pick(claims, [(p, i, a) for p in self.protocols for i in self.incentives for a in self.actors])
+            return ('claim_incentive', claimer if rng.random() > self.noise else sender, protocol, incentive, claimer)
+        if name == 'refund_incentive':
+            refunds = [key for key, amount in model.incentive_depositors.items() if amount > 0 and key[0] not in model.winners]
+            protocol, incentive, depositor = self.pick(refunds, [(p, i, a) for p in self.protocols for i in self.incentives for a in self.actors])
+            return ('refund_incentive', depositor if rng.random() > self.noise else sender, protocol, incentive, depositor)
+        if name == 'allow_repay':
+            return ('allow_repay', management, rng.choice(self.actors), rng.random() > self.noise)
+        if name == 'repay':
+            sender = self.pick(model.repay_allowed, self.actors)
+            return ('repay', sender, self.amount(min(model.debt, model.balances.get(('yeth', sender), 0))))
+        return ('split', rng.choice([MANAGEMENT, TREASURY, sender]))
+
+    def sequence(self):
+        """
+        @return List of actions, with `('advance',)` moving to the next phase
+        """
+        ts = 100 * WEEK_LENGTH
+        model = BootstrapModel(self.balances)
+        model.set_schedule(schedule(ts))
+        model.now = phase_timestamp(ts, 0)
+        actions = []
+        phase = 0
+        for _ in range(self.length):
+            if phase < UNLOCKED and self.rng.random() < 0.12:
+                actions.append(('advance',))
+                phase += 1
+                model.now = phase_timestamp(ts, phase)
+                continue
+            action = self.action(model, phase)
+            model.execute(action)
+            actions.append(action)
+        return actions
+
+def initial_balances(num_actors, num_incentives, amount):
+    balances = {('yeth', actor): amount for actor in range(num_actors)}
+    for incentive in range(num_incentives):
+        for actor in range(num_actors):
+            balances[(incentive, actor)] = amount
+    return balances
+
+def run(actions, ts, balances):
+    """
+    Run a sequence of actions through a fresh model
+    @return Model and the outcome of every action
+    """
+    model = BootstrapModel(balances)
+    model.set_schedule(schedule(ts))
+    phase = 0
+    model.now = phase_timestamp(ts, phase)
+    outcomes = []
+    for action in actions:
+        if action[0] == 'advance':
+            phase += 1
+            model.now = phase_timestamp(ts, phase)
+            outcomes.append(None)
+            continue
+        outcomes.append(model.execute(action))
+        model.check_invariants()
+    return model, outcomes
+
+def coverage(actions, outcomes):
+    """
+    Distinct (action, reverted) pairs of a sequence
+    """
+    return {(action[0], isinstance(outcome, Reverted)) for action, outcome in zip(actions, outcomes) if action[0] != 'advance'}
+
+def sample(runs, k):
+    """
+    Greedily pick `k` sequences that together cover the most distinct (action, reverted) pairs,
+    preferring sequences with more successful actions
+    @param runs List of (actions, outcomes) pairs
+    @return Indices of the picked sequences
+    """
+    covered = set()
+    picked = []
+    for _ in range(min(k, len(runs))):
+        def score(i):
+            actions, outcomes = runs[i]
+            successes = sum(1 for a, o in zip(actions, outcomes) if a[0] != 'advance' and not isinstance(o, Reverted))
+            return len(coverage(actions, outcomes) - covered), successes
+        best = max((i for i in range(len(runs)) if i not in picked), key=score)
+        picked.append(best)
+        covered |= coverage(*runs[best])
+    return picked
+
+def replay(actions, chain, bootstrap, ts, actors, protocols, incentives):
+    """
+    Run a sequence of actions against a deployed bootstrap whose whitelist period begins at `ts`
+    @return Outcome of every action, `Reverted` for reverted transactions
+    """
+    phase = 0
+    outcomes = []
+    for action in actions:
+        name, *args = action
+        if name == 'advance':
+            phase += 1
+            chain.pending_timestamp = phase_timestamp(ts, phase)
+            outcomes.append(None)
+            continue
+        sender = actors[args[0]]
+        try:
+            outcomes.append(_send(bootstrap, name, sender, args[1:], actors, protocols, incentives))
+        except ContractLogicError as e:
+            outcomes.append(Reverted(str(e)))
+    return outcomes
+
+def _send(bootstrap, name, sender, args, actors, protocols, incentives):
+    if name == 'apply':
+        return bootstrap.apply(protocols[args[0]], value=args[1], sender=sender)
+    if name in ('whitelist', 'undo_whitelist'):
+        return getattr(bootstrap, name)(protocols[args[0]], sender=sender)
+    if name == 'incentivize':
+        return bootstrap.incentivize(protocols[args[0]], incentives[args[1]], args[2], sender=sender)
+    if name == 'deposit':
+        return bootstrap.deposit(actors[args[0]], value=args[1], sender=sender)
+    if name == 'vote':
+        return bootstrap.vote([protocols[p] for p in args[0]], args[1], sender=sender)
+    if name == 'undo_vote':
+        return bootstrap.undo_vote(protocols[args[0]], actors[args[1]], sender=sender)
+    if name == 'declare_winners':
+        return bootstrap.declare_winners([protocols[p] for p in args[0]], sender=sender)
+    if name in ('claim_incentive', 'refund_incentive'):
+        return getattr(bootstrap, name)(protocols[args[0]], incentives[args[1]], actors[args[2]], sender=sender)
+    if name == 'allow_repay':
+        return bootstrap.allow_repay(actors[args[0]], args[1], sender=sender)
+    if name == 'repay':
+        return bootstrap.repay(args[0], sender=sender)
+    if name == 'split':
+        return bootstrap.split(sender=sender)
+    raise ValueError(f'unknown action {name}')
+
+def compare(model, bootstrap, token, actors, protocols, incentives):
+    """
+    Assert that the contract state matches the model
+    """
+    assert bootstrap.debt() == model.debt
+    assert bootstrap.deposited() == model.deposited
+    assert bootstrap.voted() == model.voted
+    assert bootstrap.balance == model.balance
+    assert bootstrap.num_winners() == len(model.winners)
+    for i, winner in enumerate(model.winners):
+        assert bootstrap.winners_list(i) == protocols[winner]
+    for a, actor in enumerate(actors):
+        assert bootstrap.deposits(actor) == model.deposits.get(a, 0)
+        assert bootstrap.votes_used(actor) == model.votes_used.get(a, 0)
+        assert bootstrap.repay_allowed(actor) == (a in model.repay_allowed)
+        assert token.balanceOf(actor) == model.balances.get(('yeth', a), 0)
+        for i, incentive in enumerate(incentives):
+            assert incentive.balanceOf(actor) == model.balances.get((i, a), 0)
+    for i, incentive in enumerate(incentives):
+        assert incentive.balanceOf(bootstrap) == model.balances.get((i, 'bootstrap'), 0)
+    for p, protocol in enumerate(protocols):
+        status = model.applications.get(p, NOTHING)
+        assert bootstrap.has_applied(protocol) == (status > NOTHING)
+        assert bootstrap.is_whitelisted(protocol) == (status == WHITELISTED)
+        assert bootstrap.votes(protocol) == model.votes.get(p, 0)
+        tokens = model.incentive_tokens.get(p, [])
+        assert bootstrap.num_incentive_tokens(protocol) == len(tokens)
+        for j, i in enumerate(tokens):
+            assert bootstrap.incentive_tokens(protocol, j) == incentives[i]
+        for i, incentive in enumerate(incentives):
+            assert bootstrap.incentives(protocol, incentive) == model.incentives.get((p, i), 0)
+            for a, actor in enumerate(actors):
+                assert bootstrap.incentive_depositors(protocol, incentive, actor) == model.incentive_depositors.get((p, i, a), 0)
+                assert bootstrap.votes_used_protocol(actor, protocol) == model.votes_used_protocol.get((a, p), 0)
+                if model.voted > 0 or p not in model.winners:
+                    assert bootstrap.claimable_incentive(protocol, incentive, actor) == model.claimable_incentive(p, i, a)
@@ -0,0 +1,209 @@
+import pytest
+from ape import chain
+from scripts import gas
+
+WEEK_LENGTH = 7 * 24 * 60 * 60
+GAS_RESULTS = pytest.StashKey[dict]()
+RPC_CACHE = pytest.StashKey[object]()
+GAS_PROFILE = pytest.StashKey[object]()
+
+def pytest_addoption(parser):
+    parser.addoption('--record-state', default=None, help='Write a bundle of the touched mainnet-fork state to this path')
+    parser.addoption('--gas-baseline', default=None, help='Fail benchmarks that use more gas than in this baseline')
+    parser.addoption('--gas-threshold', default=gas.THRESHOLD, type=float, help='Allowed gas increase over the baseline in percent')
+    parser.addoption('--gas-output', default=None, help='Write the gas used by every benchmark to this path')
+    parser.addoption('--rpc-cache', default=None, help='Cache RPC reads of finalized blocks in this SQLite file')
+    parser.addoption('--gas-profile', default=None, help='Profile the transactions of every test, writing the reports to this path prefix')
+
+class Isolation:
+    """
+    Take ape's snapshots before any other fixture of the same scope, so reverting a test
+    keeps the module fixtures and reverting a module keeps the session fixtures. Autouse
+    fixtures are set up first in their scope and ape does not insert its own snapshot
+    fixtures into tests that already request them
+    """
+    @pytest.fixture(scope='session', autouse=True)
+    def session_snapshot(self, _session_isolation):
+        pass
+
+    @pytest.fixture(scope='module', autouse=True)
+    def module_snapshot(self, _module_isolation):
+        pass
+
+    @pytest.fixture(autouse=True)
+    def function_snapshot(self, _function_isolation):
+        pass
+
+def pytest_configure(config):
+    isolation = not config.getoption('disable_isolation', False)
+    if config.getoption('record_state') and isolation:
+        raise pytest.UsageError('--record-state requires --disable-isolation, reverts discard the fetched fork state')
+    if isolation:
+        config.pluginmanager.register(Isolation(), 'isolation')
+    config.stash[GAS_RESULTS] = {}
+    if config.getoption('gas_profile'):
+        # the profiler needs vvm to compile the sources of the traced contracts
+        from scripts.gas_profile import Profile
+        config.stash[GAS_PROFILE] = Profile()
+
+@pytest.fixture(scope='session')
+def measure_gas(request):
+    """
+    Record the gas used by a transaction under a benchmark key, failing on a regression
+    against the baseline if one is given
+    """
+    config = request.config
+    results = config.stash[GAS_RESULTS]
+    path = config.getoption('gas_baseline')
+    baseline = gas.load(path) if path else {}
+    threshold = config.getoption('gas_threshold')
+
+    def measure(key, tx):
+        assert key not in results, f'duplicate benchmark {key}'
+        results[key] = tx.gas_used
+        if key in baseline and gas.regressed(baseline[key], tx.gas_used, threshold):
+            pytest.fail(f'{key} used {tx.gas_used} gas, {gas.change(baseline[key], tx.gas_used):+.2f}% over the baseline of {baseline[key]}')
+        return tx.gas_used
+    return measure
+
+@pytest.fixture(scope='session', autouse=True)
+def rpc_cache(request, chain):
+    """
+    Answer reads of finalized blocks from an on-disk cache, if enabled
+    """
+    path = request.config.getoption('rpc_cache')
+    if path is None:
+        yield None
+        return
+    from scripts.rpc_cache import Cache
+    cache = Cache(path)
+    uninstall = cache.install(chain.provider.web3)
+    request.config.stash[RPC_CACHE] = cache
+    yield cache
+    uninstall()
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """
+    Profile the transactions sent by a test, before isolation reverts them
+    """
+    profile = item.config.stash.get(GAS_PROFILE, None)
+    if profile is None:
+        yield
+        return
+    if not chain.provider.supports_tracing:
+        raise pytest.UsageError('--gas-profile requires a provider that traces transactions, such as foundry')
+    start = chain.blocks.height
+    yield
+    for number in range(start + 1, chain.blocks.height + 1):
+        for tx in chain.blocks[number].transactions:
+            profile.add(tx.txn_hash)
+
+def pytest_terminal_summary(terminalreporter, config):
+    cache = config.stash.get(RPC_CACHE, None)
+    if cache is not None:
+        terminalreporter.write_sep('=', 'rpc cache')
+        terminalreporter.write_line(cache.report())
+    profile = config.stash.get(GAS_PROFILE, None)
+    if profile is not None:
+        path = config.getoption('gas_profile')
+        profile.write(path)
+        terminalreporter.write_line(f'gas profile of {profile.transactions} transactions written to {path}.folded and {path}.txt')
+    results = config.stash.get(GAS_RESULTS, {})
+    if len(results) == 0:
+        return
+    path = config.getoption('gas_baseline')
+    if path:
+        terminalreporter.write_sep('=', 'gas')
+        # benchmarks that did not run in a partial run are not reported as removed
+        baseline = {key: value for key, value in gas.load(path).items() if key in results}
+        terminalreporter.write_line(gas.report(baseline, results, config.getoption('gas_threshold')))
+    output = config.getoption('gas_output')
+    if output:
+        gas.save(results, output)
+        terminalreporter.write_line(f'gas of {len(results)} benchmarks written to {output}')
+
+@pytest.fixture(scope='module')
+def deployer(accounts):
+    return accounts[0]
+
+@pytest.fixture(scope='module')
+def treasury(accounts):
+    return accounts[1]
+
+@pytest.fixture(scope='module')
+def token(project, deployer):
+    return project.Token.deploy(sender=deployer)
+
+@pytest.fixture(scope='module')
+def staking(project, deployer, token):
+    return project.MockStaking.deploy(token, sender=deployer)
+
+@pytest.fixture(scope='module')
+def pol(project, deployer, token):
+    pol = project.POL.deploy(token, sender=deployer)
+    token.set_minter(pol, sender=deployer)
+    return pol
+
+@pytest.fixture(scope='module')
+def weekly_bootstrap(project, chain, deployer, treasury, pol, token, staking):
+    """
+    Deploy a bootstrap with consecutive weekly whitelist, incentive, deposit and vote periods, starting next week
+    """
+    def deploy(deferred=False):
+        bootstrap = project.Bootstrap.deploy(token, staking, treasury, pol, deferred, sender=deployer)
+        token.set_minter(bootstrap, sender=deployer)
+        ts = (chain.pending_timestamp // WEEK_LENGTH + 1) * WEEK_LENGTH
+        bootstrap.set_whitelist_period(ts, ts + WEEK_LENGTH, sender=deployer)
+        bootstrap.set_incentive_period(ts + WEEK_LENGTH, ts + 2 * WEEK_LENGTH, sender=deployer)
+        bootstrap.set_deposit_period(ts + 2 * WEEK_LENGTH, ts + 3 * WEEK_LENGTH, sender=deployer)
+        bootstrap.set_lock_end(ts + 5 * WEEK_LENGTH, sender=deployer)
+        bootstrap.set_vote_period(ts + 3 * WEEK_LENGTH, ts + 4 * WEEK_LENGTH, sender=deployer)
+        return bootstrap
+    return deploy
+
+@pytest.fixture(scope='module')
+def open_bootstrap(project, chain, deployer, treasury, pol, token, staking):
+    """
+    Deploy a bootstrap with all periods open at once for a week, the lock ending with them
+    """
+    def deploy(redeploy=False):
+        if redeploy:
+            bootstrap = project.BootstrapRedeploy.deploy(token, staking, treasury, pol, sender=deployer)
+        else:
+            bootstrap = project.Bootstrap.deploy(token, staking, treasury, pol, False, sender=deployer)
+        token.set_minter(bootstrap, sender=deployer)
+        ts = chain.pending_timestamp
+        bootstrap.set_whitelist_period(ts, ts + WEEK_LENGTH, sender=deployer)
+        bootstrap.set_incentive_period(ts, ts + WEEK_LENGTH, sender=deployer)
+        bootstrap.set_deposit_period(ts, ts + WEEK_LENGTH, sender=deployer)
+        bootstrap.set_lock_end(ts + WEEK_LENGTH, sender=deployer)
+        bootstrap.set_vote_period(ts, ts + WEEK_LENGTH, sender=deployer)
+        return bootstrap
+    return deploy
+
+@pytest.fixture(scope='module')
+def bootstrap(weekly_bootstrap):
+    return weekly_bootstrap()
+
+# phase fixtures move to the start of a period of `bootstrap`, test isolation reverts the time travel
+
+@pytest.fixture
+def in_whitelist(chain, bootstrap):
+    chain.pending_timestamp = bootstrap.whitelist_begin()
+
+@pytest.fixture
+def in_incentive(chain, bootstrap):
+    chain.pending_timestamp = bootstrap.incentive_begin()
+
+@pytest.fixture
+def in_deposit(chain, bootstrap):
+    chain.pending_timestamp = bootstrap.deposit_begin()
+
+@pytest.fixture
+def in_vote(chain, bootstrap):
+    chain.pending_timestamp = bootstrap.vote_begin()
+
+@pytest.fixture
+def after_lock(chain, bootstrap):
+    chain.pending_timestamp = bootstrap.lock_end()
@@ -1,6 +1,8 @@
+import os
 import ape
 from ape import Contract
 import pytest
+from scripts import fork_bundle, multicall
 
 ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
 NATIVE = '0x0000000000000000000000000000000000000000'
@@ -19,6 +21,20 @@ CONVEX_POOL_MANAGER = '0xc461E1CE3795Ee30bA2EC59843d5fAe14d5782D5'
 CONVEX_BOOSTER = '0xF403C135812408BFbE8713b5A23a04b3D48AAE31'
 BASE_REWARD_POOL = '0x3Fe65692bfCD0e6CF84cB1E7d24108E434A7587e'
 YEARN_FACTORY = '0x21b1FC8A52f179757bf555346130bF27c0C2A17A'
+MAINNET_CONTRACTS = [WETH, CRV, CVX, FACTORY, GAUGE_CONTROLLER, CONVEX_POOL_MANAGER, CONVEX_BOOSTER, BASE_REWARD_POOL, YEARN_FACTORY]
+STATE = os.path.join(os.path.dirname(__file__), 'data', 'pol_curve_lp.json.gz')
+
+@pytest.fixture(scope='session', autouse=True)
+def mainnet_state(request, chain):
+    # outside of a fork, run against the recorded mainnet state instead
+    if chain.provider.network.name == 'local':
+        if not os.path.exists(STATE):
+            pytest.fail(f'no recorded mainnet state at {STATE}, record it on a mainnet fork with --record-state', pytrace=False)
+        fork_bundle.load(fork_bundle.read(STATE))
+    yield
+    output = request.config.getoption('record_state')
+    if output is not None:
+        fork_bundle.write(fork_bundle.record(MAINNET_CONTRACTS), output)
 
 @pytest.fixture
 def deployer(accounts):
@@ -40,6 +56,14 @@ def token(project, deployer):
 def weth():
     return Contract(WETH)
 
+@pytest.fixture
+def crv():
+    return Contract(CRV)
+
+@pytest.fixture
+def cvx():
+    return Contract(CVX)
+
 @pytest.fixture
 def pol(project, alice, deployer, token):
     pol = project.POL.deploy(token, sender=deployer)
@@ -226,7 +250,7 @@ def test_deposit_gauge(operator, token, curve_module, gauge):
     curve_module.deposit_gauge(2 * ONE, sender=operator)
     assert gauge.balanceOf(curve_module) == 2 * ONE
 
-def test_curve_rewards(chain, operator, token, curve_module, gauge):
+def test_curve_rewards(chain, operator, token, crv, curve_module, gauge):
     curve_module.from_pol(NATIVE, ONE, sender=operator)
     curve_module.from_pol(MINT, ONE, sender=operator)
     curve_module.from_pol(token, ONE, sender=operator)
@@ -236,7 +260,7 @@ def test_curve_rewards(chain, operator, token, curve_module, gauge):
 
     chain.pending_timestamp += 7 * 86_400
     curve_module.mint_crv(sender=operator)
-    assert Contract(CRV).balanceOf(curve_module) > 0
+    assert crv.balanceOf(curve_module) > 0
 
 def test_withdraw_gauge(operator, token, curve_pool, curve_module, gauge):
     curve_module.from_pol(NATIVE, ONE, sender=operator)
@@ -285,7 +309,7 @@ def test_stake_convex(operator, token, curve_module, convex_rewards):
     curve_module.deposit_convex_rewards(2 * ONE, sender=operator)
     assert convex_rewards.balanceOf(curve_module) == 2 * ONE
 
-def test_convex_rewards(chain, operator, alice, token, curve_module, convex_booster, convex_pool_id, convex_rewards):
+def test_convex_rewards(chain, operator, alice, token, crv, cvx, curve_module, convex_booster, convex_pool_id, convex_rewards):
     curve_module.from_pol(NATIVE, ONE, sender=operator)
     curve_module.from_pol(MINT, ONE, sender=operator)
     curve_module.from_pol(token, ONE, sender=operator)
@@ -297,8 +321,8 @@ def test_convex_rewards(chain, operator, alice, token, curve_module, convex_boos
     convex_booster.earmarkRewards(convex_pool_id, sender=alice)
     convex_rewards.getReward(curve_module, True, sender=alice)
 
-    assert Contract(CRV).balanceOf(curve_module) > 0
-    assert Contract(CVX).balanceOf(curve_module) > 0
+    assert crv.balanceOf(curve_module) > 0
+    assert cvx.balanceOf(curve_module) > 0
 
 def test_withdraw_convex(operator, token, curve_module, curve_pool, convex_token):
     curve_module.from_pol(NATIVE, ONE, sender=operator)
@@ -364,3 +388,85 @@ def test_withdraw_yvault(operator, token, curve_module, curve_pool, yvault):
     curve_module.withdraw_yvault(2 * ONE, 0, sender=operator)
     assert curve_pool.balanceOf(curve_module) == 2 * ONE
     assert yvault.balanceOf(curve_module) == 0
+
+def test_zap_in(project, operator, token, pol, curve_pool, curve_module):
+    with ape.reverts():
+        curve_module.zap_in(ONE, ONE, 2 * ONE + 1, 4, sender=operator)
+    curve_module.zap_in(ONE, ONE, 2 * ONE, 4, sender=operator)
+    assert curve_pool.balanceOf(curve_module) == 2 * ONE
+    assert project.provider.get_balance(curve_module.address) == 0
+    assert token.balanceOf(curve_module) == 0
+    assert pol.debt() == ONE
+
+def test_zap_in_gauge(operator, curve_pool, curve_module, gauge):
+    curve_module.zap_in(ONE, ONE, 2 * ONE, 0, sender=operator)
+    assert curve_pool.balanceOf(curve_module) == 0
+    assert gauge.balanceOf(curve_module) == 2 * ONE
+
+def test_zap_in_convex(operator, curve_module, convex_token, convex_rewards):
+    curve_module.zap_in(ONE, ONE, 2 * ONE, 2, sender=operator)
+    assert convex_token.balanceOf(curve_module) == 0
+    assert convex_rewards.balanceOf(curve_module) == 2 * ONE
+
+def test_zap_in_yvault(operator, curve_module, yvault):
+    curve_module.zap_in(ONE, ONE, 2 * ONE, 3, sender=operator)
+    assert yvault.balanceOf(curve_module) == 2 * ONE
+
+def test_zap_in_invalid(operator, curve_module):
+    with ape.reverts():
+        curve_module.zap_in(ONE, ONE, 0, 5, sender=operator)
+
+def test_zap_out(project, deployer, operator, token, pol, curve_pool, curve_module):
+    curve_module.zap_in(ONE, ONE, 2 * ONE, 4, sender=operator)
+    before = project.provider.get_balance(pol.address)
+
+    with ape.reverts():
+        curve_module.zap_out(2 * ONE, 4, [ONE + 1, ONE], sender=operator)
+    curve_module.zap_out(2 * ONE, 4, [ONE, ONE], sender=operator)
+    assert curve_pool.balanceOf(curve_module) == 0
+    assert project.provider.get_balance(pol.address) - before == ONE
+
+    # yETH is returned to POL, burning it is a separate step
+    assert token.balanceOf(pol) == ONE
+    assert pol.debt() == ONE
+    pol.approve(BURN, curve_module, MAX, sender=deployer)
+    curve_module.from_pol(BURN, ONE, sender=operator)
+    assert token.balanceOf(pol) == 0
+    assert pol.debt() == 0
+
+def test_zap_out_gauge(operator, token, pol, curve_module, gauge):
+    curve_module.zap_in(ONE, ONE, 2 * ONE, 0, sender=operator)
+    curve_module.zap_out(2 * ONE, 0, [ONE, ONE], sender=operator)
+    assert gauge.balanceOf(curve_module) == 0
+    assert token.balanceOf(pol) == ONE
+
+def test_zap_out_convex(operator, token, pol, curve_module, convex_rewards):
+    curve_module.zap_in(ONE, ONE, 2 * ONE, 2, sender=operator)
+    curve_module.zap_out(2 * ONE, 2, [ONE, ONE], sender=operator)
+    assert convex_rewards.balanceOf(curve_module) == 0
+    assert token.balanceOf(pol) == ONE
+
+def test_zap_out_yvault(operator, token, pol, curve_module, yvault):
+    curve_module.zap_in(ONE, ONE, 2 * ONE, 3, sender=operator)
+    curve_module.zap_out(2 * ONE, 3, [ONE, ONE], sender=operator)
+    assert yvault.balanceOf(curve_module) == 0
+    assert token.balanceOf(pol) == ONE
+
+def test_multicall(project, deployer, operator, alice, token, curve_pool, curve_module):
+    calls = [
+        (curve_module.from_pol, NATIVE, ONE),
+        (curve_module.from_pol, MINT, ONE),
+        (curve_module.from_pol, token, ONE),
+        (curve_module.wrap, ONE),
+        (curve_module.add_liquidity, [ONE, ONE], 2 * ONE),
+    ]
+    with ape.reverts():
+        multicall.multicall(curve_module, calls, alice)
+    # management functions keep their own permission check
+    with ape.reverts():
+        multicall.multicall(curve_module, [(curve_module.set_pool, ZERO_ADDRESS)], operator)
+
+    multicall.multicall(curve_module, calls, operator)
+    assert curve_pool.balanceOf(curve_module) == 2 * ONE
+    assert project.provider.get_balance(curve_module.address) == 0
+    assert token.balanceOf(curve_module) == 0
@@ -1,133 +1,102 @@
 import ape
 import pytest
+from pathlib import Path
+from scripts import distribute_incentives, gas, incentive_tree, undo_votes
 
 DAY_LENGTH = 24 * 60 * 60
 WEEK_LENGTH = 7 * DAY_LENGTH
 ONE = 1_000_000_000_000_000_000
 MAX = 2**256 - 1
 
-@pytest.fixture
-def deployer(accounts):
-    return accounts[0]
-
-@pytest.fixture
-def treasury(accounts):
-    return accounts[1]
-
-@pytest.fixture
+@pytest.fixture(scope='module')
 def pol(accounts):
     return accounts[2]
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def alice(accounts):
     return accounts[3]
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def bob(accounts):
     return accounts[4]
 
-@pytest.fixture
-def token(project, deployer):
-    return project.Token.deploy(sender=deployer)
-
-@pytest.fixture
-def staking(project, deployer, token):
-    return project.MockStaking.deploy(token, sender=deployer)
-
-@pytest.fixture
-def bootstrap(project, chain, deployer, treasury, pol, token, staking):
-    bootstrap = project.Bootstrap.deploy(token, staking, treasury, pol, sender=deployer)
-    token.set_minter(bootstrap, sender=deployer)
-    ts = (chain.pending_timestamp // WEEK_LENGTH + 1) * WEEK_LENGTH
-    bootstrap.set_whitelist_period(ts, ts + WEEK_LENGTH, sender=deployer)
-    bootstrap.set_incentive_period(ts + WEEK_LENGTH, ts + 2 * WEEK_LENGTH, sender=deployer)
-    bootstrap.set_deposit_period(ts + 2 * WEEK_LENGTH, ts + 3 * WEEK_LENGTH, sender=deployer)
-    bootstrap.set_lock_end(ts + 5 * WEEK_LENGTH, sender=deployer)
-    bootstrap.set_vote_period(ts + 3 * WEEK_LENGTH, ts + 4 * WEEK_LENGTH, sender=deployer)
-    return bootstrap
+@pytest.fixture(scope='module')
+def deferred_bootstrap(weekly_bootstrap):
+    return weekly_bootstrap(deferred=True)
 
 def test_apply_early_late(project, chain, deployer, alice, bootstrap):
     protocol = project.MockToken.deploy(sender=deployer)
     with ape.reverts(dev_message='dev: outside application period'):
         bootstrap.apply(protocol, value=ONE, sender=alice)
     
-    chain.pending_timestamp += 2 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.incentive_begin()
     with ape.reverts(dev_message='dev: outside application period'):
         bootstrap.apply(protocol, value=ONE, sender=alice)
 
-def test_apply_fee(project, chain, deployer, alice, bootstrap):
+def test_apply_fee(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
-    chain.pending_timestamp += WEEK_LENGTH
     with ape.reverts(dev_message='dev: application fee'):
         bootstrap.apply(protocol, value=ONE - 1, sender=alice)
 
-def test_apply(project, chain, deployer, alice, bootstrap):
+def test_apply(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
-    chain.pending_timestamp += WEEK_LENGTH
     assert not bootstrap.has_applied(protocol)
     assert not bootstrap.is_whitelisted(protocol)
     bootstrap.apply(protocol, value=ONE, sender=alice)
     assert bootstrap.has_applied(protocol)
     assert not bootstrap.is_whitelisted(protocol)
 
-def test_apply_multiple(project, chain, deployer, alice, bootstrap):
+def test_apply_multiple(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     with ape.reverts(dev_message='dev: already applied'):
         bootstrap.apply(protocol, value=ONE, sender=alice)
 
-def test_whitelist_no_application(project, chain, deployer, bootstrap):
+def test_whitelist_no_application(project, chain, deployer, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
-    chain.pending_timestamp += WEEK_LENGTH
     with ape.reverts(dev_message='dev: has not applied'):
         bootstrap.whitelist(protocol, sender=deployer)
 
-def test_whitelist_apply_multiple(project, chain, deployer, alice, bootstrap):
+def test_whitelist_apply_multiple(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
     with ape.reverts(dev_message='dev: already applied'):
         bootstrap.apply(protocol, value=ONE, sender=alice)
 
-def test_whitelist(project, chain, deployer, alice, bootstrap):
+def test_whitelist(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     assert not bootstrap.is_whitelisted(protocol)
     bootstrap.whitelist(protocol, sender=deployer)
     assert bootstrap.is_whitelisted(protocol)
 
-def test_incentivize_early_late(project, chain, deployer, alice, bootstrap):
+def test_incentivize_early_late(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     incentive = project.MockToken.deploy(sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
     with ape.reverts(dev_message='dev: outside incentive period'):
         bootstrap.incentivize(protocol, incentive, ONE, sender=alice)
 
-    chain.pending_timestamp += 2 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     with ape.reverts(dev_message='dev: outside incentive period'):
         bootstrap.incentivize(protocol, incentive, ONE, sender=alice)
 
-def test_incentivize_no_whitelist(project, chain, deployer, alice, bootstrap):
+def test_incentivize_no_whitelist(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.incentive_begin()
     incentive = project.MockToken.deploy(sender=deployer)
     with ape.reverts(dev_message='dev: not whitelisted'):
         bootstrap.incentivize(protocol, incentive, ONE, sender=alice)
 
-def test_incentivize(project, chain, deployer, alice, bootstrap):
+def test_incentivize(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.incentive_begin()
     incentive = project.MockToken.deploy(sender=deployer)
     incentive.mint(alice, ONE, sender=deployer)
     incentive.approve(bootstrap, MAX, sender=alice)
@@ -138,13 +107,12 @@ def test_incentivize(project, chain, deployer, alice, bootstrap):
     assert bootstrap.incentives(protocol, incentive) == ONE
     assert bootstrap.incentive_depositors(protocol, incentive, alice) == ONE
 
-def test_incentivize_multiple(project, chain, deployer, alice, bootstrap):
+def test_incentivize_multiple(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.incentive_begin()
     incentive = project.MockToken.deploy(sender=deployer)
     incentive.mint(alice, 3 * ONE, sender=deployer)
     incentive.approve(bootstrap, MAX, sender=alice)
@@ -158,12 +126,11 @@ def test_deposit_early_late(chain, alice, bootstrap):
     with ape.reverts(dev_message='dev: outside deposit period'):
         alice.transfer(bootstrap, ONE)
     
-    chain.pending_timestamp += 4 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     with ape.reverts(dev_message='dev: outside deposit period'):
         alice.transfer(bootstrap, ONE)
 
-def test_deposit(chain, alice, staking, bootstrap):
-    chain.pending_timestamp += 3 * WEEK_LENGTH
+def test_deposit(chain, alice, staking, bootstrap, in_deposit):
     assert bootstrap.debt() == 0
     assert bootstrap.deposited() == 0
     assert bootstrap.deposits(alice) == 0
@@ -175,13 +142,11 @@ def test_deposit(chain, alice, staking, bootstrap):
     assert bootstrap.deposits(alice) == ONE
     assert staking.balanceOf(bootstrap) == ONE
 
-def test_deposit_fn(chain, alice, bob, bootstrap):
-    chain.pending_timestamp += 3 * WEEK_LENGTH
+def test_deposit_fn(chain, alice, bob, bootstrap, in_deposit):
     bootstrap.deposit(bob, value=ONE, sender=alice)
     assert bootstrap.deposits(bob) == ONE
 
-def test_deposit_multiple(chain, alice, staking, bootstrap):
-    chain.pending_timestamp += 3 * WEEK_LENGTH
+def test_deposit_multiple(chain, alice, staking, bootstrap, in_deposit):
     alice.transfer(bootstrap, ONE)
     alice.transfer(bootstrap, 2 * ONE)
     assert bootstrap.debt() == 3 * ONE
@@ -189,8 +154,55 @@ def test_deposit_multiple(chain, alice, staking, bootstrap):
     assert bootstrap.deposits(alice) == 3 * ONE
     assert staking.balanceOf(bootstrap) == 3 * ONE
 
-def test_split_management(chain, deployer, treasury, pol, alice, bootstrap):
-    chain.pending_timestamp += 3 * WEEK_LENGTH
+def test_deferred_deposit(chain, alice, bob, token, staking, deferred_bootstrap):
+    bootstrap = deferred_bootstrap
+    assert bootstrap.deferred_staking()
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    alice.transfer(bootstrap, ONE)
+    bootstrap.deposit(bob, value=2 * ONE, sender=alice)
+    assert bootstrap.debt() == 3 * ONE
+    assert bootstrap.deposited() == 3 * ONE
+    assert bootstrap.deposits(alice) == ONE
+    assert bootstrap.deposits(bob) == 2 * ONE
+    assert bootstrap.pending() == 3 * ONE
+    assert token.totalSupply() == 0
+    assert staking.balanceOf(bootstrap) == 0
+
+    # anyone can flush
+    tx = bootstrap.flush(sender=bob)
+    assert [log.amount for log in tx.decode_logs(bootstrap.Flush)] == [3 * ONE]
+    assert bootstrap.pending() == 0
+    assert staking.balanceOf(bootstrap) == 3 * ONE
+    with ape.reverts():
+        bootstrap.flush(sender=bob)
+
+def test_deferred_claim(chain, alice, staking, deferred_bootstrap):
+    bootstrap = deferred_bootstrap
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    alice.transfer(bootstrap, 3 * ONE)
+    assert staking.balanceOf(bootstrap) == 0
+
+    # claim flushes all pending deposits first
+    chain.pending_timestamp = bootstrap.lock_end()
+    bootstrap.claim(ONE, sender=alice)
+    assert bootstrap.pending() == 0
+    assert staking.balanceOf(alice) == ONE
+    assert staking.balanceOf(bootstrap) == 2 * ONE
+
+def test_deferred_deposit_gas(accounts, chain, deployer, bootstrap, deferred_bootstrap, in_deposit):
+    depositors = accounts[5:9]
+    for b in [bootstrap, deferred_bootstrap]:
+        b.deposit(value=ONE, sender=accounts[4])
+    direct = [bootstrap.deposit(value=ONE, sender=a).gas_used for a in depositors]
+    deferred = [deferred_bootstrap.deposit(value=ONE, sender=a).gas_used for a in depositors]
+    flush = deferred_bootstrap.flush(sender=deployer).gas_used
+
+    # minting and staking is paid once per flush instead of once per deposit
+    assert max(deferred) < min(direct) - 30_000
+    assert sum(deferred) + flush < sum(direct)
+    assert deferred_bootstrap.pending() == 0
+
+def test_split_management(chain, deployer, treasury, pol, alice, bootstrap, in_deposit):
     tb = treasury.balance
     pb = pol.balance
     alice.transfer(bootstrap, ONE)
@@ -200,8 +212,7 @@ def test_split_management(chain, deployer, treasury, pol, alice, bootstrap):
     assert treasury.balance - tb == ONE * 9 // 10
     assert pol.balance - pb == ONE // 10
 
-def test_split_treasury(chain, treasury, pol, alice, bootstrap):
-    chain.pending_timestamp += 3 * WEEK_LENGTH
+def test_split_treasury(chain, treasury, pol, alice, bootstrap, in_deposit):
     tb = treasury.balance
     pb = pol.balance
     alice.transfer(bootstrap, ONE)
@@ -209,8 +220,7 @@ def test_split_treasury(chain, treasury, pol, alice, bootstrap):
     assert treasury.balance - tb + tx.total_fees_paid == ONE * 9 // 10
     assert pol.balance - pb == ONE // 10
 
-def test_repay(chain, deployer, alice, bob, token, bootstrap):
-    chain.pending_timestamp += 3 * WEEK_LENGTH
+def test_repay(chain, deployer, alice, bob, token, bootstrap, in_deposit):
     alice.transfer(bootstrap, 3 * ONE)
     token.set_minter(deployer, sender=deployer)
     token.mint(bob, 2 * ONE, sender=deployer)
@@ -229,58 +239,54 @@ def test_vote_early_late(project, chain, deployer, alice, bootstrap):
     with ape.reverts(dev_message='dev: outside vote period'):
         bootstrap.vote([protocol], [ONE], sender=alice)
 
-    chain.pending_timestamp += 5 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_end()
     with ape.reverts(dev_message='dev: outside vote period'):
         bootstrap.vote([protocol], [ONE], sender=alice)
 
-def test_vote_no_application(project, chain, deployer, alice, bootstrap):
+def test_vote_no_application(project, chain, deployer, alice, bootstrap, in_deposit):
     protocol = project.MockToken.deploy(sender=deployer)
 
-    chain.pending_timestamp += 3 * WEEK_LENGTH
     alice.transfer(bootstrap, ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     with ape.reverts(dev_message='dev: protocol not whitelisted'):
         bootstrap.vote([protocol], [ONE], sender=alice)
 
-def test_vote_no_whitelist(project, chain, deployer, alice, bootstrap):
+def test_vote_no_whitelist(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
 
-    chain.pending_timestamp += 2 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     with ape.reverts(dev_message='dev: protocol not whitelisted'):
         bootstrap.vote([protocol], [ONE], sender=alice)
 
-def test_vote_exceed(project, chain, deployer, alice, bootstrap):
+def test_vote_exceed(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += 2 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     with ape.reverts(dev_message='dev: too many votes'):
         bootstrap.vote([protocol], [ONE + 1], sender=alice)
 
-def test_vote(project, chain, deployer, alice, bootstrap):
+def test_vote(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += 2 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     chain.mine()
     assert bootstrap.voted() == 0
     assert bootstrap.votes_used(alice) == 0
@@ -295,37 +301,35 @@ def test_vote(project, chain, deployer, alice, bootstrap):
     assert bootstrap.votes(protocol) == ONE
     assert bootstrap.votes_available(alice) == 0
 
-def test_vote_many_exceed(project, chain, deployer, alice, bootstrap):
+def test_vote_many_exceed(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol1 = project.MockToken.deploy(sender=deployer)
     protocol2 = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol1, value=ONE, sender=alice)
     bootstrap.apply(protocol2, value=ONE, sender=alice)
     bootstrap.whitelist(protocol1, sender=deployer)
     bootstrap.whitelist(protocol2, sender=deployer)
 
-    chain.pending_timestamp += 2 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, 2 * ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     with ape.reverts(dev_message='dev: too many votes'):
         bootstrap.vote([protocol1, protocol2], [ONE, 2 * ONE], sender=alice)
 
-def test_vote_many(project, chain, deployer, alice, bootstrap):
+def test_vote_many(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol1 = project.MockToken.deploy(sender=deployer)
     protocol2 = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol1, value=ONE, sender=alice)
     bootstrap.apply(protocol2, value=ONE, sender=alice)
     bootstrap.whitelist(protocol1, sender=deployer)
     bootstrap.whitelist(protocol2, sender=deployer)
 
-    chain.pending_timestamp += 2 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, 3 * ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     bootstrap.vote([protocol1, protocol2], [ONE, 2 * ONE], sender=alice)
     assert bootstrap.voted() == 3 * ONE
     assert bootstrap.votes_used(alice) == 3 * ONE
@@ -333,32 +337,30 @@ def test_vote_many(project, chain, deployer, alice, bootstrap):
     assert bootstrap.votes(protocol2) == 2 * ONE
     assert bootstrap.votes_available(alice) == 0
 
-def test_vote_multiple_exceed(project, chain, deployer, alice, bootstrap):
+def test_vote_multiple_exceed(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += 2 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, 2 * ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     bootstrap.vote([protocol], [ONE], sender=alice)
     with ape.reverts(dev_message='dev: too many votes'):
         bootstrap.vote([protocol], [2 * ONE], sender=alice)
 
-def test_vote_multiple(project, chain, deployer, alice, bootstrap):
+def test_vote_multiple(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += 2 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, 3 * ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     bootstrap.vote([protocol], [ONE], sender=alice)
     assert bootstrap.votes_available(alice) == 2 * ONE
     bootstrap.vote([protocol], [2 * ONE], sender=alice)
@@ -368,17 +370,16 @@ def test_vote_multiple(project, chain, deployer, alice, bootstrap):
     assert bootstrap.votes(protocol) == 3 * ONE
     assert bootstrap.votes_available(alice) == 0
 
-def test_undo_vote(project, chain, deployer, alice, bob, bootstrap):
+def test_undo_vote(project, chain, deployer, alice, bob, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += 2 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     bootstrap.vote([protocol], [ONE], sender=alice)
 
     with ape.reverts():
@@ -392,51 +393,135 @@ def test_undo_vote(project, chain, deployer, alice, bob, bootstrap):
     assert bootstrap.votes(protocol) == 0
     assert bootstrap.votes_available(alice) == ONE
 
-def test_declare_early(project, chain, deployer, alice, bootstrap):
+def test_undo_votes(project, chain, accounts, deployer, alice, bob, bootstrap, in_whitelist):
+    protocol = project.MockToken.deploy(sender=deployer)
+    other = project.MockToken.deploy(sender=deployer)
+
+    for p in [protocol, other]:
+        bootstrap.apply(p, value=ONE, sender=alice)
+        bootstrap.whitelist(p, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    voters = [alice, bob, accounts[5]]
+    for voter in voters:
+        voter.transfer(bootstrap, 3 * ONE)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    bootstrap.vote([protocol, other], [ONE, ONE], sender=alice)
+    bootstrap.vote([protocol], [2 * ONE], sender=bob)
+    bootstrap.vote([other], [ONE], sender=accounts[5])
+
+    with ape.reverts():
+        bootstrap.undo_votes(protocol, voters, sender=deployer)
+    bootstrap.undo_whitelist(protocol, sender=deployer)
+    with ape.reverts():
+        bootstrap.undo_votes(protocol, voters, sender=alice)
+
+    # accounts without votes for the protocol are skipped
+    bootstrap.undo_votes(protocol, voters, sender=deployer)
+    assert bootstrap.voted() == 2 * ONE
+    assert bootstrap.votes(protocol) == 0
+    assert bootstrap.votes(other) == 2 * ONE
+    assert bootstrap.votes_used(alice) == ONE
+    assert bootstrap.votes_used(bob) == 0
+    assert bootstrap.votes_used(accounts[5]) == ONE
+    assert bootstrap.deposits(bob) == 3 * ONE
+    assert bootstrap.votes_used_protocol(alice, protocol) == 0
+    assert bootstrap.votes_used_protocol(alice, other) == ONE
+
+    # repeating is a no-op
+    bootstrap.undo_votes(protocol, voters, sender=deployer)
+    assert bootstrap.voted() == 2 * ONE
+
+def test_undo_votes_driver(project, chain, accounts, deployer, alice, bootstrap, in_whitelist):
+    protocol = project.MockToken.deploy(sender=deployer)
+    other = project.MockToken.deploy(sender=deployer)
+
+    for p in [protocol, other]:
+        bootstrap.apply(p, value=ONE, sender=alice)
+        bootstrap.whitelist(p, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    voters = accounts[3:9]
+    for voter in voters:
+        voter.transfer(bootstrap, ONE)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    for i, voter in enumerate(voters):
+        bootstrap.vote([protocol if i % 2 == 0 else other], [ONE], sender=voter)
+    bootstrap.undo_whitelist(protocol, sender=deployer)
+    bootstrap.undo_vote(protocol, voters[0], sender=voters[0])
+
+    assert undo_votes.affected(bootstrap, protocol, undo_votes.voters(bootstrap, protocol)) == [voters[2], voters[4]]
+    receipts = undo_votes.undo(bootstrap, protocol, deployer, batch_size=1)
+    assert len(receipts) == 2
+    assert bootstrap.votes(protocol) == 0
+    assert bootstrap.voted() == 3 * ONE
+    for voter in voters[::2]:
+        assert bootstrap.votes_used(voter) == 0
+
+def test_undo_votes_gas(project, chain, accounts, deployer, alice, bootstrap, in_whitelist):
+    protocol = project.MockToken.deploy(sender=deployer)
+    bootstrap.apply(protocol, value=ONE, sender=alice)
+    bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    voters = accounts[3:9]
+    for voter in voters:
+        voter.transfer(bootstrap, ONE)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    for voter in voters:
+        bootstrap.vote([protocol], [ONE], sender=voter)
+    bootstrap.undo_whitelist(protocol, sender=deployer)
+
+    snapshot = chain.snapshot()
+    single = sum(bootstrap.undo_vote(protocol, voter, sender=deployer).gas_used for voter in voters)
+    chain.restore(snapshot)
+    batched = bootstrap.undo_votes(protocol, voters, sender=deployer).gas_used
+    assert batched < single // 2
+
+def test_declare_early(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += 3 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     with ape.reverts():
         bootstrap.declare_winners([protocol], sender=deployer)
 
-def test_declare_multiple(project, chain, deployer, alice, bootstrap):
+def test_declare_multiple(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol1 = project.MockToken.deploy(sender=deployer)
     protocol2 = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol1, value=ONE, sender=alice)
     bootstrap.apply(protocol2, value=ONE, sender=alice)
     bootstrap.whitelist(protocol1, sender=deployer)
     bootstrap.whitelist(protocol2, sender=deployer)
 
-    chain.pending_timestamp += 4 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_end()
     bootstrap.declare_winners([protocol1], sender=deployer)
     with ape.reverts():
         bootstrap.declare_winners([protocol2], sender=deployer)
 
-def test_declare_duplicate(project, chain, deployer, alice, bootstrap):
+def test_declare_duplicate(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += 4 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_end()
     with ape.reverts():
         bootstrap.declare_winners([protocol, protocol], sender=deployer)
 
-def test_declare(project, chain, deployer, alice, bootstrap):
+def test_declare(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += 4 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_end()
     assert bootstrap.num_winners() == 0
     assert not bootstrap.winners(protocol)
     bootstrap.declare_winners([protocol], sender=deployer)
@@ -444,17 +529,16 @@ def test_declare(project, chain, deployer, alice, bootstrap):
     assert bootstrap.winners(protocol)
     assert bootstrap.winners_list(0) == protocol
 
-def test_declare_many(project, chain, deployer, alice, bootstrap):
+def test_declare_many(project, chain, deployer, alice, bootstrap, in_whitelist):
     protocol1 = project.MockToken.deploy(sender=deployer)
     protocol2 = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol1, value=ONE, sender=alice)
     bootstrap.apply(protocol2, value=ONE, sender=alice)
     bootstrap.whitelist(protocol1, sender=deployer)
     bootstrap.whitelist(protocol2, sender=deployer)
 
-    chain.pending_timestamp += 4 * WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_end()
     bootstrap.declare_winners([protocol1, protocol2], sender=deployer)
     assert bootstrap.num_winners() == 2
     assert bootstrap.winners(protocol1)
@@ -462,82 +546,79 @@ def test_declare_many(project, chain, deployer, alice, bootstrap):
     assert bootstrap.winners_list(0) == protocol1
     assert bootstrap.winners_list(1) == protocol2
 
-def test_claim_incentive_loser(project, chain, deployer, alice, bob, bootstrap):
+def test_claim_incentive_loser(project, chain, deployer, alice, bob, bootstrap, in_whitelist):
     protocol1 = project.MockToken.deploy(sender=deployer)
     protocol2 = project.MockToken.deploy(sender=deployer)
     incentive = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol1, value=ONE, sender=alice)
     bootstrap.apply(protocol2, value=ONE, sender=alice)
     bootstrap.whitelist(protocol1, sender=deployer)
     bootstrap.whitelist(protocol2, sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.incentive_begin()
     incentive.approve(bootstrap, MAX, sender=deployer)
     incentive.mint(deployer, ONE, sender=deployer)
     bootstrap.incentivize(protocol1, incentive, ONE, sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     bootstrap.vote([protocol1], [ONE], sender=alice)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_end()
     bootstrap.declare_winners([protocol2], sender=deployer)
 
     with ape.reverts(dev_message='dev: protocol is not winner'):
         bootstrap.claim_incentive(protocol1, incentive, alice, sender=bob)
 
-def test_claim_incentive_not_voted(project, chain, deployer, alice, bob, bootstrap):
+def test_claim_incentive_not_voted(project, chain, deployer, alice, bob, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     incentive = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.incentive_begin()
     incentive.approve(bootstrap, MAX, sender=deployer)
     incentive.mint(deployer, ONE, sender=deployer)
     bootstrap.incentivize(protocol, incentive, ONE, sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, ONE)
     bob.transfer(bootstrap, ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     bootstrap.vote([protocol], [ONE], sender=bob)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_end()
     bootstrap.declare_winners([protocol], sender=deployer)
     
     with ape.reverts(dev_message='dev: nothing to claim'):
         bootstrap.claim_incentive(protocol, incentive, alice, sender=bob)
 
-def test_claim_incentive(project, chain, deployer, alice, bob, bootstrap):
+def test_claim_incentive(project, chain, deployer, alice, bob, bootstrap, in_whitelist):
     protocol = project.MockToken.deploy(sender=deployer)
     incentive = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol, value=ONE, sender=alice)
     bootstrap.whitelist(protocol, sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.incentive_begin()
     incentive.approve(bootstrap, MAX, sender=deployer)
     incentive.mint(deployer, 6 * ONE, sender=deployer)
     bootstrap.incentivize(protocol, incentive, 6 * ONE, sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, ONE)
     bob.transfer(bootstrap, 2 * ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     bootstrap.vote([protocol], [ONE], sender=alice)
     bootstrap.vote([protocol], [2 * ONE], sender=bob)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_end()
     bootstrap.declare_winners([protocol], sender=deployer)
     
     assert not bootstrap.incentive_claimed(protocol, incentive, alice)
@@ -548,31 +629,549 @@ def test_claim_incentive(project, chain, deployer, alice, bob, bootstrap):
     assert bootstrap.claimable_incentive(protocol, incentive, alice) == 0
     assert incentive.balanceOf(alice) == 2 * ONE
 
-def test_claim_incentive_other_vote(project, chain, deployer, alice, bob, bootstrap):
+def test_claim_incentive_other_vote(project, chain, deployer, alice, bob, bootstrap, in_whitelist):
     protocol1 = project.MockToken.deploy(sender=deployer)
     protocol2 = project.MockToken.deploy(sender=deployer)
     incentive = project.MockToken.deploy(sender=deployer)
     
-    chain.pending_timestamp += WEEK_LENGTH
     bootstrap.apply(protocol1, value=ONE, sender=alice)
     bootstrap.apply(protocol2, value=ONE, sender=alice)
     bootstrap.whitelist(protocol1, sender=deployer)
     bootstrap.whitelist(protocol2, sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.incentive_begin()
     incentive.approve(bootstrap, MAX, sender=deployer)
     incentive.mint(deployer, ONE, sender=deployer)
     bootstrap.incentivize(protocol1, incentive, ONE, sender=deployer)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.deposit_begin()
     alice.transfer(bootstrap, ONE)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_begin()
     bootstrap.vote([protocol2], [ONE], sender=alice)
 
-    chain.pending_timestamp += WEEK_LENGTH
+    chain.pending_timestamp = bootstrap.vote_end()
     bootstrap.declare_winners([protocol1, protocol2], sender=deployer)
     
     assert bootstrap.claimable_incentive(protocol1, incentive, alice) == ONE
     bootstrap.claim_incentive(protocol1, incentive, alice, sender=bob)
     assert incentive.balanceOf(alice) == ONE
+
+def test_claim_incentives(project, chain, deployer, alice, bob, bootstrap, in_whitelist):
+    protocol1 = project.MockToken.deploy(sender=deployer)
+    protocol2 = project.MockToken.deploy(sender=deployer)
+    protocol3 = project.MockToken.deploy(sender=deployer)
+    incentive1 = project.MockToken.deploy(sender=deployer)
+    incentive2 = project.MockToken.deploy(sender=deployer)
+    
+    for protocol in [protocol1, protocol2, protocol3]:
+        bootstrap.apply(protocol, value=ONE, sender=alice)
+        bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    for incentive in [incentive1, incentive2]:
+        incentive.approve(bootstrap, MAX, sender=deployer)
+        incentive.mint(deployer, 9 * ONE, sender=deployer)
+        bootstrap.incentivize(protocol1, incentive, 3 * ONE, sender=deployer)
+        bootstrap.incentivize(protocol2, incentive, 3 * ONE, sender=deployer)
+        bootstrap.incentivize(protocol3, incentive, 3 * ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    alice.transfer(bootstrap, ONE)
+    bob.transfer(bootstrap, 2 * ONE)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    bootstrap.vote([protocol1], [ONE], sender=alice)
+    bootstrap.vote([protocol2], [2 * ONE], sender=bob)
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol1, protocol2], sender=deployer)
+
+    bootstrap.claim_incentive(protocol1, incentive1, alice, sender=bob)
+    assert incentive1.balanceOf(alice) == ONE
+
+    # already claimed and loser pairs are skipped
+    protocols = [protocol1, protocol1, protocol2, protocol2, protocol3]
+    incentives = [incentive1, incentive2, incentive1, incentive2, incentive1]
+    tx = bootstrap.claim_incentives(protocols, incentives, alice, sender=bob)
+    assert len(tx.decode_logs(bootstrap.ClaimIncentive)) == 3
+    assert incentive1.balanceOf(alice) == 2 * ONE
+    assert incentive2.balanceOf(alice) == 2 * ONE
+    for protocol, incentive in zip(protocols[:4], incentives[:4]):
+        assert bootstrap.incentive_claimed(protocol, incentive, alice)
+        assert bootstrap.claimable_incentive(protocol, incentive, alice) == 0
+    assert not bootstrap.incentive_claimed(protocol3, incentive1, alice)
+
+    tx = bootstrap.claim_incentives(protocols, incentives, alice, sender=bob)
+    assert len(tx.decode_logs(bootstrap.ClaimIncentive)) == 0
+
+@pytest.mark.parametrize('reenter', ['claim_incentive', 'claim_incentives'])
+def test_claim_incentives_reentrancy(project, chain, deployer, alice, bob, bootstrap, in_whitelist, reenter):
+    protocol = project.MockToken.deploy(sender=deployer)
+    hooked = project.MockReentrantToken.deploy(sender=deployer)
+    other = project.MockToken.deploy(sender=deployer)
+    bootstrap.apply(protocol, value=ONE, sender=alice)
+    bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    for incentive in [hooked, other]:
+        incentive.approve(bootstrap, MAX, sender=deployer)
+        incentive.mint(deployer, 3 * ONE, sender=deployer)
+        bootstrap.incentivize(protocol, incentive, 3 * ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    alice.transfer(bootstrap, ONE)
+    bob.transfer(bootstrap, 2 * ONE)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    bootstrap.vote([protocol], [ONE], sender=alice)
+    bootstrap.vote([protocol], [2 * ONE], sender=bob)
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol], sender=deployer)
+
+    # the token calls back into the bootstrap while its share is transferred
+    if reenter == 'claim_incentive':
+        data = bootstrap.claim_incentive.encode_input(protocol, hooked, alice)
+    else:
+        data = bootstrap.claim_incentives.encode_input([protocol, protocol], [hooked, other], alice)
+    hooked.set_callback(bootstrap, data, sender=deployer)
+    bootstrap.claim_incentives([protocol, protocol], [hooked, other], alice, sender=bob)
+    assert int(hooked.callback_target(), 16) == 0
+
+    # a single claim reverts, a batch skips the shares that are already claimed
+    assert hooked.callback_success() == (reenter == 'claim_incentives')
+    assert hooked.balanceOf(alice) == ONE
+    assert other.balanceOf(alice) == ONE
+    assert bootstrap.claimable_incentive(protocol, hooked, alice) == 0
+    assert bootstrap.claimable_incentive(protocol, other, alice) == 0
+    bootstrap.claim_incentives([protocol, protocol], [hooked, other], bob, sender=bob)
+    assert hooked.balanceOf(bob) == 2 * ONE
+    assert other.balanceOf(bob) == 2 * ONE
+
+def test_claimable_incentives(project, chain, deployer, alice, bob, bootstrap, in_whitelist):
+    protocol1 = project.MockToken.deploy(sender=deployer)
+    protocol2 = project.MockToken.deploy(sender=deployer)
+    protocol3 = project.MockToken.deploy(sender=deployer)
+    incentive1 = project.MockToken.deploy(sender=deployer)
+    incentive2 = project.MockToken.deploy(sender=deployer)
+
+    for protocol in [protocol1, protocol2, protocol3]:
+        bootstrap.apply(protocol, value=ONE, sender=alice)
+        bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    for incentive in [incentive1, incentive2]:
+        incentive.approve(bootstrap, MAX, sender=deployer)
+        incentive.mint(deployer, 9 * ONE, sender=deployer)
+    bootstrap.incentivize(protocol1, incentive1, 3 * ONE, sender=deployer)
+    bootstrap.incentivize(protocol1, incentive2, 3 * ONE, sender=deployer)
+    bootstrap.incentivize(protocol2, incentive2, 6 * ONE, sender=deployer)
+    bootstrap.incentivize(protocol3, incentive1, 3 * ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    alice.transfer(bootstrap, ONE)
+    bob.transfer(bootstrap, 2 * ONE)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    bootstrap.vote([protocol1], [ONE], sender=alice)
+    bootstrap.vote([protocol2], [2 * ONE], sender=bob)
+    assert bootstrap.claimable_incentives(alice) == ([], 0)
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol1, protocol2], sender=deployer)
+
+    # losers are not included
+    page, cursor = bootstrap.claimable_incentives(alice)
+    assert cursor == 0
+    claimable = [(c.protocol, c.incentive, c.amount) for c in page]
+    assert claimable == [
+        (protocol1, incentive1, ONE),
+        (protocol1, incentive2, ONE),
+        (protocol2, incentive2, 2 * ONE),
+    ]
+    for protocol, incentive, amount in claimable:
+        assert bootstrap.claimable_incentive(protocol, incentive, alice) == amount
+
+    # pages over the incentive tokens of all winners
+    pages = []
+    for start, count in [(0, 1), (1, 2), (2, 1), (3, 5)]:
+        page, cursor = bootstrap.claimable_incentives(alice, start, count)
+        pages.append(([(c.protocol, c.incentive) for c in page], cursor))
+    assert pages == [
+        ([(protocol1, incentive1)], 1),
+        ([(protocol1, incentive2), (protocol2, incentive2)], 0),
+        ([(protocol2, incentive2)], 0),
+        ([], 0),
+    ]
+    with ape.reverts():
+        bootstrap.claimable_incentives(alice, 0, 257)
+
+    # claimed incentives are not included
+    bootstrap.claim_incentive(protocol1, incentive2, sender=alice)
+    page, _ = bootstrap.claimable_incentives(alice)
+    claimable = [(c.protocol, c.incentive, c.amount) for c in page]
+    assert claimable == [(protocol1, incentive1, ONE), (protocol2, incentive2, 2 * ONE)]
+    assert bootstrap.claimable_incentives(deployer) == ([], 0)
+
+def test_claimable_incentives_junk(project, chain, deployer, alice, bootstrap, in_whitelist):
+    # incentive tokens added by anyone do not hide the ones after them
+    protocol = project.MockToken.deploy(sender=deployer)
+    bootstrap.apply(protocol, value=ONE, sender=alice)
+    bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    tokens = [project.MockToken.deploy(sender=deployer) for _ in range(5)]
+    for token in tokens:
+        token.approve(bootstrap, MAX, sender=deployer)
+        token.mint(deployer, ONE, sender=deployer)
+        bootstrap.incentivize(protocol, token, 1 if token != tokens[-1] else ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    alice.transfer(bootstrap, 3 * ONE)
+    chain.pending_timestamp = bootstrap.vote_begin()
+    bootstrap.vote([protocol], [ONE], sender=alice)
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol], sender=deployer)
+
+    claimable, start = [], 0
+    while True:
+        page, start = bootstrap.claimable_incentives(alice, start, 2)
+        claimable += [(c.incentive, c.amount) for c in page]
+        if start == 0:
+            break
+    assert claimable == [(token, 1) for token in tokens[:-1]] + [(tokens[-1], ONE)]
+
+def test_claim_incentives_gas(project, chain, deployer, alice, bootstrap, in_whitelist):
+    protocols = [project.MockToken.deploy(sender=deployer) for _ in range(5)]
+    incentives = [project.MockToken.deploy(sender=deployer) for _ in range(2)]
+
+    for protocol in protocols:
+        bootstrap.apply(protocol, value=ONE, sender=alice)
+        bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    for incentive in incentives:
+        incentive.approve(bootstrap, MAX, sender=deployer)
+        incentive.mint(deployer, 5 * ONE, sender=deployer)
+        for protocol in protocols:
+            bootstrap.incentivize(protocol, incentive, ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    alice.transfer(bootstrap, ONE)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    bootstrap.vote([protocols[0]], [ONE], sender=alice)
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners(protocols, sender=deployer)
+
+    pairs = [(protocol, incentive) for protocol in protocols for incentive in incentives]
+    snapshot = chain.snapshot()
+    single = 0
+    for protocol, incentive in pairs:
+        single += bootstrap.claim_incentive(protocol, incentive, sender=alice).gas_used
+    chain.restore(snapshot)
+
+    tx = bootstrap.claim_incentives([p for p, _ in pairs], [i for _, i in pairs], sender=alice)
+    assert incentives[0].balanceOf(alice) == 5 * ONE
+    assert incentives[1].balanceOf(alice) == 5 * ONE
+    # the batch saves more than the base cost of the transactions it replaces
+    assert tx.gas_used < single - (len(pairs) - 1) * 21_000
+
+def test_distribute_incentive(project, chain, accounts, deployer, alice, bob, bootstrap, in_whitelist):
+    protocol = project.MockToken.deploy(sender=deployer)
+    incentive = project.MockToken.deploy(sender=deployer)
+    voters = [accounts[i] for i in range(5, 10)]
+    
+    bootstrap.apply(protocol, value=ONE, sender=alice)
+    bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    incentive.approve(bootstrap, MAX, sender=deployer)
+    incentive.mint(deployer, 15 * ONE, sender=deployer)
+    bootstrap.incentivize(protocol, incentive, 15 * ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    for i, voter in enumerate(voters):
+        bootstrap.deposit(voter, value=(i + 1) * ONE, sender=alice)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    for i, voter in enumerate(voters):
+        bootstrap.vote([protocol], [(i + 1) * ONE], sender=voter)
+
+    with ape.reverts():
+        bootstrap.distribute_incentive(protocol, incentive, voters, sender=bob)
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol], sender=deployer)
+    bootstrap.claim_incentive(protocol, incentive, voters[0], sender=bob)
+
+    # already claimed and non-voting accounts are skipped
+    tx = bootstrap.distribute_incentive(protocol, incentive, voters + [alice], sender=bob)
+    assert len(tx.decode_logs(bootstrap.ClaimIncentive)) == len(voters) - 1
+    for i, voter in enumerate(voters):
+        assert incentive.balanceOf(voter) == (i + 1) * ONE
+        assert bootstrap.incentive_claimed(protocol, incentive, voter)
+    assert incentive.balanceOf(bootstrap) == 0
+
+def test_distribute_incentives_driver(project, chain, accounts, deployer, alice, bob, bootstrap, in_whitelist):
+    protocol = project.MockToken.deploy(sender=deployer)
+    incentive = project.MockToken.deploy(sender=deployer)
+    voters = [accounts[i] for i in range(5, 10)]
+    
+    bootstrap.apply(protocol, value=ONE, sender=alice)
+    bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    incentive.approve(bootstrap, MAX, sender=deployer)
+    incentive.mint(deployer, 5 * ONE, sender=deployer)
+    bootstrap.incentivize(protocol, incentive, 5 * ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    for voter in voters:
+        bootstrap.deposit(voter, value=ONE, sender=alice)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    for voter in voters:
+        bootstrap.vote([protocol], [ONE // 2], sender=voter)
+        bootstrap.vote([protocol], [ONE // 2], sender=voter)
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol], sender=deployer)
+    bootstrap.claim_incentive(protocol, incentive, voters[0], sender=bob)
+
+    # gas target only allows two claimers per transaction
+    gas = bootstrap.distribute_incentive.estimate_gas_cost(protocol, incentive, voters[1:3], sender=bob)
+    receipts = distribute_incentives.distribute(bootstrap, protocol, incentive, bob, gas_target=gas)
+    assert [len(r.decode_logs(bootstrap.ClaimIncentive)) for r in receipts] == [2, 2]
+    for voter in voters:
+        assert incentive.balanceOf(voter) == ONE
+    assert distribute_incentives.distribute(bootstrap, protocol, incentive, bob) == []
+
+def test_incentive_tokens(project, chain, deployer, alice, bootstrap, in_whitelist):
+    protocol = project.MockToken.deploy(sender=deployer)
+    incentive1 = project.MockToken.deploy(sender=deployer)
+    incentive2 = project.MockToken.deploy(sender=deployer)
+
+    bootstrap.apply(protocol, value=ONE, sender=alice)
+    bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    for incentive in [incentive1, incentive2]:
+        incentive.approve(bootstrap, MAX, sender=deployer)
+        incentive.mint(deployer, 2 * ONE, sender=deployer)
+
+    assert bootstrap.num_incentive_tokens(protocol) == 0
+    bootstrap.incentivize(protocol, incentive1, ONE, sender=deployer)
+    bootstrap.incentivize(protocol, incentive2, ONE, sender=deployer)
+    bootstrap.incentivize(protocol, incentive1, ONE, sender=deployer)
+    assert bootstrap.num_incentive_tokens(protocol) == 2
+    assert bootstrap.incentive_tokens(protocol, 0) == incentive1
+    assert bootstrap.incentive_tokens(protocol, 1) == incentive2
+
+def test_claim_incentive_bitmap_gas(project, chain, deployer, alice, bob, bootstrap, in_whitelist):
+    protocol1 = project.MockToken.deploy(sender=deployer)
+    protocol2 = project.MockToken.deploy(sender=deployer)
+    incentive1 = project.MockToken.deploy(sender=deployer)
+    incentive2 = project.MockToken.deploy(sender=deployer)
+
+    for protocol in [protocol1, protocol2]:
+        bootstrap.apply(protocol, value=ONE, sender=alice)
+        bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    for incentive in [incentive1, incentive2]:
+        incentive.approve(bootstrap, MAX, sender=deployer)
+        incentive.mint(deployer, 2 * ONE, sender=deployer)
+        bootstrap.incentivize(protocol1, incentive, ONE, sender=deployer)
+        bootstrap.incentivize(protocol2, incentive, ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    alice.transfer(bootstrap, ONE)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    bootstrap.vote([protocol1], [ONE], sender=alice)
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol1, protocol2], sender=deployer)
+
+    # only the first claim of an account writes to an empty slot
+    first = bootstrap.claim_incentive(protocol1, incentive1, sender=alice).gas_used
+    second = bootstrap.claim_incentive(protocol1, incentive2, sender=alice).gas_used
+    assert second < first
+    assert bootstrap.incentive_claimed(protocol1, incentive1, alice)
+    assert bootstrap.incentive_claimed(protocol1, incentive2, alice)
+    assert not bootstrap.incentive_claimed(protocol2, incentive1, alice)
+    assert not bootstrap.incentive_claimed(protocol2, incentive2, alice)
+    with ape.reverts():
+        bootstrap.claim_incentive(protocol1, incentive1, sender=alice)
+
+    bootstrap.claim_incentive(protocol2, incentive2, sender=alice)
+    assert bootstrap.incentive_claimed(protocol2, incentive2, alice)
+    assert not bootstrap.incentive_claimed(protocol2, incentive1, alice)
+    assert incentive2.balanceOf(alice) == 2 * ONE
+
+def test_claim_incentive_overflow(project, chain, deployer, alice, bootstrap, in_whitelist):
+    protocol = project.MockToken.deploy(sender=deployer)
+    incentives = [project.MockToken.deploy(sender=deployer) for _ in range(52)]
+
+    bootstrap.apply(protocol, value=ONE, sender=alice)
+    bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    for incentive in incentives:
+        incentive.approve(bootstrap, MAX, sender=deployer)
+        incentive.mint(deployer, ONE, sender=deployer)
+        bootstrap.incentivize(protocol, incentive, ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    alice.transfer(bootstrap, ONE)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    bootstrap.vote([protocol], [ONE], sender=alice)
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol], sender=deployer)
+
+    # incentive tokens beyond the bitmap capacity are tracked separately
+    assert bootstrap.claimable_incentive(protocol, incentives[-1], alice) == ONE
+    bootstrap.claim_incentive(protocol, incentives[-1], sender=alice)
+    assert bootstrap.incentive_claimed(protocol, incentives[-1], alice)
+    assert bootstrap.claimable_incentive(protocol, incentives[-1], alice) == 0
+    assert not bootstrap.incentive_claimed(protocol, incentives[-2], alice)
+    with ape.reverts():
+        bootstrap.claim_incentive(protocol, incentives[-1], sender=alice)
+
+    bootstrap.claim_incentive(protocol, incentives[-2], sender=alice)
+    assert bootstrap.incentive_claimed(protocol, incentives[-2], alice)
+    assert incentives[-1].balanceOf(alice) == ONE
+    assert incentives[-2].balanceOf(alice) == ONE
+
+def test_claim_incentive_proof(project, chain, accounts, deployer, alice, bob, bootstrap, tmp_path, in_whitelist):
+    protocol = project.MockToken.deploy(sender=deployer)
+    incentive = project.MockToken.deploy(sender=deployer)
+    voters = [accounts[i] for i in range(5, 10)]
+    
+    bootstrap.apply(protocol, value=ONE, sender=alice)
+    bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    incentive.approve(bootstrap, MAX, sender=deployer)
+    incentive.mint(deployer, 10 * ONE, sender=deployer)
+    bootstrap.incentivize(protocol, incentive, 10 * ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    for i, voter in enumerate(voters):
+        bootstrap.deposit(voter, value=(i + 1) * ONE + i + 1, sender=alice)
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    for i, voter in enumerate(voters):
+        bootstrap.vote([protocol], [(i + 1) * ONE + i], sender=voter)
+    bootstrap.vote([protocol], [1], sender=voters[0])
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol], sender=deployer)
+
+    path = tmp_path / 'proofs.bin'
+    leaves = list(incentive_tree.entitlements(bootstrap, protocol, incentive))
+    assert [a for a, _ in leaves] == voters
+    for account, amount in leaves:
+        assert amount == bootstrap.claimable_incentive(protocol, incentive, account)
+    root, count = incentive_tree.build(leaves, path)
+    assert count == len(voters)
+
+    with ape.reverts():
+        bootstrap.set_incentive_root(protocol, incentive, root, sender=alice)
+    bootstrap.set_incentive_root(protocol, incentive, root, sender=deployer)
+    assert bootstrap.incentive_roots(protocol, incentive) == root
+
+    bootstrap.claim_incentive(protocol, incentive, voters[0], sender=bob)
+    for account, amount, proof in incentive_tree.proofs(path):
+        assert incentive_tree.verify(root, account, amount, proof)
+        if account == voters[0]:
+            # already claimed through the regular path
+            with ape.reverts():
+                bootstrap.claim_incentive_proof(protocol, incentive, amount, proof, account, sender=bob)
+            continue
+        with ape.reverts():
+            bootstrap.claim_incentive_proof(protocol, incentive, amount + 1, proof, account, sender=bob)
+        bootstrap.claim_incentive_proof(protocol, incentive, amount, proof, account, sender=bob)
+        assert bootstrap.incentive_claimed(protocol, incentive, account)
+        assert incentive.balanceOf(account) == amount
+        with ape.reverts():
+            bootstrap.claim_incentive(protocol, incentive, account, sender=bob)
+    assert incentive.balanceOf(bootstrap) == 10 * ONE - sum(a for _, a in leaves)
+
+def test_voter_packed(project, chain, deployer, alice, bob, bootstrap, in_whitelist):
+    # deposits and votes used share a slot but are read and written independently
+    protocol = project.MockToken.deploy(sender=deployer)
+    incentive = project.MockToken.deploy(sender=deployer)
+    bootstrap.apply(protocol, value=ONE, sender=alice)
+    bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    incentive.approve(bootstrap, MAX, sender=deployer)
+    incentive.mint(deployer, ONE, sender=deployer)
+    bootstrap.incentivize(protocol, incentive, ONE, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    bob.transfer(bootstrap, ONE)
+    bootstrap.deposit(value=2 * ONE, sender=alice)
+    assert bootstrap.deposits(alice) == 2 * ONE
+    assert bootstrap.votes_used(alice) == 0
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    bootstrap.vote([protocol], [ONE], sender=alice)
+    assert bootstrap.deposits(alice) == 2 * ONE
+    assert bootstrap.votes_used(alice) == ONE
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol], sender=deployer)
+    bootstrap.claim_incentive(protocol, incentive, sender=alice)
+    assert incentive.balanceOf(alice) == ONE
+
+    chain.pending_timestamp = bootstrap.lock_end()
+    bootstrap.claim(2 * ONE, sender=alice)
+    assert bootstrap.deposits(alice) == 0
+    assert bootstrap.votes_used(alice) == ONE
+
+def test_voter_gas(project, chain, deployer, alice, bob, bootstrap, in_whitelist):
+    # every step and the whole path of a voter stay within the benchmarks of the same calls
+    baseline = gas.load(Path(__file__).parent / 'gas_baseline.json')
+    benchmarks = {
+        'deposit': 'Bootstrap.deposit[new_account]',
+        'vote': 'Bootstrap.vote[protocols=1]',
+        'claim_incentive': 'Bootstrap.claim_incentive[first]',
+        'claim': 'Bootstrap.claim[partial]',
+    }
+    protocol = project.MockToken.deploy(sender=deployer)
+    incentive = project.MockToken.deploy(sender=deployer)
+    bootstrap.apply(protocol, value=ONE, sender=alice)
+    bootstrap.whitelist(protocol, sender=deployer)
+
+    chain.pending_timestamp = bootstrap.incentive_begin()
+    incentive.approve(bootstrap, MAX, sender=deployer)
+    incentive.mint(deployer, ONE, sender=deployer)
+    bootstrap.incentivize(protocol, incentive, ONE, sender=deployer)
+
+    used = {}
+    chain.pending_timestamp = bootstrap.deposit_begin()
+    bob.transfer(bootstrap, ONE)
+    used['deposit'] = bootstrap.deposit(value=2 * ONE, sender=alice).gas_used
+
+    chain.pending_timestamp = bootstrap.vote_begin()
+    used['vote'] = bootstrap.vote([protocol], [ONE], sender=alice).gas_used
+
+    chain.pending_timestamp = bootstrap.vote_end()
+    bootstrap.declare_winners([protocol], sender=deployer)
+    used['claim_incentive'] = bootstrap.claim_incentive(protocol, incentive, sender=alice).gas_used
+
+    chain.pending_timestamp = bootstrap.lock_end()
+    used['claim'] = bootstrap.claim(ONE, sender=alice).gas_used
+    assert bootstrap.deposits(alice) == ONE
+    assert bootstrap.votes_used(alice) == ONE
+
+    for step, amount in used.items():
+        assert not gas.regressed(baseline[benchmarks[step]], amount), step
+    assert not gas.regressed(sum(baseline[key] for key in benchmarks.values()), sum(used.values()))
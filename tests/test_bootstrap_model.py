@@ -0,0 +1,93 @@
+import pytest
+from functools import cache
+from bootstrap_model import (
+    MANAGEMENT, ONE, MAX, Generator, Reverted, coverage, initial_balances, run, replay, compare, sample, schedule
+)
+
+WEEK_LENGTH = 7 * 24 * 60 * 60
+NUM_ACTORS = 5
+NUM_PROTOCOLS = 7
+NUM_INCENTIVES = 2
+FUNDING = 20 * ONE
+MODEL_RUNS = 2_000
+CHAIN_RUNS = 3
+
+@cache
+def model_runs():
+    # the model does not depend on the absolute timestamps, only on the schedule
+    ts = 100 * WEEK_LENGTH
+    balances = initial_balances(NUM_ACTORS, NUM_INCENTIVES, FUNDING)
+    runs = []
+    for seed in range(MODEL_RUNS):
+        actions = Generator(seed, NUM_ACTORS, NUM_PROTOCOLS, NUM_INCENTIVES, balances=balances).sequence()
+        _, outcomes = run(actions, ts, balances)
+        runs.append((actions, outcomes))
+    return runs
+
+@cache
+def sampled():
+    return sample(model_runs(), CHAIN_RUNS)
+
+@pytest.fixture(scope='module')
+def actors(accounts):
+    # management, treasury and three depositors
+    return accounts[:NUM_ACTORS]
+
+@pytest.fixture(scope='module')
+def pol(accounts):
+    return accounts[NUM_ACTORS]
+
+@pytest.fixture(scope='module')
+def deployment(project, chain, actors, pol):
+    # deployed once, every replay starts from the same state through test isolation
+    deployer = actors[MANAGEMENT]
+    token = project.Token.deploy(sender=deployer)
+    staking = project.MockStaking.deploy(token, sender=deployer)
+    bootstrap = project.Bootstrap.deploy(token, staking, actors[1], pol, False, sender=deployer)
+    token.set_minter(bootstrap, sender=deployer)
+    token.set_minter(deployer, sender=deployer)
+    ts = (chain.pending_timestamp // WEEK_LENGTH + 1) * WEEK_LENGTH
+    periods = schedule(ts)
+    bootstrap.set_whitelist_period(*periods['whitelist'], sender=deployer)
+    bootstrap.set_incentive_period(*periods['incentive'], sender=deployer)
+    bootstrap.set_deposit_period(*periods['deposit'], sender=deployer)
+    bootstrap.set_lock_end(periods['lock_end'], sender=deployer)
+    bootstrap.set_vote_period(*periods['vote'], sender=deployer)
+
+    protocols = [project.MockToken.deploy(sender=deployer) for _ in range(NUM_PROTOCOLS)]
+    incentives = [project.MockToken.deploy(sender=deployer) for _ in range(NUM_INCENTIVES)]
+    for actor in actors:
+        token.mint(actor, FUNDING, sender=deployer)
+        token.approve(bootstrap, MAX, sender=actor)
+        for incentive in incentives:
+            incentive.mint(actor, FUNDING, sender=deployer)
+            incentive.approve(bootstrap, MAX, sender=actor)
+    return bootstrap, token, protocols, incentives, ts
+
+def test_model():
+    covered = set()
+    for actions, outcomes in model_runs():
+        covered |= coverage(actions, outcomes)
+
+    # sequences reach every action both successfully and reverted
+    for name in ['apply', 'whitelist', 'undo_whitelist', 'incentivize', 'deposit', 'vote', 'undo_vote', 'declare_winners', 'claim_incentive', 'refund_incentive', 'repay', 'split']:
+        assert (name, False) in covered, name
+        assert (name, True) in covered, name
+
+def test_sample():
+    covered = set()
+    for i in sampled():
+        covered |= coverage(*model_runs()[i])
+    assert len(covered) > 20
+
+@pytest.mark.parametrize('index', range(CHAIN_RUNS))
+def test_differential(chain, actors, deployment, index):
+    actions, _ = model_runs()[sampled()[index]]
+    bootstrap, token, protocols, incentives, ts = deployment
+    model, expected = run(actions, ts, initial_balances(NUM_ACTORS, NUM_INCENTIVES, FUNDING))
+    outcomes = replay(actions, chain, bootstrap, ts, actors, protocols, incentives)
+    for i, (action, want, got) in enumerate(zip(actions, expected, outcomes)):
+        if action[0] == 'advance':
+            continue
+        assert isinstance(got, Reverted) == isinstance(want, Reverted), (i, action, want, got)
+    compare(model, bootstrap, token, actors, protocols, incentives)
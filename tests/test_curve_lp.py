@@ -0,0 +1,148 @@
+import ape
+import pytest
+from pol_curve_lp import (
+    test_from_pol_native, test_from_pol_mint, test_from_pol_token, test_to_pol_native, test_to_pol_native_max,
+    test_to_pol_token, test_to_pol_token_max, test_wrap, test_unwrap, test_add_liquidity, test_remove_liquidity,
+    test_remove_liquidity_imbalance, test_deposit_gauge, test_curve_rewards, test_withdraw_gauge, test_deposit_convex,
+    test_deposit_stake_convex, test_stake_convex, test_convex_rewards, test_withdraw_convex, test_unstake_convex,
+    test_unstake_withdraw_convex, test_deposit_yvault, test_withdraw_yvault, test_zap_in, test_zap_in_gauge,
+    test_zap_in_convex, test_zap_in_yvault, test_zap_in_invalid, test_zap_out, test_zap_out_gauge, test_zap_out_convex,
+    test_zap_out_yvault, test_multicall,
+)
+
+# runs the CurveLP tests of `pol_curve_lp.py` against local mocks of Curve, Convex and Yearn
+
+NATIVE = '0x0000000000000000000000000000000000000000'
+MINT   = '0x0000000000000000000000000000000000000001'
+ONE    = 1_000_000_000_000_000_000
+MAX    = 2**256 - 1
+CRV_RATE = ONE // 100 # per second, for the whole gauge
+
+@pytest.fixture(scope='module')
+def deployer(accounts):
+    return accounts[0]
+
+@pytest.fixture(scope='module')
+def operator(accounts):
+    return accounts[1]
+
+@pytest.fixture(scope='module')
+def alice(accounts):
+    return accounts[2]
+
+@pytest.fixture(scope='module')
+def token(project, deployer):
+    return project.Token.deploy(sender=deployer)
+
+@pytest.fixture(scope='module')
+def weth(project, deployer):
+    return project.MockWETH.deploy(sender=deployer)
+
+@pytest.fixture(scope='module')
+def crv(project, deployer):
+    return project.MockToken.deploy(sender=deployer)
+
+@pytest.fixture(scope='module')
+def cvx(project, deployer):
+    return project.MockToken.deploy(sender=deployer)
+
+@pytest.fixture(scope='module')
+def minter(project, deployer, crv):
+    minter = project.MockMinter.deploy(crv, sender=deployer)
+    crv.set_minter(minter, sender=deployer)
+    return minter
+
+@pytest.fixture(scope='module')
+def pol(project, alice, deployer, token):
+    pol = project.POL.deploy(token, sender=deployer)
+    token.set_minter(pol, sender=deployer)
+    alice.transfer(pol, ONE)
+    return pol
+
+@pytest.fixture(scope='module')
+def curve_module(project, deployer, operator, token, pol, weth, crv, minter):
+    curve_module = project.CurveLP.deploy(token, pol, weth, crv, sender=deployer)
+    curve_module.set_operator(operator, sender=deployer)
+    curve_module.accept_operator(sender=operator)
+    pol.approve(MINT, curve_module, MAX, sender=deployer)
+    pol.approve(NATIVE, curve_module, MAX, sender=deployer)
+    pol.approve(token, curve_module, MAX, sender=deployer)
+    return curve_module
+
+@pytest.fixture(scope='module')
+def curve_pool(project, deployer, operator, token, weth, curve_module):
+    curve_pool = project.MockCurvePool.deploy([weth, token], 100, 4000000, sender=deployer)
+    curve_module.set_pool(curve_pool, sender=deployer)
+    curve_module.approve_pool_yeth(MAX, sender=operator)
+    curve_module.approve_pool_weth(MAX, sender=operator)
+    return curve_pool
+
+@pytest.fixture(scope='module')
+def gauge(project, deployer, operator, curve_pool, curve_module):
+    gauge = project.MockGauge.deploy(curve_pool, CRV_RATE, sender=deployer)
+    curve_module.set_gauge(gauge, sender=deployer)
+    curve_module.gauge_rewards_receiver(sender=operator)
+    curve_module.approve_gauge(MAX, sender=operator)
+    return gauge
+
+@pytest.fixture(scope='module')
+def convex_booster(project, deployer, operator, crv, minter, curve_pool, curve_module):
+    booster = project.MockConvexBooster.deploy(crv, minter, sender=deployer)
+    curve_module.set_convex_booster(booster, sender=deployer)
+    curve_module.approve_convex_booster(MAX, sender=operator)
+    return booster
+
+@pytest.fixture(scope='module')
+def convex_pool_id(project, deployer, crv, cvx, curve_pool, curve_module, gauge, convex_booster):
+    id = convex_booster.poolLength()
+    token = project.MockToken.deploy(sender=deployer)
+    rewards = project.MockConvexRewards.deploy(convex_booster, id, token, crv, cvx, sender=deployer)
+    convex_booster.add_pool(curve_pool, gauge, token, rewards, sender=deployer)
+    curve_module.set_convex_pool_id(id, sender=deployer)
+    return id
+
+@pytest.fixture(scope='module')
+def convex_token(project, deployer, curve_module, convex_booster, convex_pool_id):
+    token = convex_booster.poolInfo(convex_pool_id).token
+    curve_module.set_convex_token(token, sender=deployer)
+    return project.MockToken.at(token)
+
+@pytest.fixture(scope='module')
+def convex_rewards(project, deployer, operator, curve_module, convex_booster, convex_pool_id, convex_token):
+    rewards = convex_booster.poolInfo(convex_pool_id).crvRewards
+    curve_module.set_convex_rewards(rewards, sender=deployer)
+    curve_module.approve_convex_rewards(MAX, sender=operator)
+    return project.MockConvexRewards.at(rewards)
+
+@pytest.fixture(scope='module')
+def yvault(project, deployer, operator, curve_pool, curve_module, convex_rewards):
+    vault = project.MockYVault.deploy(curve_pool, sender=deployer)
+    curve_module.set_yvault(vault, sender=deployer)
+    curve_module.approve_yvault(MAX, sender=operator)
+    return vault
+
+def test_crv_minter(deployer, crv, minter):
+    # only the gauge minter mints CRV
+    with ape.reverts():
+        crv.mint(deployer, ONE, sender=deployer)
+
+def test_imbalanced_add_liquidity(operator, token, curve_pool, curve_module):
+    curve_module.zap_in(ONE // 2, ONE // 2, ONE, 4, sender=operator)
+    # imbalanced deposits pay a fee and mint fewer LP tokens than their value
+    curve_module.from_pol(NATIVE, ONE // 10, sender=operator)
+    curve_module.wrap(ONE // 10, sender=operator)
+    before = curve_pool.balanceOf(curve_module)
+    curve_module.add_liquidity([ONE // 10, 0], 0, sender=operator)
+    minted = curve_pool.balanceOf(curve_module) - before
+    assert ONE * 99 // 1000 < minted < ONE // 10
+    assert curve_pool.get_virtual_price() > ONE
+
+def test_zap_out_yvault_loss(operator, token, pol, curve_module, yvault):
+    curve_module.zap_in(ONE, ONE, 2 * ONE, 3, sender=operator)
+    yvault.set_loss(100, sender=operator)
+    with ape.reverts():
+        curve_module.zap_out(2 * ONE, 3, [0, 0], sender=operator)
+    # the loss has to be accepted explicitly
+    curve_module.zap_out(2 * ONE, 3, [0, 0], 100, sender=operator)
+    assert yvault.balanceOf(curve_module) == 0
+    assert token.balanceOf(pol) == ONE * 99 // 100
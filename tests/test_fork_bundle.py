@@ -0,0 +1,63 @@
+import gzip
+import json
+import pytest
+from ape import Contract
+from scripts import fork_bundle
+
+ACCOUNTS = {
+    '0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2': {
+        'nonce': 1,
+        'balance': '0x0',
+        'code': '0x6080',
+        'storage': {fork_bundle._word(3): fork_bundle._word(2**255)},
+    },
+}
+
+def test_state_encoding():
+    data = fork_bundle.encode_state(ACCOUNTS)
+    assert bytes.fromhex(data[2:])[:2] == fork_bundle.GZIP_MAGIC
+    assert fork_bundle.decode_state(data) == {'accounts': ACCOUNTS}
+
+    # uncompressed dumps are accepted as well
+    plain = json.dumps({'accounts': ACCOUNTS}).encode().hex()
+    assert fork_bundle.decode_state(plain) == {'accounts': ACCOUNTS}
+
+def test_word():
+    assert fork_bundle._word(1) == '0x' + '0' * 63 + '1'
+    assert fork_bundle._word('0x1') == fork_bundle._word(1)
+    assert fork_bundle._word('0x' + 'f' * 64) == fork_bundle._word(2**256 - 1)
+
+def test_bundle_file(tmp_path):
+    bundle = {'chain_id': 1, 'block_number': 10, 'timestamp': 20, 'accounts': ACCOUNTS, 'contract_types': {}}
+    path = str(tmp_path / 'bundle.json.gz')
+    fork_bundle.write(bundle, path)
+    with open(path, 'rb') as f:
+        assert f.read(2) == fork_bundle.GZIP_MAGIC
+    assert fork_bundle.read(path) == bundle
+    with gzip.open(path, 'rt') as f:
+        assert json.load(f)['block_number'] == 10
+
+def test_load(chain, project):
+    if chain.provider.name != 'foundry':
+        pytest.skip('loading a bundle requires an anvil node')
+    address = '0x00000000000000000000000000000000000c0ffe'
+    contract_type = project.MockToken.contract_type
+    bundle = {
+        'chain_id': 1,
+        'block_number': 10,
+        'timestamp': chain.pending_timestamp + 3600,
+        'accounts': {
+            address: {
+                'nonce': 1,
+                'balance': '0x0',
+                'code': contract_type.runtime_bytecode.bytecode,
+                # totalSupply
+                'storage': {fork_bundle._word(0): fork_bundle._word(5)},
+            },
+        },
+        'contract_types': {address: contract_type.model_dump(mode='json', by_alias=True)},
+    }
+    fork_bundle.load(bundle)
+    assert chain.contracts.get(address).name == 'MockToken'
+    assert Contract(address).totalSupply() == 5
+    assert chain.pending_timestamp >= bundle['timestamp']
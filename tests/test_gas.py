@@ -0,0 +1,273 @@
+import pytest
+
+# gas benchmarks, see `scripts/gas.py` for comparing them against `gas_baseline.json`
+
+NATIVE = '0x0000000000000000000000000000000000000000'
+MINT   = '0x0000000000000000000000000000000000000001'
+BURN   = '0x0000000000000000000000000000000000000002'
+ONE    = 1_000_000_000_000_000_000
+MAX    = 2**256 - 1
+NUM_PROTOCOLS = 32
+BOOTSTRAPS = ['Bootstrap', 'BootstrapRedeploy']
+
+@pytest.fixture(scope='module')
+def alice(accounts):
+    return accounts[2]
+
+@pytest.fixture(scope='module')
+def bob(accounts):
+    return accounts[3]
+
+@pytest.fixture(scope='module')
+def voters(accounts):
+    return accounts[4:8]
+
+@pytest.fixture(scope='module')
+def token(project, deployer):
+    token = project.Token.deploy(sender=deployer)
+    token.set_minter(deployer, sender=deployer)
+    return token
+
+@pytest.fixture(scope='module')
+def pol(project, deployer, alice, token):
+    pol = project.POL.deploy(token, sender=deployer)
+    token.set_minter(pol, sender=deployer)
+    alice.transfer(pol, 10 * ONE)
+    return pol
+
+@pytest.fixture(scope='module')
+def protocols(project, deployer):
+    return [project.MockToken.deploy(sender=deployer) for _ in range(NUM_PROTOCOLS)]
+
+@pytest.fixture(scope='module')
+def incentives(project, deployer):
+    incentives = [project.MockToken.deploy(sender=deployer) for _ in range(2)]
+    for incentive in incentives:
+        incentive.mint(deployer, 1_000 * ONE, sender=deployer)
+    return incentives
+
+@pytest.fixture(scope='module')
+def bootstraps(deployer, voters, open_bootstrap, protocols, incentives):
+    """
+    Both bootstrap contracts with all periods open at once, every protocol whitelisted and
+    incentivized with the first incentive token, and a deposit by every voter
+    """
+    bootstraps = {}
+    for name in BOOTSTRAPS:
+        bootstrap = open_bootstrap(redeploy=name == 'BootstrapRedeploy')
+        for protocol in protocols:
+            bootstrap.apply(protocol, value=ONE, sender=deployer)
+            bootstrap.whitelist(protocol, sender=deployer)
+        for incentive in incentives:
+            incentive.approve(bootstrap, MAX, sender=deployer)
+        for protocol in protocols:
+            bootstrap.incentivize(protocol, incentives[0], ONE, sender=deployer)
+        if name == 'Bootstrap':
+            for voter in voters:
+                bootstrap.deposit(value=10 * ONE, sender=voter)
+        else:
+            bootstrap.deposit(voters, [10 * ONE] * len(voters), sender=deployer)
+        bootstraps[name] = bootstrap
+    return bootstraps
+
+def declare(chain, deployer, voters, bootstrap, protocols):
+    # votes on the first protocol by every voter, which wins
+    for voter in voters:
+        bootstrap.vote([protocols[0]], [ONE], sender=voter)
+    chain.pending_timestamp = bootstrap.lock_end()
+    bootstrap.declare_winners([protocols[0]], sender=deployer)
+
+@pytest.mark.parametrize('name', BOOTSTRAPS)
+def test_apply(project, deployer, bootstraps, measure_gas, name):
+    protocol = project.MockToken.deploy(sender=deployer)
+    measure_gas(f'{name}.apply', bootstraps[name].apply(protocol, value=ONE, sender=deployer))
+    measure_gas(f'{name}.whitelist', bootstraps[name].whitelist(protocol, sender=deployer))
+
+@pytest.mark.parametrize('name', BOOTSTRAPS)
+@pytest.mark.parametrize('existing', [False, True])
+def test_incentivize(deployer, protocols, incentives, bootstraps, measure_gas, name, existing):
+    # a new incentive token for a protocol also adds it to the token list
+    incentive = incentives[0] if existing else incentives[1]
+    tx = bootstraps[name].incentivize(protocols[0], incentive, ONE, sender=deployer)
+    measure_gas(f'{name}.incentivize[{"existing" if existing else "new"}_token]', tx)
+
+@pytest.mark.parametrize('existing', [False, True])
+def test_deposit(alice, voters, bootstraps, measure_gas, existing):
+    account = voters[0] if existing else alice
+    tx = bootstraps['Bootstrap'].deposit(value=ONE, sender=account)
+    measure_gas(f'Bootstrap.deposit[{"existing" if existing else "new"}_account]', tx)
+
+@pytest.mark.parametrize('num_accounts', [1, 16, 64, 256])
+def test_deposit_redeploy(deployer, bootstraps, measure_gas, num_accounts):
+    addresses = [f'0x{i + 1:040x}' for i in range(num_accounts)]
+    tx = bootstraps['BootstrapRedeploy'].deposit(addresses, [ONE] * num_accounts, sender=deployer)
+    measure_gas(f'BootstrapRedeploy.deposit[accounts={num_accounts}]', tx)
+
+@pytest.mark.parametrize('name', BOOTSTRAPS)
+@pytest.mark.parametrize('num_protocols', [1, 8, 32])
+def test_vote(voters, protocols, bootstraps, measure_gas, name, num_protocols):
+    tx = bootstraps[name].vote(protocols[:num_protocols], [ONE // num_protocols] * num_protocols, sender=voters[0])
+    measure_gas(f'{name}.vote[protocols={num_protocols}]', tx)
+
+@pytest.mark.parametrize('name', BOOTSTRAPS)
+def test_undo_vote(deployer, voters, protocols, bootstraps, measure_gas, name):
+    bootstrap = bootstraps[name]
+    bootstrap.vote([protocols[0]], [ONE], sender=voters[0])
+    bootstrap.undo_whitelist(protocols[0], sender=deployer)
+    measure_gas(f'{name}.undo_vote', bootstrap.undo_vote(protocols[0], voters[0], sender=deployer))
+
+@pytest.mark.parametrize('name', BOOTSTRAPS)
+@pytest.mark.parametrize('full', [False, True])
+def test_claim(chain, voters, bootstraps, measure_gas, name, full):
+    bootstrap = bootstraps[name]
+    chain.pending_timestamp = bootstrap.lock_end()
+    tx = bootstrap.claim(10 * ONE if full else ONE, sender=voters[0])
+    measure_gas(f'{name}.claim[{"full" if full else "partial"}]', tx)
+
+@pytest.mark.parametrize('name', BOOTSTRAPS)
+def test_declare_winners(chain, deployer, protocols, bootstraps, measure_gas, name):
+    bootstrap = bootstraps[name]
+    chain.pending_timestamp = bootstrap.lock_end()
+    measure_gas(f'{name}.declare_winners[winners=5]', bootstrap.declare_winners(protocols[:5], sender=deployer))
+
+@pytest.mark.parametrize('name', BOOTSTRAPS)
+def test_claim_incentive(chain, deployer, voters, protocols, incentives, bootstraps, measure_gas, name):
+    bootstrap = bootstraps[name]
+    bootstrap.incentivize(protocols[0], incentives[1], ONE, sender=deployer)
+    declare(chain, deployer, voters, bootstrap, protocols)
+    # the second claim of an account writes to an already used slot of the claim bitmap
+    measure_gas(f'{name}.claim_incentive[first]', bootstrap.claim_incentive(protocols[0], incentives[0], sender=voters[0]))
+    measure_gas(f'{name}.claim_incentive[second]', bootstrap.claim_incentive(protocols[0], incentives[1], sender=voters[0]))
+
+@pytest.mark.parametrize('name', BOOTSTRAPS)
+def test_claim_incentives(chain, deployer, voters, protocols, incentives, bootstraps, measure_gas, name):
+    bootstrap = bootstraps[name]
+    bootstrap.incentivize(protocols[0], incentives[1], ONE, sender=deployer)
+    declare(chain, deployer, voters, bootstrap, protocols)
+    tx = bootstrap.claim_incentives([protocols[0]] * 2, incentives, sender=voters[0])
+    measure_gas(f'{name}.claim_incentives[incentives=2]', tx)
+
+@pytest.mark.parametrize('name', BOOTSTRAPS)
+def test_refund_incentive(chain, deployer, voters, protocols, incentives, bootstraps, measure_gas, name):
+    bootstrap = bootstraps[name]
+    declare(chain, deployer, voters, bootstrap, protocols)
+    measure_gas(f'{name}.refund_incentive', bootstrap.refund_incentive(protocols[1], incentives[0], sender=deployer))
+
+def test_pol(deployer, alice, token, pol, measure_gas):
+    pol.approve(MINT, deployer, MAX, sender=deployer)
+    pol.approve(BURN, deployer, MAX, sender=deployer)
+    pol.approve(NATIVE, deployer, MAX, sender=deployer)
+    measure_gas('POL.mint', pol.mint(ONE, sender=deployer))
+    measure_gas('POL.burn', pol.burn(ONE, sender=deployer))
+    measure_gas('POL.send_native', pol.send_native(alice, ONE, sender=deployer))
+    measure_gas('POL.receive_native', pol.receive_native(value=ONE, sender=alice))
+
+@pytest.mark.parametrize('existing', [False, True])
+def test_token_transfer(deployer, treasury, alice, bob, token, measure_gas, existing):
+    # writing to the zero balance of a new receiver costs more than updating an existing one
+    token.mint(alice, 2 * ONE, sender=deployer)
+    if existing:
+        token.mint(bob, ONE, sender=deployer)
+        token.mint(treasury, ONE, sender=deployer)
+    label = "existing" if existing else "new"
+    measure_gas(f'Token.transfer[{label}_receiver]', token.transfer(bob, ONE, sender=alice))
+    token.approve(deployer, ONE, sender=alice)
+    measure_gas(f'Token.transferFrom[{label}_receiver]', token.transferFrom(alice, treasury, ONE, sender=deployer))
+
+def test_token(deployer, alice, token, measure_gas):
+    measure_gas('Token.mint', token.mint(alice, ONE, sender=deployer))
+    measure_gas('Token.approve', token.approve(deployer, ONE, sender=alice))
+    measure_gas('Token.burn', token.burn(alice, ONE, sender=deployer))
+
+@pytest.fixture(scope='module')
+def stake(project, deployer, treasury, token, pol):
+    stake = project.Stake.deploy(pol, treasury, sender=deployer)
+    pol.approve(NATIVE, stake, MAX, sender=deployer)
+    pol.approve(MINT, deployer, MAX, sender=deployer)
+    pol.approve(token, stake, MAX, sender=deployer)
+    return stake
+
+@pytest.mark.parametrize('native', [True, False])
+def test_stake(deployer, token, pol, stake, measure_gas, native):
+    asset = NATIVE
+    label = 'native'
+    if not native:
+        pol.mint(ONE, sender=deployer)
+        asset = token
+        label = 'token'
+    measure_gas(f'Stake.from_pol[{label}]', stake.from_pol(asset, ONE, sender=deployer))
+    measure_gas(f'Stake.to_pol[{label}]', stake.to_pol(asset, ONE // 2, sender=deployer))
+    measure_gas(f'Stake.to_treasury[{label}]', stake.to_treasury(asset, ONE // 2, sender=deployer))
+
+@pytest.fixture(scope='module')
+def shutdown(project, deployer, alice, token, pol, bootstraps):
+    bootstrap = bootstraps['Bootstrap']
+    shutdown = project.Shutdown.deploy(token, bootstrap, pol, sender=deployer)
+    pool = project.MockPool.deploy(sender=deployer)
+    shutdown.set_pool(pool, sender=deployer)
+    pool.set_killed(True, sender=deployer)
+    bootstrap.allow_repay(shutdown, True, sender=deployer)
+    pol.approve(NATIVE, shutdown, MAX, sender=deployer)
+    token.mint(alice, 2 * ONE, sender=deployer)
+    token.approve(shutdown, MAX, sender=alice)
+    return shutdown
+
+@pytest.mark.parametrize('amount', [ONE // 100, 2 * ONE])
+def test_redeem(alice, shutdown, measure_gas, amount):
+    measure_gas(f'Shutdown.redeem[amount={amount / ONE:g}]', shutdown.redeem(amount, sender=alice))
+
+@pytest.fixture(scope='module')
+def curve_module(project, deployer, token, pol):
+    """
+    CurveLP module on the local Curve, Convex and Yearn mocks, with every destination configured
+    """
+    weth = project.MockWETH.deploy(sender=deployer)
+    crv = project.MockToken.deploy(sender=deployer)
+    cvx = project.MockToken.deploy(sender=deployer)
+    minter = project.MockMinter.deploy(crv, sender=deployer)
+    crv.set_minter(minter, sender=deployer)
+
+    curve_module = project.CurveLP.deploy(token, pol, weth, crv, sender=deployer)
+    pol.approve(MINT, curve_module, MAX, sender=deployer)
+    pol.approve(NATIVE, curve_module, MAX, sender=deployer)
+    pol.approve(BURN, curve_module, MAX, sender=deployer)
+    pol.approve(token, curve_module, MAX, sender=deployer)
+
+    pool = project.MockCurvePool.deploy([weth, token], 100, 4000000, sender=deployer)
+    gauge = project.MockGauge.deploy(pool, ONE // 100, sender=deployer)
+    booster = project.MockConvexBooster.deploy(crv, minter, sender=deployer)
+    pool_id = booster.poolLength()
+    convex_token = project.MockToken.deploy(sender=deployer)
+    rewards = project.MockConvexRewards.deploy(booster, pool_id, convex_token, crv, cvx, sender=deployer)
+    booster.add_pool(pool, gauge, convex_token, rewards, sender=deployer)
+    yvault = project.MockYVault.deploy(pool, sender=deployer)
+
+    curve_module.set_pool(pool, sender=deployer)
+    curve_module.set_gauge(gauge, sender=deployer)
+    curve_module.set_convex_booster(booster, sender=deployer)
+    curve_module.set_convex_pool_id(pool_id, sender=deployer)
+    curve_module.set_convex_token(convex_token, sender=deployer)
+    curve_module.set_convex_rewards(rewards, sender=deployer)
+    curve_module.set_yvault(yvault, sender=deployer)
+    for approve in [
+        curve_module.approve_pool_yeth, curve_module.approve_pool_weth, curve_module.approve_gauge,
+        curve_module.approve_convex_booster, curve_module.approve_convex_rewards, curve_module.approve_yvault,
+    ]:
+        approve(MAX, sender=deployer)
+
+    # seed the pool, so benchmarks measure the regular rather than the initial deposit
+    curve_module.zap_in(ONE, ONE, 0, 4, sender=deployer)
+    return curve_module
+
+# 0 = gauge, 1 = Convex booster, 2 = Convex rewards, 3 = yVault, 4 = LP tokens
+ZAP_TARGETS = ['gauge', 'convex_booster', 'convex_rewards', 'yvault', 'lp']
+
+@pytest.mark.parametrize('target', range(len(ZAP_TARGETS)))
+def test_zap(deployer, curve_module, measure_gas, target):
+    measure_gas(f'CurveLP.zap_in[{ZAP_TARGETS[target]}]', curve_module.zap_in(ONE, ONE, 0, target, sender=deployer))
+    measure_gas(f'CurveLP.zap_out[{ZAP_TARGETS[target]}]', curve_module.zap_out(ONE, target, [0, 0], sender=deployer))
+
+@pytest.fixture(scope='module', autouse=True)
+def deployment(bootstraps, stake, shutdown, curve_module):
+    # everything is deployed up front, so the gas of a benchmark does not depend on which other benchmarks run
+    pass
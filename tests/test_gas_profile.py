@@ -0,0 +1,155 @@
+import pytest
+from scripts import gas_profile
+
+WEEK_LENGTH = 7 * 24 * 60 * 60
+ONE = 1_000_000_000_000_000_000
+BOOTSTRAP = '0x00000000000000000000000000000000000000b0'
+TOKEN = '0x00000000000000000000000000000000000000c0'
+
+@pytest.fixture(scope='module')
+def contract_types(project):
+    return {BOOTSTRAP: project.Bootstrap.contract_type, TOKEN: project.MockToken.contract_type}
+
+@pytest.fixture(scope='module')
+def profile(contract_types):
+    return lambda: gas_profile.Profile(contract_types.get)
+
+@pytest.fixture(scope='module')
+def sources(project, contract_types):
+    sources = {}
+    for address, contract_type in contract_types.items():
+        content = project.sources[contract_type.source_id].fetch_content()
+        positions, _ = gas_profile.source_map(content)
+        sources[address] = gas_profile.Source(contract_type, content, positions)
+    return sources
+
+def pc(source, function, text):
+    """
+    A program counter of a line of a function containing some text
+    """
+    first, last = source.span(function)
+    return min(pc for pc, line in source.pcs.items() if first <= line <= last and text in source.lines[line - 1])
+
+def step(pc, op, gas, cost, depth=1, stack=()):
+    return {'pc': pc, 'op': op, 'gas': gas, 'gasCost': cost, 'depth': depth, 'stack': list(stack)}
+
+@pytest.fixture(scope='module')
+def logs(sources):
+    """
+    `claim_incentive` reading storage and calling `transfer` of a token, which writes storage
+    """
+    bootstrap, token = sources[BOOTSTRAP], sources[TOKEN]
+    call = pc(bootstrap, 'claim_incentive', 'transfer')
+    unmapped = next(pc for pc in range(call + 1, call + 100) if pc not in bootstrap.pcs)
+    return [
+        step(0, 'PUSH1', 100_000, 3),
+        step(pc(bootstrap, 'claim_incentive', 'self.claimed_incentives[_claimer]'), 'SLOAD', 99_997, 2_100),
+        step(call, 'CALL', 97_897, 95_000, stack=['0x0', hex(int(TOKEN, 16)), '0x1000']),
+        step(pc(token, 'transfer', 'self.balanceOf[_to]'), 'SSTORE', 95_000, 20_000, depth=2),
+        step(pc(token, 'transfer', 'return True'), 'RETURN', 75_000, 0, depth=2),
+        step(unmapped, 'ISZERO', 75_297, 3),
+    ]
+
+def test_costs(logs):
+    charged = gas_profile.costs(logs)
+    assert charged == [3, 2_100, 2_600, 20_000, 0, 3]
+    assert sum(charged) == logs[0]['gas'] - logs[-1]['gas'] + logs[-1]['gasCost']
+
+def test_costs_nested():
+    # calls inside calls, a call without code and a call that runs out of the trace
+    logs = [
+        step(0, 'CALL', 1_000, 900),
+        step(0, 'STATICCALL', 800, 700, depth=2),
+        step(0, 'SLOAD', 700, 100, depth=3),
+        step(0, 'STOP', 600, 0, depth=3),
+        step(0, 'CALL', 650, 100, depth=2),
+        step(0, 'RETURN', 600, 0, depth=2),
+        step(0, 'POP', 640, 2),
+        step(0, 'CALL', 638, 600),
+        step(0, 'SSTORE', 500, 100, depth=2),
+    ]
+    charged = gas_profile.costs(logs)
+    assert charged == [160, 50, 100, 0, 50, 0, 2, 138, 100]
+    assert sum(charged) == logs[0]['gas'] - logs[-1]['gas'] + logs[-1]['gasCost']
+
+def test_source(sources):
+    bootstrap = sources[BOOTSTRAP]
+    assert bootstrap.function(bootstrap.starts[0]) == bootstrap.functions[0]
+    first, last = bootstrap.span('vote')
+    assert bootstrap.lines[first - 1].startswith('def vote(')
+    assert bootstrap.lines[last - 1].strip() != ''
+    assert not bootstrap.lines[last].startswith('def ')
+    assert all(1 <= line <= len(bootstrap.lines) for line in bootstrap.pcs.values())
+    assert any(bootstrap.function(line) == 'vote' for line in bootstrap.pcs.values())
+
+def test_profile(profile, sources, logs):
+    bootstrap, token = sources[BOOTSTRAP], sources[TOKEN]
+    result = profile()
+    result.add_trace(logs, BOOTSTRAP, 21_000)
+    sload = bootstrap.line(logs[1]['pc'])
+    call = bootstrap.line(logs[2]['pc'])
+    sstore = token.line(logs[3]['pc'])
+    ret = token.line(logs[4]['pc'])
+    assert result.stacks == {
+        'Bootstrap;<compiler>': 3,
+        f'Bootstrap;claim_incentive;Bootstrap.vy:{sload}': 2_100,
+        f'Bootstrap;claim_incentive;Bootstrap.vy:{call}': 2_600 + 3,
+        f'Bootstrap;claim_incentive;Bootstrap.vy:{call};MockToken;transfer;MockToken.vy:{sstore}': 20_000,
+        f'Bootstrap;claim_incentive;Bootstrap.vy:{call};MockToken;transfer;MockToken.vy:{ret}': 0,
+        'Bootstrap;<intrinsic>': 21_000,
+    }
+    assert result.lines[('contracts/Bootstrap.vy', sload)] == {'gas': 2_100, 'SLOAD': 1, 'SLOAD gas': 2_100}
+    assert result.lines[('contracts/Bootstrap.vy', call)]['CALL gas'] == 2_600
+    assert result.lines[('contracts/mocks/MockToken.vy', sstore)]['SSTORE'] == 1
+
+    # profiles add up over transactions
+    result.add_trace(logs, BOOTSTRAP)
+    assert result.transactions == 2
+    assert result.lines[('contracts/Bootstrap.vy', sload)]['SLOAD'] == 2
+    assert sum(result.stacks.values()) == 2 * 24_706 + 21_000
+
+def test_reports(tmp_path, profile, sources, logs):
+    result = profile()
+    result.add_trace(logs, BOOTSTRAP)
+    folded = result.folded().split('\n')
+    # lines without gas are left out
+    assert len(folded) == 4
+    assert all(int(line.rsplit(' ', 1)[1]) > 0 for line in folded)
+
+    annotated = result.annotate()
+    blocks = annotated.split('\n\n')
+    assert blocks[0].startswith('Bootstrap.claim_incentive: 4703 gas')
+    assert blocks[1].startswith('MockToken.transfer: 20000 gas')
+    sload = sources[BOOTSTRAP].line(logs[1]['pc'])
+    row = next(line for line in blocks[0].split('\n') if f'{sload:>5}  ' in line)
+    assert row.split()[:3] == ['2100', '1', '2100']
+
+    result.write(tmp_path / 'profile')
+    assert (tmp_path / 'profile.folded').read_text() == result.folded() + '\n'
+    assert (tmp_path / 'profile.txt').read_text() == annotated + '\n'
+
+def test_unknown_contract(profile, logs):
+    result = profile()
+    # steps in contracts without a source are charged to the address, known callees are resolved
+    unknown = '0x00000000000000000000000000000000000000d0'
+    result.add_trace(logs, unknown)
+    assert result.stacks[unknown] == 4_706
+    assert sum(gas for stack, gas in result.stacks.items() if stack.startswith(f'{unknown};MockToken;transfer;')) == 20_000
+
+def test_changed_source(project, contract_types):
+    # a build that is out of date with the source cannot be profiled
+    result = gas_profile.Profile(contract_types.get, lambda source_id: project.sources[source_id].fetch_content() + '\n@external\ndef extra():\n    pass\n')
+    with pytest.raises(ValueError):
+        result.source(TOKEN)
+
+def test_trace(chain, project, deployer, accounts):
+    if not chain.provider.supports_tracing:
+        pytest.skip('provider does not trace transactions')
+    token = project.MockToken.deploy(sender=deployer)
+    token.mint(deployer, ONE, sender=deployer)
+    tx = token.transfer(accounts[1], ONE, sender=deployer)
+    result = gas_profile.Profile()
+    result.add(tx.txn_hash)
+    assert sum(result.stacks.values()) == tx.gas_used
+    assert any(stack.startswith('MockToken;transfer;') for stack in result.stacks)
+    assert 'MockToken.transfer' in result.annotate()
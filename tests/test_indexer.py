@@ -0,0 +1,189 @@
+import pytest
+from ape.exceptions import ProviderError
+from scripts import indexer
+
+DAY_LENGTH = 24 * 60 * 60
+WEEK_LENGTH = 7 * DAY_LENGTH
+NATIVE = '0x0000000000000000000000000000000000000000'
+MINT   = '0x0000000000000000000000000000000000000001'
+ONE = 1_000_000_000_000_000_000
+MAX = 2**256 - 1
+
+@pytest.fixture(scope='module')
+def alice(accounts):
+    return accounts[2]
+
+@pytest.fixture(scope='module')
+def bob(accounts):
+    return accounts[3]
+
+@pytest.fixture(scope='module')
+def protocols(project, chain, deployer, alice, bootstrap):
+    protocols = [project.MockToken.deploy(sender=deployer) for _ in range(2)]
+    chain.pending_timestamp += WEEK_LENGTH
+    for protocol in protocols:
+        bootstrap.apply(protocol, value=ONE, sender=alice)
+        bootstrap.whitelist(protocol, sender=deployer)
+    return protocols
+
+@pytest.fixture(scope='module')
+def incentive(project, chain, deployer, bootstrap, protocols):
+    incentive = project.MockToken.deploy(sender=deployer)
+    incentive.approve(bootstrap, MAX, sender=deployer)
+    incentive.mint(deployer, 3 * ONE, sender=deployer)
+    chain.pending_timestamp += WEEK_LENGTH
+    bootstrap.incentivize(protocols[0], incentive, 2 * ONE, sender=deployer)
+    bootstrap.incentivize(protocols[1], incentive, ONE, sender=deployer)
+    return incentive
+
+def populate(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive):
+    chain.pending_timestamp += WEEK_LENGTH
+    alice.transfer(bootstrap, ONE)
+    bootstrap.deposit(bob, value=3 * ONE, sender=alice)
+
+    chain.pending_timestamp += WEEK_LENGTH
+    bootstrap.vote([protocols[0], protocols[1]], [ONE // 2, ONE // 2], sender=alice)
+    bootstrap.vote([protocols[0]], [2 * ONE], sender=bob)
+
+    chain.pending_timestamp += WEEK_LENGTH
+    bootstrap.declare_winners([protocols[0]], sender=deployer)
+    bootstrap.claim_incentive(protocols[0], incentive, sender=alice)
+    bootstrap.refund_incentive(protocols[1], incentive, sender=deployer)
+
+    deployer.transfer(pol, ONE)
+    pol.approve(MINT, deployer, ONE, sender=deployer)
+    pol.mint(ONE, sender=deployer)
+
+def test_index(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive):
+    populate(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive)
+    db = indexer.connect(':memory:')
+    idx = indexer.bootstrap_indexer(db, bootstrap, pol, chunk=4, confirmations=0)
+    count = idx.run()
+    assert count == len(list(indexer.events(db)))
+    assert indexer.checkpoint(db, idx.name) == chain.blocks.height
+
+    state = indexer.state(db)
+    assert state['applied'] == state['whitelisted'] == {p.address for p in protocols}
+    for account in [alice, bob]:
+        assert state['deposits'][account.address] == bootstrap.deposits(account)
+        assert state['votes_used'][account.address] == bootstrap.votes_used(account)
+    for protocol in protocols:
+        assert state['votes'][protocol.address] == bootstrap.votes(protocol)
+    assert state['incentives'][(protocols[0].address, incentive.address)] == 2 * ONE
+    assert state['claimed_incentives'][(protocols[0].address, incentive.address)] == incentive.balanceOf(alice)
+    assert state['refunded_incentives'][(protocols[1].address, incentive.address)] == ONE
+    assert state['winners'] == [protocols[0].address]
+    assert state['pol_debt'] == pol.debt()
+    assert state['pol_allowances'][(MINT, deployer.address)] == ONE
+
+def test_resume(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive):
+    db = indexer.connect(':memory:')
+    first = indexer.bootstrap_indexer(db, bootstrap, pol, confirmations=0).run()
+    assert first == 6 # applications, whitelists and incentives
+    assert indexer.bootstrap_indexer(db, bootstrap, pol, confirmations=0).run() == 0
+
+    populate(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive)
+    second = indexer.bootstrap_indexer(db, bootstrap, pol, confirmations=0).run()
+    assert second > 0
+    assert first + second == len(list(indexer.events(db)))
+
+def test_resume_interrupted(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive):
+    populate(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive)
+    expected = indexer.bootstrap_indexer(indexer.connect(':memory:'), bootstrap, pol, confirmations=0).run()
+
+    db = indexer.connect(':memory:')
+    idx = indexer.bootstrap_indexer(db, bootstrap, pol, chunk=1, confirmations=0)
+    idx.fetch = fail_after(idx.fetch, 3)
+    with pytest.raises(ConnectionError):
+        idx.run()
+    partial = len(list(indexer.events(db)))
+    assert indexer.checkpoint(db, idx.name) is not None
+
+    # nothing is indexed twice after a restart
+    rest = indexer.bootstrap_indexer(db, bootstrap, pol, confirmations=0).run()
+    assert partial + rest == expected == len(list(indexer.events(db)))
+
+def test_adaptive_chunk(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive):
+    populate(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive)
+    db = indexer.connect(':memory:')
+    idx = indexer.bootstrap_indexer(db, bootstrap, pol, chunk=64, target_logs=2, confirmations=0)
+    fetch = idx.fetch
+    ranges = []
+    def limited(start, stop):
+        ranges.append(stop - start + 1)
+        if stop - start >= 8:
+            raise ProviderError('query returned more than 10000 results')
+        return fetch(start, stop)
+    idx.fetch = limited
+    count = idx.run()
+    assert count == len(list(indexer.events(db)))
+    assert ranges[0] > 8
+    assert min(ranges) < 8
+
+def test_other_errors(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive):
+    # errors that are not about the size of the range are raised without retrying
+    db = indexer.connect(':memory:')
+    idx = indexer.bootstrap_indexer(db, bootstrap, pol, chunk=64, confirmations=0)
+    ranges = []
+    def failing(start, stop):
+        ranges.append(stop - start + 1)
+        raise ProviderError('internal error')
+    idx.fetch = failing
+    with pytest.raises(ProviderError):
+        idx.run()
+    assert len(ranges) == 1
+    assert idx.chunk == 64
+    assert indexer.range_error(ProviderError('Log response size exceeded.'))
+    assert not indexer.range_error(ValueError('query returned more than 10000 results'))
+
+def test_confirmations(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive):
+    populate(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive)
+    expected = indexer.bootstrap_indexer(indexer.connect(':memory:'), bootstrap, pol, confirmations=0).run()
+    db = indexer.connect(':memory:')
+    idx = indexer.bootstrap_indexer(db, bootstrap, pol)
+    idx.run()
+    block = indexer.checkpoint(db, idx.name)
+    assert block is None or block == chain.blocks.height - indexer.CONFIRMATIONS
+
+    # blocks are indexed once they are final
+    chain.mine(indexer.CONFIRMATIONS)
+    idx.run()
+    assert indexer.checkpoint(db, idx.name) == chain.blocks.height - indexer.CONFIRMATIONS
+    assert len(list(indexer.events(db))) == expected
+
+def test_undo(chain, deployer, alice, bob, bootstrap, pol, protocols, incentive):
+    chain.pending_timestamp += WEEK_LENGTH
+    bootstrap.deposit(value=ONE, sender=alice)
+    bootstrap.deposit(value=ONE, sender=bob)
+
+    chain.pending_timestamp += WEEK_LENGTH
+    bootstrap.vote([protocols[0], protocols[1]], [ONE // 2, ONE // 2], sender=alice)
+    bootstrap.vote([protocols[1]], [ONE], sender=bob)
+    bootstrap.undo_whitelist(protocols[1], sender=deployer)
+    bootstrap.undo_vote(protocols[1], sender=alice)
+
+    db = indexer.connect(':memory:')
+    indexer.bootstrap_indexer(db, bootstrap, pol, confirmations=0).run()
+    # undos emit no event
+    assert indexer.state(db)['votes_used'][alice.address] == ONE
+
+    state = indexer.state(db, bootstrap)
+    assert state['whitelisted'] == {protocols[0].address}
+    for account in [alice, bob]:
+        assert state['votes_used'][account.address] == bootstrap.votes_used(account)
+    for protocol in protocols:
+        assert state['votes'][protocol.address] == bootstrap.votes(protocol)
+    assert sum(state['votes_used'].values()) == bootstrap.voted()
+
+    # state is read at the last indexed block
+    bootstrap.undo_vote(protocols[1], sender=bob)
+    assert indexer.state(db, bootstrap)['votes_used'][bob.address] == ONE
+
+def fail_after(fetch, calls):
+    state = {'calls': 0}
+    def wrapped(start, stop):
+        state['calls'] += 1
+        if state['calls'] > calls:
+            raise ConnectionError('provider went away')
+        return fetch(start, stop)
+    return wrapped
@@ -0,0 +1,137 @@
+import pytest
+from scripts import leaderboard
+
+ONE = 1_000_000_000_000_000_000
+NUM_PROTOCOLS = 8
+
+@pytest.fixture(scope='module')
+def alice(accounts):
+    return accounts[2]
+
+@pytest.fixture(scope='module')
+def voters(accounts):
+    return accounts[3:8]
+
+@pytest.fixture(scope='module')
+def protocols(project, deployer):
+    return [project.MockToken.deploy(sender=deployer) for _ in range(NUM_PROTOCOLS)]
+
+@pytest.fixture(scope='module')
+def bootstrap(deployer, alice, voters, open_bootstrap, protocols):
+    bootstrap = open_bootstrap()
+    for protocol in protocols:
+        bootstrap.apply(protocol, value=ONE, sender=alice)
+        bootstrap.whitelist(protocol, sender=deployer)
+    for voter in voters:
+        bootstrap.deposit(value=10 * ONE, sender=voter)
+    return bootstrap
+
+def on_chain(bootstrap, protocols):
+    ranking = [(protocol.address, bootstrap.votes(protocol)) for protocol in protocols]
+    return sorted([(p, v) for p, v in ranking if v > 0], key=lambda item: (-item[1], item[0].lower()))
+
+def vote_round(bootstrap, voters, protocols, offset):
+    for i, voter in enumerate(voters):
+        bootstrap.vote(
+            [protocols[(i + offset) % len(protocols)], protocols[(2 * i + offset + 1) % len(protocols)]],
+            [(i + 1) * ONE // 4, ONE // 8],
+            sender=voter,
+        )
+
+def test_tally():
+    tally = leaderboard.Tally()
+    tally.apply(1, {'0xB': 5, '0xa': 3})
+    tally.apply(2, {'0xa': 2, '0xc': 1})
+    assert tally.ranking() == [('0xa', 5), ('0xB', 5), ('0xc', 1)]
+    assert tally.ranking(2) == [('0xa', 5), ('0xB', 5)]
+    assert tally.ranking(1, lambda protocol: protocol != '0xa') == [('0xB', 5)]
+    assert tally.voted == 11
+
+    # reverting a block restores the totals before it
+    tally.rollback(1)
+    assert tally.ranking() == [('0xB', 5), ('0xa', 3)]
+    assert tally.voted == 8
+
+    # protocols without votes are not ranked
+    tally.apply(3, {'0xB': -5})
+    assert tally.ranking() == [('0xa', 3)]
+
+def test_tally_finalize():
+    tally = leaderboard.Tally()
+    tally.apply(1, {'0xa': 1})
+    tally.apply(2, {'0xa': 1})
+    tally.apply(2, {'0xb': 1})
+    tally.apply(3, {'0xb': 4})
+    tally.finalize(2)
+    assert tally.journal == [(3, {'0xb': 4})]
+    tally.rollback(tally.finalized)
+    assert tally.ranking() == [('0xa', 2), ('0xb', 1)]
+
+def test_tally_heap():
+    # stale heap entries are compacted away
+    tally = leaderboard.Tally()
+    for i in range(1_000):
+        tally.apply(i, {f'0x{i % 10:x}': 1})
+    assert len(tally.heap) <= 2 * len(tally.totals) + 64
+    assert tally.ranking(3) == [('0x0', 100), ('0x1', 100), ('0x2', 100)]
+
+def test_update(chain, bootstrap, voters, protocols):
+    board = leaderboard.Leaderboard(bootstrap, confirmations=2)
+    assert board.update() == 0
+    vote_round(bootstrap, voters, protocols, 0)
+    assert board.update() == 2 * len(voters)
+    assert board.ranking() == on_chain(bootstrap, protocols)
+    assert board.update() == 0
+
+    vote_round(bootstrap, voters, protocols, 3)
+    assert board.update() == 2 * len(voters)
+    assert board.ranking() == on_chain(bootstrap, protocols)
+    assert board.tally.voted == bootstrap.voted()
+    assert board.block == chain.blocks.height
+
+def test_undo(deployer, bootstrap, voters, protocols):
+    board = leaderboard.Leaderboard(bootstrap, confirmations=2)
+    vote_round(bootstrap, voters, protocols, 0)
+    board.update()
+    retracted = board.ranking(1)[0][0]
+    bootstrap.undo_whitelist(retracted, sender=deployer)
+    voter = next(voter for voter in voters if bootstrap.votes_used_protocol(voter, retracted) > 0)
+    bootstrap.undo_vote(retracted, sender=voter)
+    assert board.update() == 0
+    assert board.ranking() == on_chain(bootstrap, protocols)
+    assert board.tally.voted == bootstrap.voted()
+
+    # the retracted protocol keeps its remaining votes but cannot win
+    assert retracted not in board.winners()
+
+def test_reorg(chain, bootstrap, voters, protocols):
+    board = leaderboard.Leaderboard(bootstrap, confirmations=6)
+    vote_round(bootstrap, voters, protocols, 0)
+    chain.mine(5)
+    board.update()
+    finalized = board.tally.finalized
+    snapshot = chain.snapshot()
+    vote_round(bootstrap, voters, protocols, 1)
+    board.update()
+    assert finalized < board.tally.finalized < chain.blocks.height - len(voters)
+
+    # replace the blocks after the snapshot, which are not final yet, with different votes
+    chain.restore(snapshot)
+    vote_round(bootstrap, voters, protocols, 2)
+    board.update()
+    assert board.reorgs == 1
+    assert board.ranking() == on_chain(bootstrap, protocols)
+    assert board.tally.voted == bootstrap.voted()
+
+def test_declare_winners(chain, deployer, bootstrap, voters, protocols):
+    board = leaderboard.Leaderboard(bootstrap, confirmations=2)
+    vote_round(bootstrap, voters, protocols, 0)
+    vote_round(bootstrap, voters, protocols, 5)
+    board.update()
+    winners = [protocol for protocol, _ in on_chain(bootstrap, protocols)[:leaderboard.MAX_WINNERS]]
+    assert board.winners() == winners
+    assert board.declare_calldata() == bytes(bootstrap.declare_winners.encode_input(winners))
+
+    chain.pending_timestamp = bootstrap.lock_end()
+    deployer.transfer(bootstrap, 0, data=board.declare_calldata())
+    assert [bootstrap.winners_list(i) for i in range(bootstrap.num_winners())] == winners
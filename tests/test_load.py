@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from scripts import load
+
+def test_split():
+    assert load.split(10, 3) == [4, 3, 3]
+    assert load.split(2, 4) == [2, 0, 0, 0]
+    assert sum(load.split(10**18 + 7, 8)) == 10**18 + 7
+
+def test_generate_accounts():
+    accounts = load.generate_accounts(1, 'depositor', 3)
+    assert accounts == load.generate_accounts(1, 'depositor', 3)
+    assert len(set(accounts)) == 3
+    assert accounts != load.generate_accounts(2, 'depositor', 3)
+    assert accounts[0] != load.generate_accounts(1, 'incentivizer', 1)[0]
+
+def test_summarize():
+    # records arrive out of chain order when sent concurrently
+    records = [
+        ('deposit', 3, 0, 30),
+        ('deposit', 1, 0, 10),
+        ('vote', 2, 1, 100),
+        ('deposit', 2, 0, 20),
+        ('deposit', 4, 0, 40),
+        ('deposit', 5, 0, 50),
+    ]
+    summary = load.summarize(records, buckets=2)
+    assert summary['deposit']['count'] == 5
+    assert summary['deposit']['total'] == 150
+    assert (summary['deposit']['min'], summary['deposit']['max'], summary['deposit']['mean']) == (10, 50, 30)
+    assert summary['deposit']['by_state_size'] == [
+        {'from': 0, 'to': 3, 'mean': 20},
+        {'from': 3, 'to': 5, 'mean': 45},
+    ]
+    assert summary['vote']['by_state_size'] == [{'from': 0, 'to': 1, 'mean': 100}]
+
+def test_format_report():
+    report = {
+        'phases': [{'phase': 'fund', 'transactions': 0, 'seconds': 0.1}, {'phase': 'deposit', 'transactions': 2, 'seconds': 1.0, 'tps': 2.0, 'gas': 30}],
+        'operations': load.summarize([('deposit', 1, 0, 10), ('deposit', 2, 0, 20)]),
+        'claim_gas': 0,
+    }
+    text = load.format_report(report)
+    assert 'deposit' in text and 'total claim gas: 0' in text
+
+def test_simulate(chain, deployer):
+    uri = getattr(chain.provider, 'http_uri', None)
+    if chain.provider.name != 'foundry' or uri is None:
+        pytest.skip('the load simulator needs an anvil node with an HTTP endpoint')
+    bootstrap, protocols, incentives = load.deploy(deployer, 3, 4)
+    report = asyncio.run(load.simulate(uri, deployer.address, bootstrap, protocols, incentives, 10, 0, 8))
+    operations = report['operations']
+    counts = {op: stats['count'] for op, stats in operations.items()}
+    # every protocol wins, so every depositor claims every incentive
+    assert counts == {
+        'apply': 3, 'whitelist': 3, 'mint': 4, 'approve': 4, 'incentivize': 4,
+        'deposit': 10, 'vote': 10, 'declare_winners': 1, 'claim_incentive': 40,
+    }
+    assert report['phases'][-1]['transactions'] == 40
+    assert report['claim_gas'] == operations['claim_incentive']['total'] == report['phases'][-1]['gas']
+    assert report['claim_gas'] > 40 * 21_000
+    for depositor in load.generate_accounts(0, 'depositor', 10):
+        assert all(incentive.balanceOf(depositor) > 0 for incentive in incentives)
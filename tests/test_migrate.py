@@ -0,0 +1,135 @@
+import pytest
+from eth_utils import to_checksum_address
+from scripts import indexer, migrate
+
+WEEK_LENGTH = 7 * 24 * 60 * 60
+ONE = 1_000_000_000_000_000_000
+NUM_DEPOSITORS = 40
+GAS_BUDGET = 500_000
+
+@pytest.fixture(scope='module')
+def alice(accounts):
+    return accounts[2]
+
+@pytest.fixture(scope='module')
+def bob(accounts):
+    return accounts[3]
+
+@pytest.fixture(scope='module')
+def depositors():
+    return [to_checksum_address(f'0x{i + 1:040x}') for i in range(NUM_DEPOSITORS)]
+
+@pytest.fixture(scope='module')
+def bootstrap(chain, alice, bob, open_bootstrap, depositors):
+    """
+    Original bootstrap with deposits on behalf of many accounts, repeated deposits and claims
+    """
+    bootstrap = open_bootstrap()
+    for i, depositor in enumerate(depositors):
+        bootstrap.deposit(depositor, value=(i + 1) * ONE // 10, sender=alice)
+    bootstrap.deposit(value=ONE, sender=alice)
+    bootstrap.deposit(value=2 * ONE, sender=alice)
+    bootstrap.deposit(value=ONE, sender=bob)
+    chain.pending_timestamp += WEEK_LENGTH
+    bootstrap.claim(ONE // 2, sender=alice)
+    bootstrap.claim(ONE, sender=bob)
+    # the snapshot only reads final blocks
+    chain.mine(indexer.CONFIRMATIONS)
+    return bootstrap
+
+@pytest.fixture
+def redeploy(project, deployer, treasury, pol, token, staking):
+    redeploy = project.BootstrapRedeploy.deploy(token, staking, treasury, pol, sender=deployer)
+    token.set_minter(redeploy, sender=deployer)
+    return redeploy
+
+@pytest.fixture
+def db():
+    return indexer.connect(':memory:')
+
+def test_snapshot(alice, bob, bootstrap, depositors, db):
+    balances = migrate.snapshot(db, bootstrap)
+    assert list(balances) == depositors + [alice.address]
+    for i, depositor in enumerate(depositors):
+        assert balances[depositor] == (i + 1) * ONE // 10
+    assert balances[alice.address] == 5 * ONE // 2
+    assert sum(balances.values()) == bootstrap.deposited()
+    for account, amount in balances.items():
+        assert bootstrap.deposits(account) == amount
+
+def test_batch_size():
+    def estimate(size):
+        return 21_000 + 25_000 * size
+
+    assert migrate.batch_size(estimate, 10, 1_000_000) == (10, 271_000)
+    assert migrate.batch_size(estimate, 1_000, 10_000_000) == (256, 6_421_000)
+    assert migrate.batch_size(estimate, 100, 500_000) == (19, 496_000)
+    assert migrate.batch_size(estimate, 100, 46_000) == (1, 46_000)
+    with pytest.raises(ValueError):
+        migrate.batch_size(estimate, 100, 45_999)
+
+def test_batch_size_nonlinear():
+    # interpolation undershoots when gas grows faster than linear
+    calls = []
+    def estimate(size):
+        calls.append(size)
+        return 100_000 + 10_000 * size + 100 * size * size
+
+    assert migrate.batch_size(estimate, 256, 1_000_000) == (57, 994_900)
+    assert estimate(58) > 1_000_000
+    assert len(calls) < 16
+
+def test_plan(deployer, bootstrap, redeploy, db):
+    items = migrate.remaining(redeploy, migrate.snapshot(db, bootstrap))
+    batches = migrate.plan(redeploy, deployer, items, GAS_BUDGET)
+    assert len(batches) > 1
+    assert [(account, amount) for accounts, amounts, _ in batches for account, amount in zip(accounts, amounts)] == items
+    for accounts, amounts, gas in batches:
+        assert len(accounts) == len(amounts) <= migrate.MAX_BATCH
+        assert gas <= GAS_BUDGET
+
+def test_migrate(chain, deployer, bootstrap, redeploy, db):
+    balances = migrate.snapshot(db, bootstrap)
+    block = chain.blocks.height
+    receipts = migrate.migrate(db, bootstrap, redeploy, deployer, budget=GAS_BUDGET, max_pending=2)
+    assert len(receipts) > 1
+    assert all(not receipt.failed and receipt.gas_used <= GAS_BUDGET for receipt in receipts)
+    assert [receipt.nonce for receipt in receipts] == list(range(receipts[0].nonce, receipts[0].nonce + len(receipts)))
+    assert chain.blocks.height == block + len(receipts)
+    for account, amount in balances.items():
+        assert redeploy.deposits(account) == amount
+    assert redeploy.deposited() == bootstrap.deposited()
+
+def test_migrate_resume(deployer, alice, bootstrap, redeploy, depositors, db):
+    # an interrupted migration deposited the first batch and part of alice's deposit
+    redeploy.deposit(depositors[:10], [(i + 1) * ONE // 10 for i in range(10)], sender=deployer)
+    redeploy.deposit([alice], [ONE], sender=deployer)
+    migrate.migrate(db, bootstrap, redeploy, deployer, budget=GAS_BUDGET)
+    for account, amount in migrate.snapshot(db, bootstrap).items():
+        assert redeploy.deposits(account) == amount
+    assert redeploy.deposited() == bootstrap.deposited()
+
+    # running again is a no-op
+    assert migrate.migrate(db, bootstrap, redeploy, deployer, budget=GAS_BUDGET) == []
+    assert redeploy.deposited() == bootstrap.deposited()
+
+def test_migrate_reverted(deployer, bootstrap, redeploy, db):
+    items = migrate.remaining(redeploy, migrate.snapshot(db, bootstrap))
+    batches = migrate.plan(redeploy, deployer, items, GAS_BUDGET)
+    # the second batch runs out of gas, the ones after it are not sent
+    accounts, amounts, _ = batches[1]
+    batches[1] = (accounts, amounts, 30_000)
+    receipts = migrate.submit(redeploy, deployer, batches, max_pending=1)
+    assert [receipt.failed for receipt in receipts] == [False, True]
+    with pytest.raises(ValueError):
+        migrate.check(receipts)
+    assert redeploy.deposited() == sum(batches[0][1])
+
+    # running again deposits the remaining amounts
+    receipts = migrate.migrate(db, bootstrap, redeploy, deployer, budget=GAS_BUDGET)
+    migrate.check(receipts)
+    assert redeploy.deposited() == bootstrap.deposited()
+
+def test_migrate_depositor(alice, bootstrap, redeploy, db):
+    with pytest.raises(ValueError):
+        migrate.migrate(db, bootstrap, redeploy, alice)
@@ -0,0 +1,143 @@
+import csv
+import pytest
+from scripts import incentive_tree, indexer, payouts
+
+DAY_LENGTH = 24 * 60 * 60
+WEEK_LENGTH = 7 * DAY_LENGTH
+ONE = 1_000_000_000_000_000_000
+MAX = 2**256 - 1
+
+@pytest.fixture(scope='module')
+def voters(accounts):
+    return accounts[2:5]
+
+@pytest.fixture(scope='module')
+def protocols(project, chain, deployer, bootstrap):
+    protocols = [project.MockToken.deploy(sender=deployer) for _ in range(3)]
+    chain.pending_timestamp += WEEK_LENGTH
+    for protocol in protocols:
+        bootstrap.apply(protocol, value=ONE, sender=deployer)
+        bootstrap.whitelist(protocol, sender=deployer)
+    return protocols
+
+@pytest.fixture(scope='module')
+def incentives(project, chain, deployer, bootstrap, protocols):
+    incentives = [project.MockToken.deploy(sender=deployer) for _ in range(2)]
+    # large enough that `incentives * votes_used` overflows 64 bits
+    amounts = [[10**30 + 7, 3 * ONE + 1], [5 * ONE - 3, 0], [ONE, ONE]]
+    for incentive in incentives:
+        incentive.approve(bootstrap, MAX, sender=deployer)
+        incentive.mint(deployer, 2 * 10**30, sender=deployer)
+    chain.pending_timestamp += WEEK_LENGTH
+    for protocol, protocol_amounts in zip(protocols, amounts):
+        for incentive, amount in zip(incentives, protocol_amounts):
+            if amount > 0:
+                bootstrap.incentivize(protocol, incentive, amount, sender=deployer)
+    return incentives
+
+@pytest.fixture
+def votes(chain, voters, bootstrap, protocols, incentives):
+    chain.pending_timestamp += WEEK_LENGTH
+    for i, voter in enumerate(voters):
+        bootstrap.deposit(value=(i + 1) * ONE + 11 * i, sender=voter)
+
+    chain.pending_timestamp += WEEK_LENGTH
+    bootstrap.vote([protocols[0], protocols[2]], [ONE // 3, ONE // 7], sender=voters[0])
+    bootstrap.vote([protocols[0], protocols[1]], [ONE, 5], sender=voters[1])
+    bootstrap.vote([protocols[1]], [2 * ONE + 13], sender=voters[2])
+
+@pytest.fixture
+def declared(chain, deployer, bootstrap, protocols, votes):
+    chain.pending_timestamp += WEEK_LENGTH
+    bootstrap.declare_winners([protocols[0], protocols[1]], sender=deployer)
+
+def expected(bootstrap, voters, protocols, incentives):
+    return {
+        (voter.address, protocol.address, incentive.address): bootstrap.claimable_incentive(protocol, incentive, voter)
+        for voter in voters for protocol in protocols for incentive in incentives
+    }
+
+def test_compute():
+    votes = [0, 1, 3, 2**63 - 1, 10**20]
+    amounts = [1, 7, 10**30 + 1]
+    voted = sum(votes)
+    result = payouts.compute(votes, amounts, voted)
+    for i, v in enumerate(votes):
+        for j, a in enumerate(amounts):
+            assert result[i, j] == v * a // voted
+    assert payouts.compute([1, 2, 3], [10, 20], 6).tolist() == [[1, 3], [3, 6], [5, 10]]
+    assert payouts.compute([1, 2], [10], 0).tolist() == [[0], [0]]
+
+def test_from_chain(chain, deployer, voters, bootstrap, protocols, incentives, declared):
+    inputs = payouts.from_chain(bootstrap, incentive_tree.voters(bootstrap))
+    rows = list(payouts.rows(*inputs, chunk_size=2, skip_zero=False))
+    want = expected(bootstrap, voters, protocols, incentives)
+    got = {(v, p, i): amount for v, p, i, amount in rows}
+    assert len(rows) == len(got)
+    for key, amount in want.items():
+        assert got.get(key, 0) == amount
+    assert any(amount >= 2**64 for amount in got.values())
+
+def test_from_indexer(tmp_path, chain, deployer, voters, bootstrap, protocols, incentives, declared):
+    db = indexer.connect(':memory:')
+    indexer.bootstrap_indexer(db, bootstrap, confirmations=0).run()
+    path = str(tmp_path / 'payouts.csv')
+    count = payouts.write(payouts.rows(*payouts.from_indexer(db, bootstrap), chunk_size=1), path)
+
+    with open(path) as f:
+        reader = csv.reader(f)
+        assert next(reader) == payouts.COLUMNS
+        got = {(v, p, i): int(amount) for v, p, i, amount in reader}
+    assert len(got) == count
+    want = {key: amount for key, amount in expected(bootstrap, voters, protocols, incentives).items() if amount > 0}
+    assert got == want
+
+    # claimed incentives are still part of the payout matrix
+    protocol, incentive = protocols[0], incentives[0]
+    amount = bootstrap.claimable_incentive(protocol, incentive, voters[0])
+    bootstrap.claim_incentive(protocol, incentive, sender=voters[0])
+    assert incentive.balanceOf(voters[0]) == amount == got[(voters[0].address, protocol.address, incentive.address)]
+
+def test_undeclared(chain, voters, bootstrap, protocols, incentives, votes):
+    # before the winners are declared every incentivized protocol is projected
+    want = {
+        (voter.address, protocol.address, incentive.address):
+            bootstrap.incentives(protocol, incentive) * bootstrap.votes_used(voter) // bootstrap.voted()
+        for voter in voters for protocol in protocols for incentive in incentives
+    }
+    want = {key: amount for key, amount in want.items() if amount > 0}
+    assert len({protocol for _, protocol, _ in want}) == len(protocols)
+
+    inputs = payouts.from_chain(bootstrap, incentive_tree.voters(bootstrap))
+    assert inputs[3] is None
+    assert {(v, p, i): amount for v, p, i, amount in payouts.rows(*inputs)} == want
+
+    db = indexer.connect(':memory:')
+    indexer.bootstrap_indexer(db, bootstrap, confirmations=0).run()
+    inputs = payouts.from_indexer(db, bootstrap)
+    assert inputs[3] is None
+    assert {(v, p, i): amount for v, p, i, amount in payouts.rows(*inputs)} == want
+
+def test_from_indexer_undo(chain, deployer, voters, bootstrap, protocols, incentives):
+    # votes freed by `undo_vote` emit no event and lower the payouts of the other voters
+    chain.pending_timestamp += WEEK_LENGTH
+    for voter in voters:
+        bootstrap.deposit(value=ONE, sender=voter)
+
+    chain.pending_timestamp += WEEK_LENGTH
+    bootstrap.vote([protocols[0], protocols[2]], [ONE // 2, ONE // 2], sender=voters[0])
+    bootstrap.vote([protocols[1]], [ONE], sender=voters[1])
+    bootstrap.vote([protocols[2]], [ONE // 3], sender=voters[2])
+    bootstrap.undo_whitelist(protocols[2], sender=deployer)
+    bootstrap.undo_vote(protocols[2], sender=voters[0])
+
+    chain.pending_timestamp += WEEK_LENGTH
+    bootstrap.declare_winners([protocols[0], protocols[1]], sender=deployer)
+
+    db = indexer.connect(':memory:')
+    indexer.bootstrap_indexer(db, bootstrap, confirmations=0).run()
+    votes_used, incentive_amounts, voted, winners = payouts.from_indexer(db, bootstrap)
+    assert voted == bootstrap.voted()
+    got = {(v, p, i): amount for v, p, i, amount in payouts.rows(votes_used, incentive_amounts, voted, winners)}
+    want = {key: amount for key, amount in expected(bootstrap, voters, protocols, incentives).items() if amount > 0}
+    assert got == want
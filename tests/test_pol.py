@@ -8,28 +8,14 @@ BURN   = '0x0000000000000000000000000000000000000002'
 ONE    = 1_000_000_000_000_000_000
 MAX    = 2**256 - 1
 
-@pytest.fixture
-def deployer(accounts):
-    return accounts[0]
-
-@pytest.fixture
+@pytest.fixture(scope='module')
 def alice(accounts):
     return accounts[1]
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def bob(accounts):
     return accounts[2]
 
-@pytest.fixture
-def token(project, deployer):
-    return project.Token.deploy(sender=deployer)
-
-@pytest.fixture
-def pol(project, deployer, token):
-    pol = project.POL.deploy(token, sender=deployer)
-    token.set_minter(pol, sender=deployer)
-    return pol
-
 def test_approve_privilege(deployer, alice, pol):
     with ape.reverts():
         pol.approve(MINT, alice, ONE, sender=alice)
@@ -161,3 +147,75 @@ def test_transfer_management(deployer, alice, bob, pol):
     pol.accept_management(sender=alice)
     assert pol.management() == alice
     assert pol.pending_management() == ZERO_ADDRESS
+
+def test_unlimited(deployer, alice, bob, pol):
+    deployer.transfer(pol, 2 * ONE)
+    pol.approve(NATIVE, alice, MAX, sender=deployer)
+    assert pol.native_allowance(alice) == MAX
+    pol.send_native(bob, ONE, sender=alice)
+    assert pol.native_allowance(alice) == MAX
+    pol.increase_allowance(NATIVE, alice, ONE, sender=deployer)
+    assert pol.native_allowance(alice) == MAX
+    pol.decrease_allowance(NATIVE, alice, ONE, sender=deployer)
+    assert pol.native_allowance(alice) == 2**85 - 1 - ONE
+
+def test_allowance_too_large(deployer, alice, pol):
+    # only the maximum value is unlimited, other amounts that do not fit revert
+    with ape.reverts():
+        pol.approve(MINT, alice, 2**85 - 1, sender=deployer)
+    with ape.reverts():
+        pol.approve(MINT, alice, MAX - 1, sender=deployer)
+    pol.approve(MINT, alice, 2**85 - 2, sender=deployer)
+    assert pol.mint_allowance(alice) == 2**85 - 2
+    with ape.reverts():
+        pol.increase_allowance(MINT, alice, 1, sender=deployer)
+
+    # the event logs the value that reads back
+    tx = pol.approve(MINT, alice, MAX, sender=deployer)
+    assert [e.amount for e in tx.decode_logs(pol.Approve)] == [pol.mint_allowance(alice)]
+    pol.decrease_allowance(MINT, alice, 0, sender=deployer)
+    assert pol.mint_allowance(alice) == MAX
+
+def test_allowances_independent(deployer, alice, bob, pol):
+    pol.approve(NATIVE, alice, ONE, sender=deployer)
+    pol.approve(MINT, alice, 2 * ONE, sender=deployer)
+    pol.approve(BURN, alice, MAX, sender=deployer)
+    pol.approve(MINT, bob, 4 * ONE, sender=deployer)
+    assert pol.native_allowance(alice) == ONE
+    assert pol.mint_allowance(alice) == 2 * ONE
+    assert pol.burn_allowance(alice) == MAX
+    assert pol.native_allowance(bob) == 0
+    assert pol.mint_allowance(bob) == 4 * ONE
+
+    pol.approve(MINT, alice, 0, sender=deployer)
+    assert pol.native_allowance(alice) == ONE
+    assert pol.mint_allowance(alice) == 0
+    assert pol.burn_allowance(alice) == MAX
+
+def test_approve_many(project, deployer, alice, bob, pol):
+    token = project.MockToken.deploy(sender=deployer)
+    tokens = [NATIVE, MINT, BURN, token]
+    spenders = [alice, alice, bob, bob]
+    amounts = [ONE, 2 * ONE, 3 * ONE, 4 * ONE]
+    with ape.reverts():
+        pol.approve_many(tokens, spenders, amounts, sender=alice)
+    with ape.reverts():
+        pol.approve_many(tokens, spenders, amounts[:3], sender=deployer)
+
+    tx = pol.approve_many(tokens, spenders, amounts, sender=deployer)
+    assert [(e.token, e.spender, e.amount) for e in tx.decode_logs(pol.Approve)] == list(zip(tokens, spenders, amounts))
+    assert pol.native_allowance(alice) == ONE
+    assert pol.mint_allowance(alice) == 2 * ONE
+    assert pol.burn_allowance(bob) == 3 * ONE
+    assert token.allowance(pol, bob) == 4 * ONE
+
+def test_approve_many_gas(chain, project, deployer, alice, pol):
+    token = project.MockToken.deploy(sender=deployer)
+    tokens = [NATIVE, MINT, BURN, token]
+    snapshot = chain.snapshot()
+    single = sum(pol.approve(t, alice, MAX, sender=deployer).gas_used for t in tokens)
+    chain.restore(snapshot)
+    batched = pol.approve_many(tokens, [alice] * 4, [MAX] * 4, sender=deployer).gas_used
+
+    # one transaction instead of four and the special allowances share a slot
+    assert batched < single - 3 * 21_000
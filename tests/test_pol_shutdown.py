@@ -1,5 +1,6 @@
 import ape
 import pytest
+from eip712.messages import EIP712Message
 
 DAY_LENGTH = 24 * 60 * 60
 WEEK_LENGTH = 7 * DAY_LENGTH
@@ -7,51 +8,27 @@ NATIVE = '0x0000000000000000000000000000000000000000'
 ONE = 1_000_000_000_000_000_000
 MAX = 2**256 - 1
 
-@pytest.fixture
-def deployer(accounts):
-    return accounts[0]
-
-@pytest.fixture
-def treasury(accounts):
-    return accounts[1]
-
-@pytest.fixture
+@pytest.fixture(scope='module')
 def alice(accounts):
     return accounts[2]
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def bob(accounts):
     return accounts[3]
 
-@pytest.fixture
-def token(project, deployer):
-    return project.Token.deploy(sender=deployer)
-
-@pytest.fixture
-def staking(project, deployer, token):
-    return project.MockStaking.deploy(token, sender=deployer)
-
-@pytest.fixture
+@pytest.fixture(scope='module')
 def pol(project, deployer, token):
     return project.POL.deploy(token, sender=deployer)
 
-@pytest.fixture
-def bootstrap(project, chain, deployer, treasury, pol, token, staking):
-    bootstrap = project.Bootstrap.deploy(token, staking, treasury, pol, sender=deployer)
-    token.set_minter(bootstrap, sender=deployer)
-    ts = chain.pending_timestamp
-    bootstrap.set_whitelist_period(ts, ts + WEEK_LENGTH, sender=deployer)
-    bootstrap.set_incentive_period(ts, ts + WEEK_LENGTH, sender=deployer)
-    bootstrap.set_deposit_period(ts, ts + WEEK_LENGTH, sender=deployer)
-    bootstrap.set_lock_end(ts + WEEK_LENGTH, sender=deployer)
-    bootstrap.set_vote_period(ts, ts + WEEK_LENGTH, sender=deployer)
-    return bootstrap
-
-@pytest.fixture
+@pytest.fixture(scope='module')
+def bootstrap(open_bootstrap):
+    return open_bootstrap()
+
+@pytest.fixture(scope='module')
 def pool(project, deployer):
     return project.MockPool.deploy(sender=deployer)
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def shutdown(chain, project, deployer, treasury, alice, token, staking, pol, bootstrap, pool):
     shutdown = project.Shutdown.deploy(token, bootstrap, pol, sender=deployer)
     shutdown.set_pool(pool, sender=deployer)
@@ -80,6 +57,25 @@ def shutdown(chain, project, deployer, treasury, alice, token, staking, pol, boo
 
     return shutdown
 
+def sign_permit(chain, token, owner, spender, value, deadline, nonce=None):
+    class Permit(EIP712Message):
+        _name_: "string" = "Yearn Ether"
+        _version_: "string" = "1"
+        _chainId_: "uint256" = chain.chain_id
+        _verifyingContract_: "address" = token.address
+
+        owner: "address"
+        spender: "address"
+        value: "uint256"
+        nonce: "uint256"
+        deadline: "uint256"
+
+    if nonce is None:
+        nonce = token.nonces(owner)
+    permit = Permit(owner=owner.address, spender=spender.address, value=value, nonce=nonce, deadline=deadline)
+    signature = owner.sign_message(permit)
+    return signature.v, signature.r, signature.s
+
 def test_not_killed(alice, shutdown):
     with ape.reverts():
         shutdown.redeem(ONE, sender=alice)
@@ -116,3 +112,65 @@ def test_kill_pol(deployer, alice, token, bootstrap, pol, shutdown):
     assert token.balanceOf(shutdown) == 0
     assert token.balanceOf(bootstrap) == 0
     assert alice.balance - pre + tx.total_fees_paid == ONE
+
+def test_permit(chain, alice, bob, token):
+    deadline = chain.pending_timestamp + 3600
+    v, r, s = sign_permit(chain, token, alice, bob, ONE, deadline)
+    assert token.nonces(alice) == 0
+    token.permit(alice, bob, ONE, deadline, v, r, s, sender=bob)
+    assert token.allowance(alice, bob) == ONE
+    assert token.nonces(alice) == 1
+
+    # signature cannot be replayed
+    with ape.reverts():
+        token.permit(alice, bob, ONE, deadline, v, r, s, sender=bob)
+
+def test_permit_invalid(chain, alice, bob, token):
+    deadline = chain.pending_timestamp + 3600
+    v, r, s = sign_permit(chain, token, alice, bob, ONE, deadline)
+    with ape.reverts():
+        token.permit(alice, bob, 2 * ONE, deadline, v, r, s, sender=bob)
+    with ape.reverts():
+        token.permit(bob, bob, ONE, deadline, v, r, s, sender=bob)
+
+    chain.pending_timestamp = deadline + 1
+    with ape.reverts():
+        token.permit(alice, bob, ONE, deadline, v, r, s, sender=bob)
+
+def test_domain_separator(chain, token):
+    class Domain(EIP712Message):
+        _name_: "string" = "Yearn Ether"
+        _version_: "string" = "1"
+        _chainId_: "uint256" = chain.chain_id
+        _verifyingContract_: "address" = token.address
+    assert token.DOMAIN_SEPARATOR() == Domain()._domain_separator_
+
+def test_redeem_with_permit(chain, deployer, alice, token, bootstrap, pool, shutdown):
+    token.approve(shutdown, 0, sender=alice)
+    pool.set_killed(True, sender=deployer)
+
+    deadline = chain.pending_timestamp + 3600
+    v, r, s = sign_permit(chain, token, alice, shutdown, ONE, deadline)
+    pre = alice.balance
+    tx = shutdown.redeem_with_permit(ONE, deadline, v, r, s, sender=alice)
+    assert bootstrap.debt() == 0
+    assert token.balanceOf(alice) == 0
+    assert token.allowance(alice, shutdown) == 0
+    assert alice.balance - pre + tx.total_fees_paid == ONE
+
+def test_redeem_with_permit_front_run(chain, deployer, alice, bob, token, bootstrap, pool, shutdown):
+    token.approve(shutdown, 0, sender=alice)
+    pool.set_killed(True, sender=deployer)
+
+    # an invalid signature fails without an allowance
+    deadline = chain.pending_timestamp + 3600
+    v, r, s = sign_permit(chain, token, alice, shutdown, ONE, deadline)
+    with ape.reverts():
+        shutdown.redeem_with_permit(ONE, deadline + 1, v, r, s, sender=alice)
+
+    # the signature is submitted to the token before the redemption
+    token.permit(alice, shutdown, ONE, deadline, v, r, s, sender=bob)
+    shutdown.redeem_with_permit(ONE, deadline, v, r, s, sender=alice)
+    assert bootstrap.debt() == 0
+    assert token.balanceOf(alice) == 0
+    assert token.allowance(alice, shutdown) == 0
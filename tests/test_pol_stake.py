@@ -1,5 +1,6 @@
 import ape
 import pytest
+from scripts import multicall
 
 ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
 NATIVE = '0x0000000000000000000000000000000000000000'
@@ -7,33 +8,15 @@ MINT   = '0x0000000000000000000000000000000000000001'
 ONE    = 1_000_000_000_000_000_000
 MAX    = 2**256 - 1
 
-@pytest.fixture
-def deployer(accounts):
-    return accounts[0]
-
-@pytest.fixture
-def treasury(accounts):
-    return accounts[1]
-
-@pytest.fixture
+@pytest.fixture(scope='module')
 def alice(accounts):
     return accounts[2]
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def bob(accounts):
     return accounts[3]
 
-@pytest.fixture
-def token(project, deployer):
-    return project.Token.deploy(sender=deployer)
-
-@pytest.fixture
-def pol(project, deployer, token):
-    pol = project.POL.deploy(token, sender=deployer)
-    token.set_minter(pol, sender=deployer)
-    return pol
-
-@pytest.fixture
+@pytest.fixture(scope='module')
 def stake(project, deployer, treasury, pol):
     return project.Stake.deploy(pol, treasury, sender=deployer)
 
@@ -42,9 +25,9 @@ def test_from_pol_native(project, deployer, alice, pol, stake):
     pol.approve(NATIVE, stake, MAX, sender=deployer)
     with ape.reverts():
         stake.from_pol(NATIVE, ONE, sender=alice)
-    assert project.provider.get_balance(stake) == 0
+    assert project.provider.get_balance(stake.address) == 0
     stake.from_pol(NATIVE, ONE, sender=deployer)
-    assert project.provider.get_balance(stake) == ONE
+    assert project.provider.get_balance(stake.address) == ONE
 
 def test_from_pol_token(deployer, alice, token, pol, stake):
     alice.transfer(pol, ONE)
@@ -137,3 +120,52 @@ def test_transfer_treasury(treasury, alice, bob, stake):
     stake.accept_treasury(sender=alice)
     assert stake.treasury() == alice
     assert stake.pending_treasury() == ZERO_ADDRESS
+
+def test_multicall(deployer, treasury, alice, token, pol, stake):
+    alice.transfer(pol, ONE)
+    pol.approve(MINT, deployer, ONE, sender=deployer)
+    pol.mint(ONE, sender=deployer)
+    pol.approve(token, stake, MAX, sender=deployer)
+
+    calls = [
+        (stake.from_pol, token, ONE),
+        (stake.to_treasury, token, ONE // 4),
+        (stake.to_pol, token, ONE // 4),
+    ]
+    with ape.reverts():
+        multicall.multicall(stake, calls, alice)
+    multicall.multicall(stake, calls, deployer)
+    assert token.balanceOf(stake) == ONE // 2
+    assert token.balanceOf(treasury) == ONE // 4
+    assert token.balanceOf(pol) == ONE // 4
+
+def test_multicall_revert(deployer, alice, token, pol, stake):
+    alice.transfer(pol, ONE)
+    pol.approve(MINT, deployer, ONE, sender=deployer)
+    pol.mint(ONE, sender=deployer)
+    pol.approve(token, stake, MAX, sender=deployer)
+
+    # last call exceeds the balance, so the whole batch reverts
+    with ape.reverts():
+        multicall.multicall(stake, [(stake.from_pol, token, ONE), (stake.to_pol, token, 2 * ONE)], deployer)
+    assert token.balanceOf(stake) == 0
+    assert token.balanceOf(pol) == ONE
+
+def test_multicall_gas(chain, deployer, alice, token, pol, stake):
+    alice.transfer(pol, ONE)
+    pol.approve(MINT, deployer, ONE, sender=deployer)
+    pol.mint(ONE, sender=deployer)
+    pol.approve(token, stake, MAX, sender=deployer)
+    calls = [
+        (stake.from_pol, token, ONE // 2),
+        (stake.to_treasury, token, ONE // 4),
+        (stake.to_pol, token, ONE // 4),
+    ]
+
+    snapshot = chain.snapshot()
+    unbatched = sum(method(*args, sender=deployer).gas_used for method, *args in calls)
+    chain.restore(snapshot)
+    batched = multicall.multicall(stake, calls, deployer).gas_used
+
+    # one transaction base cost instead of three, minus the delegate call overhead
+    assert batched < unbatched - 2 * 21_000 + 5_000
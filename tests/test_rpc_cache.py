@@ -0,0 +1,173 @@
+import pytest
+from scripts.rpc_cache import Cache
+
+ONE = 1_000_000_000_000_000_000
+
+@pytest.fixture(scope='module')
+def alice(accounts):
+    return accounts[1]
+
+@pytest.fixture(scope='module')
+def token(project, deployer):
+    token = project.Token.deploy(sender=deployer)
+    token.set_minter(deployer, sender=deployer)
+    return token
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'rpc.db')
+
+@pytest.fixture
+def cache(path):
+    return Cache(path, confirmations=0, finality_interval=0)
+
+@pytest.fixture
+def web3(chain, cache):
+    uninstall = cache.install(chain.provider.web3)
+    yield chain.provider.web3
+    uninstall()
+
+def supply(web3, token, block):
+    return web3.eth.call({'to': token.address, 'data': token.totalSupply.encode_input()}, block)
+
+def calls(cache, since=(0, 0)):
+    # other requests of the provider go through the cache too, so only count calls
+    counts = cache.metrics()['methods'].get('eth_call', {'hits': 0, 'misses': 0})
+    return counts['hits'] - since[0], counts['misses'] - since[1]
+
+def mark(cache):
+    return calls(cache)
+
+def test_call(chain, deployer, token, cache, web3):
+    token.mint(deployer, ONE, sender=deployer)
+    block = chain.blocks.height
+    since = mark(cache)
+    before = supply(web3, token, block)
+    assert calls(cache, since) == (0, 1)
+    upstream = cache.upstream
+    assert supply(web3, token, block) == before
+    assert calls(cache, since) == (1, 1)
+    assert cache.upstream == upstream
+
+    # historical reads keep returning the state at their block, latest goes to the node
+    token.mint(deployer, ONE, sender=deployer)
+    since = mark(cache)
+    assert supply(web3, token, block) == before
+    assert int.from_bytes(supply(web3, token, 'latest'), 'big') == 2 * ONE
+    assert calls(cache, since) == (1, 0)
+
+def test_logs(chain, deployer, alice, token, cache, web3):
+    token.mint(alice, ONE, sender=deployer)
+    token.transfer(deployer, ONE // 2, sender=alice)
+    block = chain.blocks.height
+    logs = web3.eth.get_logs({'address': token.address, 'fromBlock': 0, 'toBlock': block})
+    assert len(logs) > 0
+    assert web3.eth.get_logs({'address': token.address, 'fromBlock': 0, 'toBlock': block}) == logs
+    assert cache.metrics()['methods']['eth_getLogs'] == {'hits': 1, 'misses': 1}
+
+    # ranges ending at a tag are not cached
+    web3.eth.get_logs({'address': token.address, 'fromBlock': 0, 'toBlock': 'latest'})
+    assert cache.uncached > 0
+    assert cache.metrics()['methods']['eth_getLogs'] == {'hits': 1, 'misses': 1}
+
+def test_balance(chain, deployer, alice, cache, web3):
+    block = chain.blocks.height
+    balance = web3.eth.get_balance(alice.address, block)
+    deployer.transfer(alice, ONE)
+    assert web3.eth.get_balance(alice.address, block) == balance
+    assert web3.eth.get_balance(alice.address, 'latest') == balance + ONE
+    assert cache.metrics()['methods']['eth_getBalance'] == {'hits': 1, 'misses': 1}
+
+def test_not_finalized(chain, token, path):
+    web3 = chain.provider.web3
+    cache = Cache(path, confirmations=10, finality_interval=0)
+    uninstall = cache.install(web3)
+    try:
+        block = chain.blocks.height
+        since = mark(cache)
+        uncached = cache.uncached
+        supply(web3, token, block)
+        supply(web3, token, block)
+        assert calls(cache, since) == (0, 0)
+        assert cache.uncached >= uncached + 2
+
+        chain.mine(10)
+        since = mark(cache)
+        supply(web3, token, block)
+        supply(web3, token, block)
+        assert calls(cache, since) == (1, 1)
+    finally:
+        uninstall()
+
+def test_persistent(chain, token, path, cache):
+    web3 = chain.provider.web3
+    uninstall = cache.install(web3)
+    block = chain.blocks.height
+    before = [supply(web3, token, number) for number in (block - 1, block)]
+    uninstall()
+    assert {block - 1, block} <= set(cache.hashes)
+
+    # a rerun against the same file answers from disk. It checks the latest stored block hash
+    # against the node once, but does not fetch the hashes of the other blocks it reads at
+    rerun = Cache(path, confirmations=0, finality_interval=0)
+    fetched = []
+    send = rerun._send
+    def record(make_request, method, params):
+        if method == 'eth_getBlockByNumber':
+            fetched.append(params[0])
+        return send(make_request, method, params)
+    rerun._send = record
+    uninstall = rerun.install(web3)
+    try:
+        assert supply(web3, token, block - 1) == before[0]
+        assert supply(web3, token, block) == before[1]
+        assert calls(rerun) == (2, 0)
+        assert hex(block - 1) not in fetched
+        assert fetched.count(hex(block)) == 1
+    finally:
+        uninstall()
+
+def test_persistent_replaced(chain, token, path):
+    # hashes stored by an earlier session of a local chain with the same genesis are dropped
+    cache = Cache(path, confirmations=0, finality_interval=0)
+    genesis = '0x' + bytes(chain.blocks[0].hash).hex()
+    with cache.db:
+        cache.db.execute('INSERT INTO blocks VALUES (?, ?, ?)', (genesis, 1, '0x' + '11' * 32))
+    web3 = chain.provider.web3
+    uninstall = cache.install(web3)
+    try:
+        supply(web3, token, 1)
+        assert calls(cache) == (0, 1)
+        assert cache.hashes[1] == '0x' + bytes(chain.blocks[1].hash).hex()
+    finally:
+        uninstall()
+
+def test_reset(chain, token, cache, web3):
+    block = chain.blocks.height
+    supply(web3, token, block)
+    assert cache.hashes
+    cache.request(lambda method, params: {'result': True}, 'evm_revert', ['0x1'])
+    assert cache.hashes == {}
+    assert cache.finalized == -1
+    assert cache.metrics()['blocks'] == 0
+
+def test_eviction(path):
+    cache = Cache(path, max_size=20)
+    cache.put('a', 'eth_call', '0x' + '1' * 6)
+    cache.put('b', 'eth_call', '0x' + '2' * 6)
+    assert cache.size == 20
+    # reading `a` makes `b` the least recently used entry
+    assert cache.get('a') == '0x111111'
+    cache.put('c', 'eth_call', '0x' + '3' * 6)
+    assert cache.get('b') is None
+    assert cache.get('a') == '0x111111'
+    assert cache.get('c') == '0x333333'
+    assert cache.evictions == 1
+    assert cache.size == 20
+
+    # size and access order survive a restart
+    cache = Cache(path, max_size=20)
+    assert cache.size == 20
+    cache.put('d', 'eth_call', '0x' + '4' * 6)
+    assert cache.get('a') is None
+    assert cache.get('c') == '0x333333'
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from eth_utils import to_checksum_address
+from scripts import state_reader
+from scripts.rpc import RPCError
+
+ONE = 1_000_000_000_000_000_000
+MAX = 2**256 - 1
+NUM_DEPOSITORS = 100
+
+@pytest.fixture(scope='module')
+def alice(accounts):
+    return accounts[2]
+
+@pytest.fixture(scope='module')
+def voters(accounts):
+    return accounts[3:7]
+
+@pytest.fixture(scope='module')
+def multicall(project, deployer):
+    return project.MockMulticall.deploy(sender=deployer)
+
+@pytest.fixture(scope='module')
+def protocols(project, deployer):
+    return [project.MockToken.deploy(sender=deployer) for _ in range(3)]
+
+@pytest.fixture(scope='module')
+def incentive(project, deployer):
+    incentive = project.MockToken.deploy(sender=deployer)
+    incentive.mint(deployer, 10 * ONE, sender=deployer)
+    return incentive
+
+@pytest.fixture(scope='module')
+def depositors():
+    return [to_checksum_address(f'0x{i + 1:040x}') for i in range(NUM_DEPOSITORS)]
+
+@pytest.fixture(scope='module')
+def bootstrap(chain, deployer, alice, voters, open_bootstrap, protocols, incentive, depositors):
+    """
+    Bootstrap after the vote, with the first two protocols declared winners and one incentive claimed
+    """
+    bootstrap = open_bootstrap()
+    for protocol in protocols:
+        bootstrap.apply(protocol, value=ONE, sender=alice)
+        bootstrap.whitelist(protocol, sender=deployer)
+    incentive.approve(bootstrap, MAX, sender=deployer)
+    bootstrap.incentivize(protocols[0], incentive, 3 * ONE, sender=deployer)
+    bootstrap.incentivize(protocols[1], incentive, ONE, sender=deployer)
+    for i, depositor in enumerate(depositors):
+        bootstrap.deposit(depositor, value=(i + 1) * ONE // 100, sender=alice)
+    for i, voter in enumerate(voters):
+        bootstrap.deposit(value=(i + 1) * ONE, sender=voter)
+        bootstrap.vote([protocols[i % 2], protocols[2]], [(i + 1) * ONE // 2, ONE // 4], sender=voter)
+    chain.pending_timestamp = bootstrap.lock_end()
+    bootstrap.declare_winners(protocols[:2], sender=deployer)
+    bootstrap.claim_incentive(protocols[0], incentive, sender=voters[0])
+    return bootstrap
+
+@pytest.fixture(scope='module')
+def participants(bootstrap, voters, depositors):
+    return depositors + [voter.address for voter in voters]
+
+def expected(bootstrap, accounts, protocols, incentives):
+    return {
+        'deposits': [bootstrap.deposits(account) for account in accounts],
+        'votes_used': [bootstrap.votes_used(account) for account in accounts],
+        'votes_used_protocol': [[bootstrap.votes_used_protocol(account, protocol) for protocol in protocols] for account in accounts],
+        'claimable_incentive': [[bootstrap.claimable_incentive(protocol, incentive, account) for protocol, incentive in incentives] for account in accounts],
+    }
+
+def test_encode(bootstrap, protocols, incentive, alice):
+    assert state_reader.encode_call(state_reader.DEPOSITS, alice) == bootstrap.deposits.encode_input(alice)
+    assert state_reader.encode_call(state_reader.VOTES_USED_PROTOCOL, alice, protocols[0]) == bootstrap.votes_used_protocol.encode_input(alice, protocols[0])
+    assert state_reader.encode_call(state_reader.CLAIMABLE_INCENTIVE, protocols[0], incentive, alice) == bootstrap.claimable_incentive.encode_input(protocols[0], incentive, alice)
+
+def test_participants(bootstrap, participants):
+    assert state_reader.participants(bootstrap) == participants
+
+def test_winner_incentives(bootstrap, protocols, incentive):
+    assert state_reader.winner_incentives(bootstrap) == [(protocols[0], incentive), (protocols[1], incentive)]
+
+def test_read(bootstrap, multicall, protocols, incentive, participants):
+    incentives = [(protocols[0], incentive), (protocols[1], incentive)]
+    state = state_reader.read(bootstrap, participants, protocols, incentives, multicall)
+    assert list(state['account']) == participants
+    assert state['votes_used_protocol'].shape == (len(participants), len(protocols))
+    assert state['claimable_incentive'].shape == (len(participants), len(incentives))
+    for name, values in expected(bootstrap, participants, protocols, incentives).items():
+        assert state[name].tolist() == values
+    # the first voter claimed the first incentive
+    assert state['claimable_incentive'][-4, 0] == 0
+    assert state['claimable_incentive'][-4, 1] > 0
+    assert state['claimable_incentive'][-1, 0] > 0
+
+def test_read_block(chain, voters, bootstrap, multicall, participants):
+    # the lock has ended when the winners are declared
+    block = chain.blocks.height
+    before = state_reader.read(bootstrap, participants, multicall=multicall)
+    bootstrap.claim(ONE, sender=voters[-1])
+    assert state_reader.read(bootstrap, participants, multicall=multicall, block=block)['deposits'].tolist() == before['deposits'].tolist()
+    assert state_reader.read(bootstrap, participants, multicall=multicall)['deposits'][-1] == before['deposits'][-1] - ONE
+
+def test_batch_split(chain, bootstrap, multicall, protocols, participants):
+    # a node that rejects requests above a size forces smaller batches
+    send = state_reader.provider_sender(chain.provider)
+    limit = 64
+    async def limited(method, params):
+        if len(params[0]['data']) > 2 * 200 * limit:
+            raise RPCError(method, 'request too large')
+        return await send(method, params)
+
+    reader = state_reader.Reader(limited, multicall, batch_size=256)
+    state = asyncio.run(state_reader.read_state(reader, bootstrap, participants, protocols))
+    assert reader.batch_size <= limit
+    for name, values in expected(bootstrap, participants, protocols, []).items():
+        assert state[name].tolist() == values
+
+def test_batch_error(bootstrap, multicall, participants):
+    # only errors of the node split a batch, anything else is raised
+    requests = []
+    async def broken(method, params):
+        requests.append(params)
+        raise KeyError('bug')
+
+    reader = state_reader.Reader(broken, multicall, batch_size=256)
+    with pytest.raises(KeyError):
+        asyncio.run(state_reader.read_state(reader, bootstrap, participants))
+    assert len(requests) == 1
+    assert reader.batch_size == 256
+
+def test_column():
+    assert state_reader.column([1, 2]).dtype.name == 'int64'
+    values = state_reader.column([1, 2**100])
+    assert values.dtype == object
+    assert values.tolist() == [1, 2**100]
+
+def test_failed_call(chain, alice, token, multicall):
+    # the token has no `deposits`
+    reader = state_reader.Reader(state_reader.provider_sender(chain.provider), multicall)
+    with pytest.raises(ValueError):
+        asyncio.run(reader.call([(token.address, state_reader.encode_call(state_reader.DEPOSITS, alice))]))